@@ -0,0 +1,184 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from typing import List, Optional
+
+# Time-bucketed order analytics for the admin pages.
+#
+# Every range is half-open, [start, end), and is compared against the raw
+# column, never a function of it: `o.created_at >= %s AND o.created_at < %s`
+# is a range scan of idx_orders_created_id, where
+# `DATE(o.created_at) BETWEEN %s AND %s` reads every order.
+#
+#   hour                 raw orders, for lunch-rush curves over days or weeks
+#   day / week / month   vendor_daily_rollup (vendor_rollup.py), so a year
+#                        costs one row per vendor per day whatever the order
+#                        volume
+#
+# Weeks start on Monday. `python benchmark_analytics.py` shows the plans and
+# timings on a generated database of 1M+ orders.
+
+BUCKETS = ("hour", "day", "week", "month")
+
+
+@dataclass
+class TrendPoint:
+    bucket: datetime  # start of the hour / day / week / month
+    vendor_id: int
+    vendor_name: str
+    orders: int
+    items: int
+    revenue: Decimal
+
+
+@dataclass
+class HourProfile:
+    hour: int  # 0-23
+    days: int  # days in the range
+    orders: int
+    revenue: Decimal
+
+    @property
+    def orders_per_day(self):
+        return self.orders / self.days if self.days else 0.0
+
+
+def _bucket_sql(column, bucket):
+    # SQL for the start of the day / week / month holding the DATE `column`.
+    # Only used in SELECT / GROUP BY, never in WHERE.
+    if bucket == "day":
+        return column
+    if bucket == "week":
+        return f"DATE_SUB({column}, INTERVAL WEEKDAY({column}) DAY)"
+    if bucket == "month":
+        return f"DATE_SUB({column}, INTERVAL DAYOFMONTH({column}) - 1 DAY)"
+    raise ValueError(f"Unknown bucket {bucket!r}; expected one of {', '.join(BUCKETS)}")
+
+
+def _order_conditions(start, end, vendor_id):
+    # WHERE conditions and params for orders (o) joined to order_items (oi).
+    # The vendor filter is only added when there is one: a catch-all
+    # `(%s IS NULL OR oi.vendor_id = %s)` is planned once for both cases
+    # and cannot use the vendor's index.
+    conditions = ["o.created_at >= %s", "o.created_at < %s"]
+    params = [start, end]
+    if vendor_id is not None:
+        conditions.append("oi.vendor_id = %s")
+        params.append(vendor_id)
+    return conditions, params
+
+
+def _as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time())
+
+
+def _day_range(start, end):
+    # Whole days covering [start, end): a partial last day is included
+    start = _as_datetime(start)
+    end = _as_datetime(end)
+    last = end.date() if end.time() == time() else end.date() + timedelta(days=1)
+    return start.date(), last
+
+
+def bucket_start(value, bucket):
+    value = _as_datetime(value)
+    if bucket == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    day = datetime.combine(value.date(), time())
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown bucket {bucket!r}; expected one of {', '.join(BUCKETS)}")
+
+
+def bucket_starts(start, end, bucket):
+    # Every bucket overlapping [start, end), for filling gaps in a chart
+    current = bucket_start(start, bucket)
+    end = _as_datetime(end)
+    starts = []
+    while current < end:
+        starts.append(current)
+        if bucket == "hour":
+            current += timedelta(hours=1)
+        elif bucket == "day":
+            current += timedelta(days=1)
+        elif bucket == "week":
+            current += timedelta(weeks=1)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return starts
+
+
+def revenue_trend(cursor, start, end, bucket="day", vendor_id: Optional[int] = None) -> List[TrendPoint]:
+    # Orders, items and revenue per vendor per bucket over [start, end),
+    # ordered by bucket then vendor name. vendor_id=None means all vendors.
+    start = _as_datetime(start)
+    end = _as_datetime(end)
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket {bucket!r}; expected one of {', '.join(BUCKETS)}")
+    if start >= end:
+        return []
+    if bucket == "hour":
+        order_conditions, params = _order_conditions(start, end, vendor_id)
+        cursor.execute(f"""
+            SELECT TIMESTAMPADD(HOUR, HOUR(o.created_at), DATE(o.created_at)) AS bucket, oi.vendor_id, v.name,
+                   COUNT(DISTINCT o.id), SUM(oi.quantity), SUM(oi.quantity * oi.price_at_time)
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.id
+            JOIN vendors v ON v.id = oi.vendor_id
+            WHERE {" AND ".join(order_conditions)}
+            GROUP BY bucket, oi.vendor_id, v.name
+            ORDER BY bucket, v.name
+        """, params)
+    else:
+        first_day, end_day = _day_range(start, end)
+        bucket_sql = _bucket_sql("r.day", bucket)
+        # With a vendor this is a range of the (vendor_id, day) primary key
+        rollup_conditions = ["r.day >= %s", "r.day < %s"]
+        params = [first_day, end_day]
+        if vendor_id is not None:
+            rollup_conditions.append("r.vendor_id = %s")
+            params.append(vendor_id)
+        cursor.execute(f"""
+            SELECT {bucket_sql} AS bucket, r.vendor_id, v.name,
+                   SUM(r.orders), SUM(r.items), SUM(r.revenue)
+            FROM vendor_daily_rollup r
+            JOIN vendors v ON v.id = r.vendor_id
+            WHERE {" AND ".join(rollup_conditions)}
+            GROUP BY bucket, r.vendor_id, v.name
+            ORDER BY bucket, v.name
+        """, params)
+    return [
+        TrendPoint(_as_datetime(bucket_value), vendor, name, int(orders), int(items or 0), Decimal(revenue or 0))
+        for bucket_value, vendor, name, orders, items, revenue in cursor.fetchall()
+    ]
+
+
+def hourly_profile(cursor, start, end, vendor_id: Optional[int] = None) -> List[HourProfile]:
+    # Orders and revenue by hour of day over [start, end), all 24 hours,
+    # e.g. the lunch rush averaged over the last four weeks
+    start = _as_datetime(start)
+    end = _as_datetime(end)
+    if start >= end:
+        return []
+    days = max(1, math.ceil((end - start) / timedelta(days=1)))
+    order_conditions, params = _order_conditions(start, end, vendor_id)
+    cursor.execute(f"""
+        SELECT HOUR(o.created_at) AS hour, COUNT(DISTINCT o.id), SUM(oi.quantity * oi.price_at_time)
+        FROM orders o
+        JOIN order_items oi ON oi.order_id = o.id
+        WHERE {" AND ".join(order_conditions)}
+        GROUP BY hour
+    """, params)
+    by_hour = {hour: (orders, revenue) for hour, orders, revenue in cursor.fetchall()}
+    profile = []
+    for hour in range(24):
+        orders, revenue = by_hour.get(hour, (0, 0))
+        profile.append(HourProfile(hour, days, int(orders), Decimal(revenue or 0)))
+    return profile
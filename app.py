@@ -50,7 +50,7 @@ def main():
         st.info("Please login or sign up to continue.")
     else:
         # Show appropriate UI based on user role
-        if st.session_state.user["role"] == "customer":
+        if st.session_state.user["role"] == "user":
             customer_ui()
         elif st.session_state.user["role"] == "vendor":
             vendor_ui()
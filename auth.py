@@ -1,8 +1,7 @@
 import streamlit as st
-from db import execute_query
+from db import execute_query, connect, connection
 import hashlib
 import mysql.connector
-from config import DB_CONFIG
 import time
 
 def hash_password(password):
@@ -88,16 +87,17 @@ def login(email=None, password=None):
     # If email and password are provided, use the original login logic
     if email is not None and password is not None:
         try:
-            # Connect to database
-            conn = mysql.connector.connect(**DB_CONFIG)
-            db_executor = conn.cursor()
-            
-            # Check if user exists
-            db_executor.execute(
-                "SELECT id, name, role, password FROM users WHERE email = %s",
-                (email,)
-            )
-            user = db_executor.fetchone()
+            # Borrow a pooled connection; returned to the pool on exit
+            with connection() as conn:
+                db_executor = conn.cursor()
+                
+                # Check if user exists
+                db_executor.execute(
+                    "SELECT id, name, role, password FROM users WHERE email = %s",
+                    (email,)
+                )
+                user = db_executor.fetchone()
+                db_executor.close()
             
             if user and user[3] == hash_password(password):  # Check hashed password
                 return {
@@ -108,9 +108,6 @@ def login(email=None, password=None):
                 }, None
             else:
                 return None, "Invalid email or password"
-            
-            db_executor.close()
-            conn.close()
         except mysql.connector.Error as e:
             return None, f"An error occurred. Please try again. Error: {str(e)}"
     
@@ -148,16 +145,17 @@ def login(email=None, password=None):
             
             if submit:
                 try:
-                    # Connect to database
-                    conn = mysql.connector.connect(**DB_CONFIG)
-                    db_executor = conn.cursor()
-                    
-                    # Check if user exists
-                    db_executor.execute(
-                        "SELECT id, name, role, password FROM users WHERE email = %s",
-                        (email,)
-                    )
-                    user = db_executor.fetchone()
+                    # Borrow a pooled connection; returned to the pool on exit
+                    with connection() as conn:
+                        db_executor = conn.cursor()
+                        
+                        # Check if user exists
+                        db_executor.execute(
+                            "SELECT id, name, role, password FROM users WHERE email = %s",
+                            (email,)
+                        )
+                        user = db_executor.fetchone()
+                        db_executor.close()
                     
                     if user and user[3] == hash_password(password):  # Check hashed password
                         st.session_state.user = {
@@ -178,9 +176,6 @@ def login(email=None, password=None):
                         st.rerun()
                     else:
                         st.error("Invalid email or password")
-                    
-                    db_executor.close()
-                    conn.close()
                 except mysql.connector.Error as e:
                     st.error(f"An error occurred. Please try again. Error: {str(e)}")
     
@@ -221,7 +216,7 @@ def login(email=None, password=None):
                     else:
                         try:
                             # Connect to database
-                            conn = mysql.connector.connect(**DB_CONFIG)
+                            conn = connect()
                             db_executor = conn.cursor()
                             
                             # Check if email exists
@@ -254,11 +249,13 @@ def login(email=None, password=None):
                                 st.rerun()
                             else:
                                 st.error("Email not found in our records.")
-                            
-                            db_executor.close()
-                            conn.close()
                         except mysql.connector.Error as e:
                             st.error(f"An error occurred. Please try again. Error: {str(e)}")
+                        finally:
+                            if 'db_executor' in locals():
+                                db_executor.close()
+                            if 'conn' in locals():
+                                conn.close()
 
 def get_current_user():
     if "user" in st.session_state:
@@ -0,0 +1,249 @@
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import mysql.connector
+from config import DB_CONFIG
+from migrate import migrate
+from vendor_rollup import rebuild
+from analytics import revenue_trend, hourly_profile
+
+# Plans and timings of the admin analytics queries on a large generated
+# database, next to the DATE(o.created_at) BETWEEN query Order Analysis used
+# to run. Point it at a scratch database: an empty one is migrated and
+# filled with --orders generated orders over the last --days days (with a
+# lunch rush), and one that already has orders is measured as it is.
+#
+#   python benchmark_analytics.py --database canteen_bench
+#   python benchmark_analytics.py --database canteen_bench --orders 2000000 --repeat 9
+#
+# Each query is run through EXPLAIN FORMAT=JSON (access type, index and row
+# estimate per table) and then timed; the median of --repeat runs is shown.
+
+BATCH_SIZE = 5000
+USERS = 5000
+VENDORS = [
+    ("Bench Canteen", ["Thali", "Dosa", "Idli", "Poha", "Chai"]),
+    ("Bench Cafe", ["Sandwich", "Coffee", "Brownie", "Cold Coffee", "Maggi"]),
+    ("Bench Juice Bar", ["Orange Juice", "Lassi", "Fruit Bowl", "Smoothie", "Lime Soda"]),
+    ("Bench Grill", ["Burger", "Fries", "Wrap", "Pizza Slice", "Momos"]),
+]
+# Relative order volume per hour of day: breakfast, a lunch rush, evening snacks
+HOUR_WEIGHTS = [0, 0, 0, 0, 0, 0, 0, 2, 6, 8, 5, 6, 20, 24, 14, 6, 7, 10, 9, 6, 3, 1, 0, 0]
+
+# The Order Analysis trend query before analytics.py
+LEGACY_DAILY_TREND = """
+    SELECT DATE(o.created_at) AS order_date, v.name, SUM(oi.quantity * oi.price_at_time)
+    FROM orders o
+    JOIN order_items oi ON o.id = oi.order_id
+    JOIN vendors v ON oi.vendor_id = v.id
+    WHERE DATE(o.created_at) BETWEEN %s AND %s
+    GROUP BY DATE(o.created_at), v.name
+    ORDER BY order_date, v.name
+"""
+
+
+class _RecordingCursor:
+    # Passes everything through to the cursor, keeping the statements run
+    # so they can be EXPLAINed afterwards
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.statements = []
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, operation, params=None):
+        self.statements.append((operation, params))
+        return self._cursor.execute(operation, params)
+
+
+def _insert_batches(cursor, sql, rows):
+    for i in range(0, len(rows), BATCH_SIZE):
+        cursor.executemany(sql, rows[i:i + BATCH_SIZE])
+
+
+def seed_orders(conn, orders, days, seed=42, log=print):
+    # Users, vendors and menu items, then `orders` paid and picked-up orders
+    # over the `days` days before today, and their rollup
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+    try:
+        _insert_batches(cursor, """
+            INSERT IGNORE INTO users (name, email, password, role) VALUES (%s, %s, %s, 'user')
+        """, [(f"Bench User {n}", f"bench{n}@example.com", "x") for n in range(USERS)])
+        cursor.execute("SELECT id FROM users WHERE email LIKE 'bench%@example.com'")
+        user_ids = [row[0] for row in cursor.fetchall()]
+
+        menu = []  # (menu_item_id, vendor_id, name, price)
+        for vendor_name, items in VENDORS:
+            cursor.execute("INSERT INTO vendors (name, description) VALUES (%s, %s)",
+                           (vendor_name, "Generated by benchmark_analytics.py"))
+            vendor_id = cursor.lastrowid
+            for item_name in items:
+                price = Decimal(rng.randrange(20, 200))
+                cursor.execute("""
+                    INSERT INTO menu_items (vendor_id, name, description, price) VALUES (%s, %s, '', %s)
+                """, (vendor_id, item_name, price))
+                menu.append((cursor.lastrowid, vendor_id, item_name, price))
+        conn.commit()
+        by_vendor = {}
+        for item in menu:
+            by_vendor.setdefault(item[1], []).append(item)
+        vendor_menus = list(by_vendor.values())
+
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM orders")
+        next_id = cursor.fetchone()[0] + 1
+        first_day = date.today() - timedelta(days=days)
+        hours = list(range(24))
+        started = time.perf_counter()
+        for batch_start in range(0, orders, BATCH_SIZE):
+            order_rows = []
+            item_rows = []
+            for order_id in range(next_id + batch_start, next_id + min(batch_start + BATCH_SIZE, orders)):
+                created_at = (datetime.combine(first_day + timedelta(days=rng.randrange(days)), datetime.min.time())
+                              + timedelta(hours=rng.choices(hours, HOUR_WEIGHTS)[0],
+                                          seconds=rng.randrange(3600)))
+                total = Decimal(0)
+                for menu_item_id, vendor_id, item_name, price in rng.sample(rng.choice(vendor_menus), rng.randint(1, 3)):
+                    quantity = rng.randint(1, 2)
+                    total += quantity * price
+                    item_rows.append((order_id, menu_item_id, vendor_id, item_name, quantity, price, created_at))
+                order_rows.append((order_id, rng.choice(user_ids), total, created_at))
+            _insert_batches(cursor, """
+                INSERT INTO orders (id, user_id, total, status, payment_status, created_at,
+                                    vendors_total, vendors_ready, vendors_pickedup)
+                VALUES (%s, %s, %s, 'pickedup', 'paid', %s, 1, 1, 1)
+            """, order_rows)
+            _insert_batches(cursor, """
+                INSERT INTO order_items (order_id, menu_item_id, vendor_id, item_name, quantity, price_at_time, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, item_rows)
+            conn.commit()
+            done = min(batch_start + BATCH_SIZE, orders)
+            if done % 100000 == 0 or done == orders:
+                log(f"  {done:,} orders ({time.perf_counter() - started:.0f}s)")
+        cursor.execute("ANALYZE TABLE orders, order_items")
+        cursor.fetchall()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    rows = rebuild(conn, first_day, date.today() + timedelta(days=1))
+    log(f"  rebuilt {rows:,} vendor-days")
+
+
+def _plan_tables(node, tables):
+    # (table, access_type, key, rows examined per scan) for each table in a
+    # JSON plan, in plan order
+    if isinstance(node, dict):
+        if "table_name" in node and "access_type" in node:
+            tables.append((node["table_name"], node["access_type"], node.get("key"),
+                           node.get("rows_examined_per_scan")))
+        for value in node.values():
+            _plan_tables(value, tables)
+    elif isinstance(node, list):
+        for value in node:
+            _plan_tables(value, tables)
+    return tables
+
+
+def measure(conn, label, run, repeat):
+    # run(cursor) executes the query; returns (label, median seconds, rows, plan)
+    cursor = conn.cursor()
+    try:
+        recording = _RecordingCursor(cursor)
+        result = run(recording)
+        plans = []
+        for sql, params in recording.statements:
+            cursor.execute("EXPLAIN FORMAT=JSON " + sql, params)
+            plans.extend(_plan_tables(json.loads(cursor.fetchone()[0]), []))
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run(cursor)
+            timings.append(time.perf_counter() - started)
+        return label, statistics.median(timings), len(result), plans
+    finally:
+        cursor.close()
+
+
+def _legacy_daily_trend(start, end):
+    def run(cursor):
+        cursor.execute(LEGACY_DAILY_TREND, (start, end - timedelta(days=1)))
+        return cursor.fetchall()
+    return run
+
+
+def benchmark(conn, repeat, log=print):
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+    year_ago = tomorrow - timedelta(days=365)
+    month_ago = tomorrow - timedelta(days=30)
+    week_ago = tomorrow - timedelta(days=7)
+    cases = [
+        ("legacy DATE() BETWEEN, daily, 30 days", _legacy_daily_trend(month_ago, tomorrow)),
+        ("legacy DATE() BETWEEN, daily, 365 days", _legacy_daily_trend(year_ago, tomorrow)),
+        ("revenue_trend hour, 7 days", lambda c: revenue_trend(c, week_ago, tomorrow, "hour")),
+        ("revenue_trend hour, 30 days", lambda c: revenue_trend(c, month_ago, tomorrow, "hour")),
+        ("revenue_trend day, 30 days", lambda c: revenue_trend(c, month_ago, tomorrow, "day")),
+        ("revenue_trend day, 365 days", lambda c: revenue_trend(c, year_ago, tomorrow, "day")),
+        ("revenue_trend week, 365 days", lambda c: revenue_trend(c, year_ago, tomorrow, "week")),
+        ("revenue_trend month, 365 days", lambda c: revenue_trend(c, year_ago, tomorrow, "month")),
+        ("hourly_profile, 28 days", lambda c: hourly_profile(c, tomorrow - timedelta(days=28), tomorrow)),
+    ]
+    results = []
+    for label, run in cases:
+        result = measure(conn, label, run, repeat)
+        results.append(result)
+        _, seconds, rows, plans = result
+        log(f"\n{label}: {seconds * 1000:,.1f} ms median, {rows:,} rows")
+        for table, access_type, key, examined in plans:
+            log(f"  {table:<28} {access_type:<7} key={key or '-':<32} rows={examined or '?'}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the admin analytics queries on a large generated database")
+    parser.add_argument("--host", default=DB_CONFIG.get("host"))
+    parser.add_argument("--port", type=int, default=DB_CONFIG.get("port", 3306))
+    parser.add_argument("--user", default=DB_CONFIG.get("user"))
+    parser.add_argument("--password", default=DB_CONFIG.get("password"))
+    parser.add_argument("--database", required=True, help="a scratch database; filled with generated orders if it has none")
+    parser.add_argument("--orders", type=int, default=1000000, help="orders to generate (default 1,000,000)")
+    parser.add_argument("--days", type=int, default=365, help="spread generated orders over this many days (default 365)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query (default 5)")
+    args = parser.parse_args()
+
+    if args.database == DB_CONFIG.get("database") and args.host == DB_CONFIG.get("host"):
+        print("Refusing to generate orders in the app's own database; use a scratch database")
+        sys.exit(2)
+
+    conn = None
+    try:
+        conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                       password=args.password, database=args.database)
+        migrate(conn)
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM orders")
+        existing = cursor.fetchone()[0]
+        cursor.close()
+        if existing:
+            print(f"Measuring the {existing:,} orders already in {args.database}")
+        else:
+            print(f"Generating {args.orders:,} orders over {args.days} days in {args.database}")
+            seed_orders(conn, args.orders, args.days)
+        benchmark(conn, args.repeat)
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
@@ -0,0 +1,151 @@
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+import fake_gateway
+import payment
+from config import PAYMENT_WORKERS, FAKE_GATEWAY_LATENCY, FAKE_GATEWAY_JITTER, FAKE_GATEWAY_FAILURE_RATE
+
+# Checkout throughput under realistic gateway latency, offline: the
+# payment module is pointed at the in-process fake gateway.
+#
+#   --mode gateway   no database. Compares the old inline path (the
+#                    checkout render waits for order + invoice creation,
+#                    as checkout used to) with handing both calls to
+#                    a PAYMENT_WORKERS-sized pool as payment_worker does.
+#   --mode full      needs the database. Runs order_service.place_order and
+#                    payment_worker.process_job end to end for a test user.
+
+CUSTOMER = ("Benchmark Customer", "bench@example.com", "client")
+ORDER_ITEMS = [("Masala Dosa", 2, 60, "South Corner"), ("Filter Coffee", 1, 25, "South Corner")]
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return statistics.median(samples) * 1000, p95 * 1000
+
+
+def _report(label, checkouts, elapsed, render, ready=None, failures=0):
+    render_p50, render_p95 = _percentiles(render)
+    line = (f"{label:<10} {checkouts / elapsed:8.1f} checkouts/s   "
+            f"render p50 {render_p50:7.1f} ms  p95 {render_p95:7.1f} ms")
+    if ready:
+        ready_p50, ready_p95 = _percentiles(ready)
+        line += f"   pay link p50 {ready_p50:7.1f} ms  p95 {ready_p95:7.1f} ms"
+    if failures:
+        line += f"   {failures} failed"
+    print(line)
+
+
+def gateway_calls(order_id):
+    order = payment.create_gateway_order(sum(q * p for _, q, p, _ in ORDER_ITEMS), order_id)
+    invoice = payment.create_invoice(order_id, CUSTOMER, ORDER_ITEMS)
+    return order, invoice
+
+
+def run_inline(checkouts, sessions):
+    # Each session's render blocks on both gateway calls
+    def checkout(order_id):
+        start = time.perf_counter()
+        try:
+            gateway_calls(order_id)
+            ok = True
+        except fake_gateway.GatewayError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(checkout, range(1, checkouts + 1)))
+    elapsed = time.perf_counter() - start
+    _report("inline", checkouts, elapsed, [r[0] for r in results],
+            ready=[r[0] for r in results], failures=sum(not r[1] for r in results))
+
+
+def run_worker(checkouts, sessions, workers):
+    # Each session's render only enqueues; the pay link is ready once a
+    # worker has made both calls
+    worker_pool = ThreadPoolExecutor(max_workers=workers)
+
+    def job(enqueued_at, order_id):
+        for attempt in range(3):
+            try:
+                gateway_calls(order_id)
+                return time.perf_counter() - enqueued_at, True
+            except fake_gateway.GatewayError:
+                continue
+        return time.perf_counter() - enqueued_at, False
+
+    def checkout(order_id):
+        start = time.perf_counter()
+        future = worker_pool.submit(job, start, order_id)
+        return time.perf_counter() - start, future
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        submitted = list(pool.map(checkout, range(1, checkouts + 1)))
+    results = [future.result() for _, future in submitted]
+    elapsed = time.perf_counter() - start
+    worker_pool.shutdown()
+    _report("worker", checkouts, elapsed, [s[0] for s in submitted],
+            ready=[r[0] for r in results], failures=sum(not r[1] for r in results))
+
+
+def run_full(checkouts, sessions, user_id, item_id):
+    from db import connection
+    from order_service import place_order
+    import payment_worker
+
+    def checkout(n):
+        start = time.perf_counter()
+        with connection() as conn:
+            placed = place_order(conn, user_id, {item_id: 1})
+        rendered = time.perf_counter() - start
+        ok = payment_worker.process_job(placed.order_id)
+        return rendered, time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(checkout, range(checkouts)))
+    elapsed = time.perf_counter() - start
+    _report("full", checkouts, elapsed, [r[0] for r in results],
+            ready=[r[1] for r in results], failures=sum(not r[2] for r in results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark checkout against the fake payment gateway")
+    parser.add_argument("--mode", choices=["gateway", "full"], default="gateway")
+    parser.add_argument("--checkouts", type=int, default=200)
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent customers")
+    parser.add_argument("--workers", type=int, default=PAYMENT_WORKERS, help="payment worker threads")
+    parser.add_argument("--latency", type=float, default=FAKE_GATEWAY_LATENCY, help="mean seconds per gateway call")
+    parser.add_argument("--jitter", type=float, default=FAKE_GATEWAY_JITTER)
+    parser.add_argument("--failure-rate", type=float, default=FAKE_GATEWAY_FAILURE_RATE)
+    parser.add_argument("--user-id", type=int, help="customer to place orders as (--mode full)")
+    parser.add_argument("--item-id", type=int, help="menu item to order (--mode full)")
+    args = parser.parse_args()
+
+    client = fake_gateway.FakeClient(latency=args.latency, jitter=args.jitter,
+                                     failure_rate=args.failure_rate, seed=1)
+    payment.set_client(client)
+    print(f"{args.checkouts} checkouts from {args.sessions} sessions, gateway latency "
+          f"{args.latency * 1000:.0f}±{args.jitter * 1000:.0f} ms, failure rate {args.failure_rate:.0%}\n")
+
+    if args.mode == "full":
+        if args.user_id is None or args.item_id is None:
+            parser.error("--mode full needs --user-id and --item-id")
+        runs = [lambda: run_full(args.checkouts, args.sessions, args.user_id, args.item_id)]
+    else:
+        runs = [
+            lambda: run_inline(args.checkouts, args.sessions),
+            lambda: run_worker(args.checkouts, args.sessions, args.workers),
+        ]
+    for run in runs:
+        fake_gateway.reset(client.store)
+        run()
+        print(f"{'':<10} {client.stats()['calls']} gateway calls")
+
+
+if __name__ == "__main__":
+    main()
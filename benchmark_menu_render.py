@@ -0,0 +1,94 @@
+import argparse
+import io
+import os
+import tempfile
+import time
+from PIL import Image
+from convert_images import encode_variants
+from image_store import ImageCache, put_image, put_variants, variant_path, _read_file
+
+# Compares the CPU spent per menu page render on images:
+#   before: decode the stored JPEG with PIL and re-encode it (what
+#           st.image(Image.open(blob), output_format='JPEG') did per item)
+#   after:  look the pre-encoded card variant up in the in-process LRU
+# Runs against the sample photos in images/ without a database.
+
+
+def load_sources(image_dir):
+    sources = []
+    for filename in sorted(os.listdir(image_dir)):
+        if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
+            with open(os.path.join(image_dir, filename), 'rb') as f:
+                sources.append(f.read())
+    return sources
+
+
+def legacy_blob(source_bytes):
+    # What convert_images used to write into menu_items.image_blob
+    image = Image.open(io.BytesIO(source_bytes)).convert('RGB')
+    image.thumbnail((400, 400))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=95)
+    return buffer.getvalue()
+
+
+def render_before(blobs):
+    for blob in blobs:
+        image = Image.open(io.BytesIO(blob))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG')
+
+
+def render_after(cache, store_dir, hashes, fmt):
+    for image_hash in hashes:
+        cache.get_or_load(
+            (image_hash, 'card', fmt),
+            lambda: _read_file(variant_path(image_hash, 'card', fmt, store_dir))
+        )
+
+
+def measure(label, fn, pages):
+    start = time.process_time()
+    for _ in range(pages):
+        fn()
+    per_page = (time.process_time() - start) / pages
+    print(f"{label:<40} {per_page * 1000:8.3f} ms CPU / page")
+    return per_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark menu image render CPU time")
+    parser.add_argument("--images", default="images")
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    sources = load_sources(args.images)
+    if not sources:
+        print(f"No images found in {args.images}")
+        return
+    print(f"{len(sources)} menu images, {args.pages} page renders each\n")
+
+    blobs = [legacy_blob(source) for source in sources]
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        hashes = []
+        for source in sources:
+            image_hash = put_image(source, root=store_dir)
+            put_variants(image_hash, encode_variants(source), root=store_dir)
+            hashes.append(image_hash)
+
+        before = measure("before: PIL decode + JPEG re-encode", lambda: render_before(blobs), args.pages)
+        for fmt in ('jpeg', 'webp'):
+            cache = ImageCache(64 * 1024 * 1024)
+            render_after(cache, store_dir, hashes, fmt)  # first render warms the cache
+            after = measure(f"after: cached card.{fmt} bytes", lambda: render_after(cache, store_dir, hashes, fmt), args.pages)
+            print(f"{'':<40} {before / max(after, 1e-9):8.0f}x less CPU")
+
+        card_jpeg = sum(len(_read_file(variant_path(h, 'card', 'jpeg', store_dir))) for h in hashes)
+        card_webp = sum(len(_read_file(variant_path(h, 'card', 'webp', store_dir))) for h in hashes)
+        print(f"\nBytes per page: legacy blob {sum(map(len, blobs)) / 1024:.0f} KiB, "
+              f"card.jpeg {card_jpeg / 1024:.0f} KiB, card.webp {card_webp / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
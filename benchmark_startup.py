@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Measures what a fresh app process pays to import the app modules, and
+# checks that importing them never opens a network connection (e.g. to the
+# payment gateway). Each sample runs in a new interpreter so nothing is
+# cached between runs. Exits non-zero when a module goes over the budget
+# or touches the network, so it can gate a deploy.
+#
+# The budget applies to each module's own cost on top of importing
+# streamlit, which every page pays anyway.
+
+BASELINE = "streamlit"
+DEFAULT_MODULES = ["payment", "payment_worker", "ui", "main"]
+
+PROBE = r"""
+import importlib, json, socket, sys, time
+connects = []
+_connect = socket.socket.connect
+def connect(self, address):
+    connects.append(str(address))
+    return _connect(self, address)
+socket.socket.connect = connect
+start = time.perf_counter()
+error = None
+try:
+    importlib.import_module(sys.argv[1])
+except BaseException as e:
+    error = f"{type(e).__name__}: {e}"
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "connects": connects, "error": error}))
+"""
+
+
+def sample(module):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, module],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    lines = result.stdout.strip().splitlines()
+    if not lines:
+        return {"seconds": None, "connects": [], "error": result.stderr.strip().splitlines()[-1:]}
+    return json.loads(lines[-1])
+
+
+def measure(module, runs):
+    samples = [sample(module) for _ in range(runs)]
+    seconds = [s["seconds"] for s in samples if s["seconds"] is not None]
+    return {
+        "median_ms": statistics.median(seconds) * 1000 if seconds else None,
+        "connects": sorted({c for s in samples for c in s["connects"]}),
+        "error": next((s["error"] for s in samples if s["error"]), None),
+    }
+
+
+def slowest_imports(module, top):
+    # Cumulative time of the slowest imports, from python -X importtime
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            rows.append((int(parts[1]), parts[2].rstrip()))
+        except ValueError:
+            continue
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import time and check it stays off the network")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=300,
+                        help="max import cost per module on top of streamlit")
+    parser.add_argument("--top", type=int, default=0,
+                        help="also list the N slowest imports for each module")
+    args = parser.parse_args()
+
+    baseline = measure(BASELINE, args.runs)
+    baseline_ms = baseline["median_ms"] or 0
+    print(f"{'module':<20} {'import ms':>10} {'own ms':>10}  network")
+    print(f"{BASELINE:<20} {baseline_ms:10.1f} {'':>10}  -")
+
+    failed = False
+    for module in args.modules:
+        result = measure(module, args.runs)
+        if result["median_ms"] is None or result["error"]:
+            print(f"{module:<20} {'error':>10} {'':>10}  {result['error']}")
+            failed = True
+            continue
+
+        own_ms = result["median_ms"] - baseline_ms
+        status = []
+        if own_ms > args.budget_ms:
+            status.append(f"over budget ({args.budget_ms:.0f} ms)")
+        if result["connects"]:
+            status.append(f"connected to {', '.join(result['connects'])}")
+        failed = failed or bool(status)
+        print(f"{module:<20} {result['median_ms']:10.1f} {own_ms:10.1f}  "
+              f"{'; '.join(status) or 'none'}")
+
+        for micros, name in slowest_imports(module, args.top):
+            print(f"    {micros / 1000:8.1f} ms  {name}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from config import QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_TTL
+
+
+class QueryCache:
+    # Bounded LRU with per-entry TTL, shared by every Streamlit session in
+    # the process. Entries are tagged (e.g. "menu") so writers can drop
+    # everything derived from a table without knowing the exact keys.
+
+    def __init__(self, max_entries, ttl):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires at, tags, value)
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped on every invalidation
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get_or_load(self, key, loader, tags=(), ttl=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[2]
+            self._stats["misses"] += 1
+            generation = self._generation
+
+        # Load outside the lock so a slow query does not block other sessions
+        value = loader()
+        if value is None:
+            # Loaders return None on database errors; never cache those
+            return None
+
+        expires = time.monotonic() + (self._ttl if ttl is None else ttl)
+        with self._lock:
+            if generation != self._generation:
+                # A write invalidated the cache while we were loading; the
+                # value may predate it, so serve it once but do not keep it
+                return value
+            self._entries[key] = (expires, frozenset(tags), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, *tags):
+        tags = set(tags)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[1] & tags]
+            for key in stale:
+                del self._entries[key]
+            self._generation += 1
+            self._stats["invalidations"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+query_cache = QueryCache(QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_TTL)
+
+
+def cached(key, loader, tags=(), ttl=None):
+    return query_cache.get_or_load(key, loader, tags=tags, ttl=ttl)
+
+
+def invalidate(*tags):
+    query_cache.invalidate(*tags)
+
+
+def cache_stats():
+    return query_cache.stats()
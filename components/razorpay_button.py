@@ -1,23 +1,21 @@
 import streamlit as st
 import os
-from payment import client
+from invoice_index import get_invoice_url
 
 def razorpay_button(amount, order_id, razorpay_order_id, user_name, user_email):
-    # Get invoice URL for the order
+    # Get invoice URL for the order from the local index
     try:
-        invoices = client.invoice.all()
-        for invoice in invoices['items']:
-            if invoice['notes'].get('order_id') == str(order_id):
-                invoice_url = invoice['short_url']
-                # Display a single Pay Now button that links to the invoice
-                st.markdown(f"""
-                    <a href="{invoice_url}" target="_blank">
-                        <button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer; font-size: 16px; font-weight: bold;">
-                            Pay Now
-                        </button>
-                    </a>
-                """, unsafe_allow_html=True)
-                return
+        invoice_url = get_invoice_url(order_id)
+        if invoice_url:
+            # Display a single Pay Now button that links to the invoice
+            st.markdown(f"""
+                <a href="{invoice_url}" target="_blank">
+                    <button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer; font-size: 16px; font-weight: bold;">
+                        Pay Now
+                    </button>
+                </a>
+            """, unsafe_allow_html=True)
+            return
         
         # If no invoice found, create a link to the Razorpay checkout
         st.markdown(f"""
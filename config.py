@@ -15,4 +15,65 @@ DB_CONFIG = {
 
 # Razorpay configuration
 RAZORPAY_KEY_ID = os.getenv('RAZORPAY_KEY_ID', 'rzp_test_Y8mpoQXD52pv3L')
-RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET', 'Aj2MgIxIaYHpnyq8JHH83ToG') 
\ No newline at end of file
+RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET', 'Aj2MgIxIaYHpnyq8JHH83ToG') 
+
+# Connection pool settings (shared by every module through db.get_connection)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+DB_POOL_MAX_AGE = float(os.getenv('DB_POOL_MAX_AGE', 1800))  # recycle connections older than this
+DB_POOL_PING_AFTER = float(os.getenv('DB_POOL_PING_AFTER', 30))  # ping connections idle longer than this
+
+# Cross-session read cache for menu and vendor queries
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', 256))
+QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', 300))  # seconds
+
+# Content-addressed on-disk store for menu images (see image_store.py)
+IMAGE_STORE_DIR = os.getenv('IMAGE_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_store'))
+
+# Pre-encoded image variants (longest edge in px) and the in-process cache that serves them
+IMAGE_VARIANTS = {'thumb': 160, 'card': 400, 'full': 800}
+IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+IMAGE_MISS_TTL = float(os.getenv('IMAGE_MISS_TTL', 300))  # seconds a missing variant is remembered
+MENU_IMAGE_FORMAT = os.getenv('MENU_IMAGE_FORMAT', 'jpeg')  # 'jpeg' or 'webp'
+
+# Background payment worker (creates gateway orders and invoices after checkout)
+PAYMENT_WORKERS = int(os.getenv('PAYMENT_WORKERS', 4))
+PAYMENT_JOB_MAX_ATTEMPTS = int(os.getenv('PAYMENT_JOB_MAX_ATTEMPTS', 5))
+PAYMENT_JOB_STALE_AFTER = int(os.getenv('PAYMENT_JOB_STALE_AFTER', 120))  # seconds before a 'running' job is retried
+PAYMENT_JOB_RETRY_DELAY = int(os.getenv('PAYMENT_JOB_RETRY_DELAY', 10))  # seconds after the first failure, doubled per attempt
+PAYMENT_JOB_RETRY_MAX_DELAY = int(os.getenv('PAYMENT_JOB_RETRY_MAX_DELAY', 600))
+
+# How long a Razorpay health probe result is reused (see payment.gateway_health)
+GATEWAY_HEALTH_TTL = float(os.getenv('GATEWAY_HEALTH_TTL', 60))  # seconds
+
+# Razorpay webhook receiver (see webhook_server.py)
+RAZORPAY_WEBHOOK_SECRET = os.getenv('RAZORPAY_WEBHOOK_SECRET', '')
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8502))
+WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', 100))  # events written per transaction
+WEBHOOK_FLUSH_INTERVAL = float(os.getenv('WEBHOOK_FLUSH_INTERVAL', 0.05))  # seconds to wait for a batch to fill
+
+# Payment gateway backend: 'razorpay', or 'fake' for the in-process stand-in
+# in fake_gateway.py with simulated latency and failures
+PAYMENT_GATEWAY = os.getenv('PAYMENT_GATEWAY', 'razorpay')
+FAKE_GATEWAY_LATENCY = float(os.getenv('FAKE_GATEWAY_LATENCY', 0.25))  # mean seconds per call
+FAKE_GATEWAY_JITTER = float(os.getenv('FAKE_GATEWAY_JITTER', 0.1))  # +/- seconds around the mean
+FAKE_GATEWAY_FAILURE_RATE = float(os.getenv('FAKE_GATEWAY_FAILURE_RATE', 0.0))  # fraction of calls that fail
+
+# Gateway calls (see gateway_client.py): timeouts, retries and client-side rate limit
+GATEWAY_CONNECT_TIMEOUT = float(os.getenv('GATEWAY_CONNECT_TIMEOUT', 3.05))  # seconds
+GATEWAY_READ_TIMEOUT = float(os.getenv('GATEWAY_READ_TIMEOUT', 10))  # seconds
+GATEWAY_DEADLINE = float(os.getenv('GATEWAY_DEADLINE', 15))  # seconds per call, including retries and throttling
+GATEWAY_READ_RETRIES = int(os.getenv('GATEWAY_READ_RETRIES', 3))
+GATEWAY_RETRY_BACKOFF = float(os.getenv('GATEWAY_RETRY_BACKOFF', 0.25))  # seconds, doubled per retry
+GATEWAY_RATE_LIMIT = float(os.getenv('GATEWAY_RATE_LIMIT', 20))  # requests per second per process
+GATEWAY_BURST = int(os.getenv('GATEWAY_BURST', 40))
+GATEWAY_POOL_SIZE = int(os.getenv('GATEWAY_POOL_SIZE', 20))  # keep-alive HTTP connections
+
+# Orders shown per page on the vendor dashboard
+VENDOR_ORDERS_PAGE_SIZE = int(os.getenv('VENDOR_ORDERS_PAGE_SIZE', 20))
+
+# Query instrumentation (see query_trace.py)
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))  # statements at least this slow go to the slow-query log
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', 200))  # most recent slow statements kept
+QUERY_STATS_MAX_FINGERPRINTS = int(os.getenv('QUERY_STATS_MAX_FINGERPRINTS', 500))  # distinct statements tracked
@@ -4,9 +4,20 @@ from PIL import Image
 import io
 import requests
 import traceback
-from config import DB_CONFIG
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from db import connect
+from config import IMAGE_VARIANTS, IMAGE_STORE_DIR
+from image_store import hash_bytes, put_image, put_variants, has_variants, read_image
 
-def convert_image_to_blob(image_path):
+VARIANT_FORMATS = {
+    'jpeg': {'format': 'JPEG', 'quality': 85, 'optimize': True, 'progressive': True},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+}
+
+def read_image_source(image_path):
     try:
         print(f"\nProcessing image: {image_path}")
         
@@ -15,85 +26,111 @@ def convert_image_to_blob(image_path):
             print("Downloading image from URL...")
             response = requests.get(image_path)
             if response.status_code == 200:
-                image = Image.open(io.BytesIO(response.content))
-            else:
-                print(f"Failed to download image from URL: {image_path}")
-                return None
-        else:
-            # Handle local file path
-            if isinstance(image_path, bytes):
-                image_path = image_path.decode('utf-8')
-            
-            print(f"Looking for local image at: {image_path}")
-            if not os.path.exists(image_path):
-                print(f"Image file not found: {image_path}")
-                return None
-            
-            try:
-                image = Image.open(image_path)
-            except Exception as e:
-                print(f"Error opening image file: {str(e)}")
-                return None
-        
-        print(f"Image size before resize: {image.size}")
-        try:
-            image.thumbnail((400, 400))  # Resize to reasonable dimensions
-            print(f"Image size after resize: {image.size}")
-        except Exception as e:
-            print(f"Error resizing image: {str(e)}")
+                return response.content
+            print(f"Failed to download image from URL: {image_path}")
             return None
         
-        try:
-            # Convert to bytes
-            img_byte_arr = io.BytesIO()
-            image.save(img_byte_arr, format='JPEG', quality=95)
-            img_byte_arr = img_byte_arr.getvalue()
-            print(f"Image converted to blob, size: {len(img_byte_arr)} bytes")
-            return img_byte_arr
-        except Exception as e:
-            print(f"Error converting image to blob: {str(e)}")
+        # Handle local file path
+        if isinstance(image_path, bytes):
+            image_path = image_path.decode('utf-8')
+        
+        print(f"Looking for local image at: {image_path}")
+        if not os.path.exists(image_path):
+            print(f"Image file not found: {image_path}")
             return None
+        
+        with open(image_path, 'rb') as f:
+            return f.read()
             
     except Exception as e:
-        print(f"Unexpected error in convert_image_to_blob: {str(e)}")
+        print(f"Unexpected error in read_image_source: {str(e)}")
         print("Traceback:")
         print(traceback.format_exc())
         return None
 
-def update_database_with_blobs():
+def encode_variants(source_bytes):
+    # Decode once at ingestion and pre-encode every size/format the app
+    # serves, so the request path only ever ships bytes
+    image = Image.open(io.BytesIO(source_bytes))
+    image = image.convert('RGB')
+    
+    variants = {}
+    for variant, size in sorted(IMAGE_VARIANTS.items(), key=lambda v: -v[1]):
+        resized = image.copy()
+        resized.thumbnail((size, size))
+        for fmt, options in VARIANT_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, **options)
+            variants[(variant, fmt)] = buffer.getvalue()
+    return variants
+
+def encode_missing_variants(image_hashes, root=IMAGE_STORE_DIR):
+    # Variants for images that were stored before variants existed (or whose
+    # variants were lost); the menu shows a placeholder for them until then.
+    # Returns the number of images encoded.
+    encoded = 0
+    for image_hash in image_hashes:
+        if has_variants(image_hash, IMAGE_VARIANTS, VARIANT_FORMATS, root):
+            continue
+        source = read_image(image_hash, root)
+        if source is None:
+            print(f"Image {image_hash} is not in the store")
+            continue
+        try:
+            put_variants(image_hash, encode_variants(source), root)
+        except Exception as e:
+            print(f"Could not encode variants for image {image_hash}: {e}")
+            continue
+        encoded += 1
+    return encoded
+
+def update_missing_variants():
+    try:
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT image_hash FROM menu_items WHERE image_hash IS NOT NULL")
+        image_hashes = [row[0] for row in cursor.fetchall()]
+        encoded = encode_missing_variants(image_hashes)
+        print(f"Encoded variants for {encoded} of {len(image_hashes)} stored images")
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(traceback.format_exc())
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+def store_image(source_bytes):
+    # Keep the original under its content hash and the variants next to it
+    image_hash = put_image(source_bytes)
+    if not has_variants(image_hash, IMAGE_VARIANTS, VARIANT_FORMATS):
+        put_variants(image_hash, encode_variants(source_bytes))
+    return image_hash
+
+def ensure_image_hash_column(cursor):
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.columns
+        WHERE table_schema = DATABASE()
+        AND table_name = 'menu_items'
+        AND column_name = 'image_hash'
+    """)
+    if cursor.fetchone()[0] == 0:
+        print("Adding image_hash column...")
+        cursor.execute("ALTER TABLE menu_items ADD COLUMN image_hash CHAR(64) NULL")
+    else:
+        print("image_hash column already exists")
+
+def update_database_with_images():
     try:
         print("Connecting to database...")
         # Connect to database
-        conn = mysql.connector.connect(
-            host=DB_CONFIG['host'],
-            port=DB_CONFIG['port'],
-            user=DB_CONFIG['user'],
-            password=DB_CONFIG['password'],
-            database=DB_CONFIG['database']
-        )
+        conn = connect()
         cursor = conn.cursor()
         
-        print("Checking if image_blob column exists...")
-        # Check if image_blob column exists
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM information_schema.columns
-            WHERE table_name = 'menu_items'
-            AND column_name = 'image_blob'
-        """)
-        
-        column_exists = cursor.fetchone()[0] > 0
-        
-        if not column_exists:
-            print("Adding image_blob column...")
-            # Add image_blob column
-            cursor.execute("""
-                ALTER TABLE menu_items 
-                ADD COLUMN image_blob LONGBLOB
-            """)
-            print("Added image_blob column to menu_items table")
-        else:
-            print("image_blob column already exists")
+        print("Checking if image_hash column exists...")
+        ensure_image_hash_column(cursor)
         
         print("Fetching menu items with image paths...")
         # Get all menu items with image paths
@@ -110,17 +147,22 @@ def update_database_with_blobs():
             
             print(f"Image path: {image_path}")
             
-            # Convert image to blob
-            image_blob = convert_image_to_blob(image_path)
+            # Read the original image
+            source_bytes = read_image_source(image_path)
             
-            if image_blob:
-                print("Updating database with image blob...")
-                # Update the database with the blob
+            if source_bytes:
+                # Keep the bytes in the image store; the row only carries the hash
+                try:
+                    image_hash = store_image(source_bytes)
+                except Exception as e:
+                    print(f"Error encoding image variants for {name}: {str(e)}")
+                    continue
+                print(f"Stored image as {image_hash}")
                 cursor.execute("""
                     UPDATE menu_items 
-                    SET image_blob = %s 
+                    SET image_hash = %s 
                     WHERE id = %s
-                """, (image_blob, item_id))
+                """, (image_hash, item_id))
                 print(f"Successfully updated image for {name}")
             else:
                 print(f"Failed to convert image for {name}")
@@ -128,12 +170,12 @@ def update_database_with_blobs():
         # Commit changes
         print("Committing changes to database...")
         conn.commit()
-        print("\nAll images have been converted to blob format and updated in the database")
+        print("\nAll images have been written to the image store and linked in the database")
         
         # Verify the updates
-        cursor.execute("SELECT COUNT(*) FROM menu_items WHERE image_blob IS NOT NULL")
+        cursor.execute("SELECT COUNT(*) FROM menu_items WHERE image_hash IS NOT NULL")
         count = cursor.fetchone()[0]
-        print(f"Total items with blob images: {count}")
+        print(f"Total items with stored images: {count}")
         
     except mysql.connector.Error as e:
         print(f"Database error: {e}")
@@ -149,5 +191,129 @@ def update_database_with_blobs():
         if 'conn' in locals():
             conn.close()
 
+_thread_state = threading.local()
+
+def _session():
+    # One keep-alive HTTP session per download thread
+    if not hasattr(_thread_state, 'session'):
+        _thread_state.session = requests.Session()
+    return _thread_state.session
+
+def fetch_source(image_path, timeout=30):
+    if isinstance(image_path, bytes):
+        image_path = image_path.decode('utf-8')
+    if image_path.startswith(('http://', 'https://')):
+        response = _session().get(image_path, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+    with open(image_path, 'rb') as f:
+        return f.read()
+
+def _update_image_hashes(cursor, updates):
+    # One UPDATE ... CASE statement per batch instead of one per row
+    cases = " ".join(["WHEN %s THEN %s"] * len(updates))
+    placeholders = ", ".join(["%s"] * len(updates))
+    params = [value for item_id, image_hash in updates for value in (item_id, image_hash)]
+    params += [item_id for item_id, _ in updates]
+    cursor.execute(
+        f"UPDATE menu_items SET image_hash = CASE id {cases} END WHERE id IN ({placeholders})",
+        params
+    )
+
+def run_pipeline(download_workers=16, encode_workers=None, batch_size=100):
+    stats = {'items': 0, 'fetched': 0, 'fetched_bytes': 0, 'skipped': 0, 'encoded': 0, 'failed': 0}
+    started = time.perf_counter()
+    try:
+        conn = connect()
+        cursor = conn.cursor()
+        ensure_image_hash_column(cursor)
+        
+        cursor.execute("""
+            SELECT id, name, image_path, image_hash
+            FROM menu_items
+            WHERE image_path IS NOT NULL
+        """)
+        menu_items = cursor.fetchall()
+        stats['items'] = len(menu_items)
+        print(f"Found {len(menu_items)} menu items with image paths")
+        
+        pending_updates = []
+        with ThreadPoolExecutor(max_workers=download_workers) as downloads, \
+                ProcessPoolExecutor(max_workers=encode_workers) as encoders:
+            fetches = {
+                downloads.submit(fetch_source, image_path): (item_id, name, current_hash)
+                for item_id, name, image_path, current_hash in menu_items
+            }
+            encodes = {}
+            for future in as_completed(fetches):
+                item_id, name, current_hash = fetches[future]
+                try:
+                    source_bytes = future.result()
+                except Exception as e:
+                    print(f"Failed to fetch image for {name}: {e}")
+                    stats['failed'] += 1
+                    continue
+                stats['fetched'] += 1
+                stats['fetched_bytes'] += len(source_bytes)
+                
+                # Unchanged source and variants already on disk: nothing to do
+                source_hash = hash_bytes(source_bytes)
+                if source_hash == current_hash and has_variants(source_hash, IMAGE_VARIANTS, VARIANT_FORMATS):
+                    stats['skipped'] += 1
+                    continue
+                encodes[encoders.submit(store_image, source_bytes)] = (item_id, name)
+            
+            for future in as_completed(encodes):
+                item_id, name = encodes[future]
+                try:
+                    image_hash = future.result()
+                except Exception as e:
+                    print(f"Failed to encode image for {name}: {e}")
+                    stats['failed'] += 1
+                    continue
+                stats['encoded'] += 1
+                pending_updates.append((item_id, image_hash))
+                if len(pending_updates) >= batch_size:
+                    _update_image_hashes(cursor, pending_updates)
+                    conn.commit()
+                    pending_updates = []
+        
+        if pending_updates:
+            _update_image_hashes(cursor, pending_updates)
+            conn.commit()
+        
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(traceback.format_exc())
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+    
+    elapsed = time.perf_counter() - started
+    print(f"\n{stats['items']} items in {elapsed:.2f}s: {stats['encoded']} encoded, "
+          f"{stats['skipped']} unchanged, {stats['failed']} failed")
+    if elapsed > 0:
+        print(f"Throughput: {stats['items'] / elapsed:.1f} images/s, "
+              f"{stats['fetched_bytes'] / elapsed / 1024 / 1024:.2f} MiB/s fetched")
+    return stats
+
 if __name__ == "__main__":
-    update_database_with_blobs() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load menu images into the image store")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="concurrent downloads, parallel encoding, skip unchanged sources, batched updates")
+    parser.add_argument("--download-workers", type=int, default=16)
+    parser.add_argument("--encode-workers", type=int, default=None,
+                        help="encoder processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--missing-variants", action="store_true",
+                        help="only encode variants for stored images that have none")
+    args = parser.parse_args()
+    
+    if args.missing_variants:
+        update_missing_variants()
+    elif args.pipeline:
+        run_pipeline(args.download_workers, args.encode_workers, args.batch_size)
+    else:
+        update_database_with_images()
@@ -1,22 +1,226 @@
 import mysql.connector
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
 import streamlit as st
-from config import DB_CONFIG
+from query_trace import TracedCursor
+from config import (
+    DB_CONFIG,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_MAX_AGE,
+    DB_POOL_PING_AFTER,
+)
 
 # Load environment variables
 load_dotenv()
 
+
+class PooledConnection:
+    # Behaves like the raw connection, except close() hands it back to the
+    # pool instead of tearing down the socket, so existing conn.close() calls
+    # keep working unchanged, and its cursors report to query_trace
+
+    def __init__(self, pool, raw, born):
+        self._pool = pool
+        self._raw = raw
+        self._born = born
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise mysql.connector.errors.OperationalError("Connection already returned to the pool")
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return TracedCursor(self.__getattr__("cursor")(*args, **kwargs))
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool._release(raw, self._born)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Safety net for call sites that return before closing
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    # One pool per process, shared by every Streamlit session and thread
+
+    def __init__(self, config, size, timeout, max_age, ping_after):
+        self._config = dict(config)
+        self._size = size
+        self._timeout = timeout
+        self._max_age = max_age
+        self._ping_after = ping_after
+        self._idle = deque()  # (raw connection, created at, returned at)
+        self._open = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "checked_out": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+        }
+
+    def _connect(self):
+        raw = mysql.connector.connect(**self._config)
+        with self._cond:
+            self._stats["created"] += 1
+        return raw, time.monotonic()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._open -= 1
+            self._stats["recycled"] += 1
+            self._cond.notify()
+
+    def _is_usable(self, raw, born, returned_at):
+        now = time.monotonic()
+        if now - born > self._max_age:
+            return False
+        if now - returned_at > self._ping_after:
+            # Only pay for a round-trip when the connection sat idle long
+            # enough for the server (or a proxy) to have dropped it
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def acquire(self):
+        deadline = time.monotonic() + self._timeout
+        while True:
+            with self._cond:
+                idle = None
+                create = False
+                waited = False
+                while idle is None and not create:
+                    if self._idle:
+                        idle = self._idle.pop()
+                    elif self._open < self._size:
+                        self._open += 1
+                        create = True
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats["timeouts"] += 1
+                            raise mysql.connector.errors.PoolError(
+                                f"No free database connection after {self._timeout:.0f}s "
+                                f"({self._size} checked out)"
+                            )
+                        if not waited:
+                            self._stats["waits"] += 1
+                            waited = True
+                        self._cond.wait(remaining)
+
+            if create:
+                try:
+                    raw, born = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                raw, born, returned_at = idle
+                if not self._is_usable(raw, born, returned_at):
+                    self._discard(raw)
+                    continue
+
+            with self._cond:
+                self._stats["checked_out"] += 1
+                self._stats["checkouts"] += 1
+            return PooledConnection(self, raw, born)
+
+    def _release(self, raw, born):
+        healthy = True
+        try:
+            # Never hand the next caller an open transaction (or the stale
+            # REPEATABLE READ snapshot that comes with it)
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            self._stats["checked_out"] -= 1
+
+        if not healthy or time.monotonic() - born > self._max_age:
+            self._discard(raw)
+            return
+
+        with self._cond:
+            self._idle.append((raw, born, time.monotonic()))
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["open"] = self._open
+            stats["size"] = self._size
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    DB_CONFIG,
+                    size=DB_POOL_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    max_age=DB_POOL_MAX_AGE,
+                    ping_after=DB_POOL_PING_AFTER,
+                )
+    return _pool
+
+
+def connect():
+    # Check a connection out of the shared pool (raises mysql.connector.Error)
+    return get_pool().acquire()
+
+
+@contextmanager
+def connection():
+    conn = connect()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def pool_stats():
+    return get_pool().stats()
+
+
 def get_connection():
     try:
-        conn = mysql.connector.connect(
-            host=DB_CONFIG['host'],
-            port=DB_CONFIG['port'],
-            user=DB_CONFIG['user'],
-            password=DB_CONFIG['password'],
-            database=DB_CONFIG['database']
-        )
-        return conn
+        return connect()
     except mysql.connector.Error as e:
         st.error(f"Database connection error: {str(e)}")
         return None
@@ -1,5 +1,12 @@
 import os
+import json
+import hashlib
+import argparse
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PIL import Image
 from io import BytesIO
 
@@ -31,32 +38,173 @@ FOOD_IMAGES = {
     'coffee': 'https://www.nestleprofessional.com.my/sites/default/files/styles/np_hero_small_small/public/2022-11/Coffee_Soluble-Coffee.jpg?itok=d4GMr782'
 }
 
-def download_image(url, filename):
+MANIFEST_NAME = '.download_manifest.json'
+
+OUTCOME_LABELS = {
+    'downloaded': 'Downloaded',
+    'resumed': 'Already have',
+    'duplicates': 'Reused duplicate',
+}
+
+def create_session(workers, retries=3):
+    # Keep-alive connections shared across worker threads, sized so no
+    # worker waits on the pool, with retries for transient server errors
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET'])
+    )
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def load_manifest(path):
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            image = Image.open(BytesIO(response.content))
-            # Resize image to a reasonable size
-            image.thumbnail((800, 800))
-            image.save(os.path.join('images', filename))
-            return True
-    except Exception as e:
-        print(f"Error downloading {filename}: {e}")
-    return False
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
 
-def main():
-    # Create images directory if it doesn't exist
-    if not os.path.exists('images'):
-        os.makedirs('images')
+def save_manifest(path, manifest):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def is_complete(entry, url, dest):
+    # Resume: the manifest says we fetched this URL and the file on disk is
+    # still exactly what we wrote
+    if not entry or entry.get('url') != url:
+        return False
+    path = os.path.join(dest, entry['filename'])
+    return os.path.exists(path) and file_sha256(path) == entry['file_sha256']
+
+def download_image(session, url, timeout=30):
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    content = response.content
+    # Reject anything that is not a decodable image before it reaches images/
+    Image.open(BytesIO(content)).verify()
+    return content
+
+def encode_image(content):
+    image = Image.open(BytesIO(content))
+    # Resize image to a reasonable size
+    image.thumbnail((800, 800))
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+def write_atomic(path, data):
+    tmp_path = f"{path}.part"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def download_all(images=FOOD_IMAGES, dest='images', workers=8, session=None, timeout=30):
+    os.makedirs(dest, exist_ok=True)
+    manifest_path = os.path.join(dest, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    lock = threading.Lock()
+    session = session or create_session(workers)
+    
+    # Source hashes we already have on disk, for de-duplication. Files that
+    # changed since they were written don't count, or a re-fetch would be
+    # pointed back at the damaged copy
+    by_source = {
+        entry['source_sha256']: entry['filename']
+        for entry in manifest.values()
+        if is_complete(entry, entry['url'], dest)
+    }
+    in_flight = {}
     
-    # Download images for all menu items
-    for item_name, url in FOOD_IMAGES.items():
+    results = {'downloaded': 0, 'resumed': 0, 'duplicates': 0, 'failed': 0}
+    
+    def fetch(item_name, url):
         # Convert item name to lowercase and replace spaces with underscores
         filename = f"{item_name.lower().replace(' ', '_')}.jpg"
-        if download_image(url, filename):
-            print(f"Downloaded {filename} for {item_name}")
-        else:
-            print(f"Failed to download {filename} for {item_name}")
+        with lock:
+            entry = manifest.get(item_name)
+        if is_complete(entry, url, dest):
+            return 'resumed', entry['filename']
+        
+        content = download_image(session, url, timeout)
+        source_sha256 = hashlib.sha256(content).hexdigest()
+        
+        # Claim the content hash so two items with identical bytes fetched
+        # concurrently produce one file, not two
+        with lock:
+            existing = by_source.get(source_sha256)
+            if existing is None:
+                by_source[source_sha256] = filename
+                in_flight[source_sha256] = threading.Event()
+            writer_done = in_flight.get(source_sha256)
+        
+        if existing is not None:
+            if writer_done:
+                writer_done.wait()
+            existing_path = os.path.join(dest, existing)
+            if os.path.exists(existing_path):
+                # Same bytes as an image we already have: point at it instead
+                # of writing a second copy
+                outcome, filename = 'duplicates', existing
+                written_sha256 = file_sha256(existing_path)
+            else:
+                existing = None
+        
+        if existing is None:
+            try:
+                data = encode_image(content)
+                write_atomic(os.path.join(dest, filename), data)
+            finally:
+                if writer_done:
+                    writer_done.set()
+            outcome = 'downloaded'
+            written_sha256 = hashlib.sha256(data).hexdigest()
+        
+        with lock:
+            manifest[item_name] = {
+                'url': url,
+                'filename': filename,
+                'source_sha256': source_sha256,
+                'file_sha256': written_sha256,
+            }
+            # Persist after every item so an interrupted run resumes here
+            save_manifest(manifest_path, manifest)
+        return outcome, filename
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch, name, url): name for name, url in images.items()}
+        for future in as_completed(futures):
+            item_name = futures[future]
+            try:
+                outcome, filename = future.result()
+                results[outcome] += 1
+                print(f"{OUTCOME_LABELS[outcome]} {filename} for {item_name}")
+            except Exception as e:
+                results['failed'] += 1
+                print(f"Failed to download image for {item_name}: {e}")
+    
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Download menu images into images/")
+    parser.add_argument("--dest", default="images")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    
+    results = download_all(dest=args.dest, workers=args.workers)
+    print(f"\n{results['downloaded']} downloaded, {results['resumed']} already complete, "
+          f"{results['duplicates']} duplicates, {results['failed']} failed")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,396 @@
+import argparse
+import ast
+import glob
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import Optional
+import mysql.connector
+from config import DB_CONFIG
+
+# Query plan regression check for the SQL embedded in the app.
+#
+# Every cursor.execute(...) / executemany(...) / execute_query(...) call
+# whose query is a string literal, an f-string or a module-level string
+# constant is pulled out of the source with ast. Each query is then
+#   - linted for non-sargable predicates such as DATE(o.created_at) BETWEEN,
+#     which hide an indexed column inside a function (no database needed)
+#   - run through EXPLAIN FORMAT=JSON against a seeded MySQL, flagging full
+#     table scans and filesorts / temporary tables whose row estimate is
+#     above --max-rows, and any table examining more than --max-rows rows
+#     in a variant listed in BOUNDED
+#
+# Known findings are kept in explain_baseline.json; the check fails only on
+# new ones, so a query that regresses (or a new query that scans) is caught
+# before it ships.
+#
+# EXPLAIN runs against a local scratch database, never the app's own: there
+# are no connection defaults from config.py, and --database naming the
+# app's database is refused. `python benchmark_analytics.py --database
+# canteen_bench` migrates and fills one.
+#
+#   python explain_check.py --static                                    # lint only
+#   python explain_check.py --database canteen_bench                    # lint + EXPLAIN
+#   python explain_check.py --database canteen_bench --write-baseline   # accept current findings
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(ROOT, "explain_baseline.json")
+SOURCE_GLOBS = ["*.py", "components/*.py"]
+# Tools, not app queries; the benchmark runs the old DATE() query on purpose
+NOT_APP_SOURCES = {"explain_check.py", "benchmark_analytics.py"}
+QUERY_CALLS = {"execute", "executemany", "execute_query"}
+EXPLAINABLE = re.compile(r"^\s*(SELECT|UPDATE|DELETE|INSERT\b.*?\bSELECT\b)", re.IGNORECASE | re.DOTALL)
+
+# How to fill in the f-string fragments the app builds queries from. A
+# fragment with several alternatives is checked once per alternative;
+# queries with any other fragment are reported as skipped.
+FRAGMENTS = {
+    "placeholders": ["%s, %s, %s"],
+    "values": ["(%s)"],
+    "cases": ["WHEN %s THEN %s WHEN %s THEN %s"],
+    "pairs": ["(%s, %s), (%s, %s)"],
+    "scope": ["user", "vendor"],         # order_feed scopes
+    "bucket_sql": [                       # analytics.revenue_trend
+        "r.day",
+        "DATE_SUB(r.day, INTERVAL WEEKDAY(r.day) DAY)",
+        "DATE_SUB(r.day, INTERVAL DAYOFMONTH(r.day) - 1 DAY)",
+    ],
+    "' AND '.join(order_conditions)": [   # analytics hour queries, all vendors / one
+        "o.created_at >= %s AND o.created_at < %s",
+        "o.created_at >= %s AND o.created_at < %s AND oi.vendor_id = %s",
+    ],
+    "' AND '.join(rollup_conditions)": [  # analytics.revenue_trend day / week / month
+        "r.day >= %s AND r.day < %s",
+        "r.day >= %s AND r.day < %s AND r.vendor_id = %s",
+    ],
+    "' AND '.join(conditions)": [         # order_service.vendor_order_page, All
+        "oi.vendor_id = %s",
+        "oi.vendor_id = %s AND oi.order_id < %s",
+    ],
+    "' AND '.join(active_conditions)": [  # order_service.vendor_order_page, Active
+        "vos.vendor_id = %s AND vos.status IN ('pending', 'ready')",
+        "vos.vendor_id = %s AND vos.status IN ('pending', 'ready') AND vos.order_id < %s",
+    ],
+}
+
+# Alternatives whose query must read a bounded number of rows however large
+# the tables grow, so any table examining more than --max-rows is a finding
+# even when it is read through an index
+BOUNDED = {
+    "vos.vendor_id = %s AND vos.status IN ('pending', 'ready')",
+    "vos.vendor_id = %s AND vos.status IN ('pending', 'ready') AND vos.order_id < %s",
+}
+
+# A function (or cast) around a column on the left of a comparison
+NON_SARGABLE = re.compile(
+    r"\b(DATE|YEAR|MONTH|DAY|HOUR|LOWER|UPPER|TRIM|CAST|COALESCE|IFNULL|CONCAT)\s*\(\s*[\w.]+[^()]*\)"
+    r"\s*(=|<|>|<=|>=|<>|!=|BETWEEN\b|IN\b|LIKE\b)",
+    re.IGNORECASE
+)
+LEADING_WILDCARD = re.compile(r"\bLIKE\s+'%", re.IGNORECASE)
+DATE_COLUMN = re.compile(r"(_at|date|day)\b[^,()]*$", re.IGNORECASE)
+
+
+@dataclass
+class Query:
+    path: str
+    line: int
+    function: str
+    sql: str
+    variant: Optional[str] = None
+    bounded: bool = False
+
+    @property
+    def key(self):
+        # Stable across line moves; changes when the SQL itself changes
+        normalized = " ".join(self.sql.split())
+        digest = hashlib.sha1(normalized.encode()).hexdigest()[:10]
+        return f"{self.path}:{self.function}:{digest}"
+
+    @property
+    def where(self):
+        return f"{self.path}:{self.line} ({self.function})"
+
+
+@dataclass
+class Finding:
+    query: Query
+    kind: str  # non_sargable, full_scan, filesort, temporary, unbounded, explain_error
+    detail: str
+
+    @property
+    def key(self):
+        return f"{self.query.key}:{self.kind}:{self.detail.split(' ')[0]}"
+
+
+def _string_constants(tree):
+    constants = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)):
+            constants[node.targets[0].id] = node.value.value
+    return constants
+
+
+def _render(node, constants):
+    # [(sql, variant, bounded)] for a query argument, [] if it cannot be resolved
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [(node.value, None, False)]
+    if isinstance(node, ast.Name) and node.id in constants:
+        return [(constants[node.id], None, False)]
+    if not isinstance(node, ast.JoinedStr):
+        return []
+    # A fragment used more than once takes the same alternative everywhere
+    pieces = []
+    fragments = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            pieces.append((value.value, None))
+            continue
+        fragment = ast.unparse(value.value)
+        if fragment not in FRAGMENTS:
+            return []
+        pieces.append((None, fragment))
+        if fragment not in fragments:
+            fragments.append(fragment)
+    rendered = []
+    for combination in itertools.product(*(FRAGMENTS[fragment] for fragment in fragments)):
+        chosen = dict(zip(fragments, combination))
+        variant = ", ".join(
+            f"{fragment}={alt}" for fragment, alt in chosen.items() if len(FRAGMENTS[fragment]) > 1
+        ) or None
+        bounded = any(alt in BOUNDED for alt in combination)
+        sql = "".join(text if fragment is None else chosen[fragment] for text, fragment in pieces)
+        rendered.append((sql, variant, bounded))
+    return rendered
+
+
+def extract_queries(root=ROOT):
+    # Returns (queries, skipped) where skipped lists dynamic queries as "path:line"
+    queries = []
+    skipped = []
+    paths = sorted({p for pattern in SOURCE_GLOBS for p in glob.glob(os.path.join(root, pattern))})
+    paths = [p for p in paths if os.path.basename(p) not in NOT_APP_SOURCES]
+    for path in paths:
+        relative = os.path.relpath(path, root)
+        with open(path) as f:
+            tree = ast.parse(f.read(), relative)
+        constants = _string_constants(tree)
+
+        # Innermost enclosing function for each call
+        owners = {}
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                for child in ast.walk(node):
+                    if child is not node:
+                        owners[id(child)] = node.name
+
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call) or not node.args:
+                continue
+            func = node.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+            if name not in QUERY_CALLS:
+                continue
+            rendered = _render(node.args[0], constants)
+            if not rendered:
+                # Pass-through helpers (execute_query's own `query`, the
+                # migration runner) are not app queries
+                if not isinstance(node.args[0], ast.Name):
+                    skipped.append(f"{relative}:{node.lineno}")
+                continue
+            function = owners.get(id(node), "<module>")
+            for sql, variant, bounded in rendered:
+                queries.append(Query(relative, node.lineno, function, sql, variant, bounded))
+    return queries, skipped
+
+
+def sample_sql(sql):
+    # Replace %s with a literal EXPLAIN can plan with. Lower bounds get the
+    # smallest value and upper bounds the largest, so ranges are planned at
+    # their widest; everything else is a quoted '1', which MySQL compares
+    # against both integer and string columns without losing the index.
+    out = []
+    last = 0
+    for match in re.finditer(r"%s", sql):
+        before = sql[max(0, match.start() - 40):match.start()]
+        operator = re.search(r"(>=|<=|<|>|BETWEEN|AND)?\s*$", before, re.IGNORECASE).group(1) or ""
+        is_date = DATE_COLUMN.search(before) is not None
+        if re.search(r"\bLIMIT\s*$", before, re.IGNORECASE):
+            value = "20"
+        elif operator in (">", ">=") or operator.upper() == "BETWEEN":
+            value = "'2000-01-01 00:00:00'" if is_date else "'0'"
+        elif operator in ("<", "<=") or (operator.upper() == "AND" and is_date):
+            value = "'2100-01-01 00:00:00'" if is_date else "'2147483647'"
+        else:
+            value = "'1'"
+        out.append(sql[last:match.start()])
+        out.append(value)
+        last = match.end()
+    out.append(sql[last:])
+    return "".join(out)
+
+
+def static_findings(query):
+    findings = []
+    for match in NON_SARGABLE.finditer(query.sql):
+        findings.append(Finding(query, "non_sargable", f"{' '.join(match.group(0).split())} hides the column from its index"))
+    if LEADING_WILDCARD.search(query.sql):
+        findings.append(Finding(query, "non_sargable", "LIKE with a leading % cannot use an index"))
+    return findings
+
+
+def _max_rows(node):
+    rows = 0
+    if isinstance(node, dict):
+        table = node.get("table")
+        if isinstance(table, dict):
+            rows = max(rows, table.get("rows_examined_per_scan") or 0)
+        for value in node.values():
+            rows = max(rows, _max_rows(value))
+    elif isinstance(node, list):
+        for value in node:
+            rows = max(rows, _max_rows(value))
+    return rows
+
+
+def plan_findings(query, plan, max_rows):
+    findings = []
+
+    def walk(node):
+        if isinstance(node, list):
+            for value in node:
+                walk(value)
+            return
+        if not isinstance(node, dict):
+            return
+        table = node.get("table")
+        if isinstance(table, dict):
+            rows = table.get("rows_examined_per_scan") or 0
+            if table.get("access_type") == "ALL" and rows > max_rows:
+                findings.append(Finding(query, "full_scan", f"{table.get('table_name')} ~{rows} rows"))
+        for flag, kind in (("using_filesort", "filesort"), ("using_temporary_table", "temporary")):
+            if node.get(flag):
+                rows = _max_rows(node)
+                if rows > max_rows:
+                    findings.append(Finding(query, kind, f"{flag.split('_', 1)[1]} over ~{rows} rows"))
+        for value in node.values():
+            walk(value)
+
+    walk(plan)
+    if query.bounded:
+        rows = _max_rows(plan)
+        if rows > max_rows:
+            findings.append(Finding(query, "unbounded", f"~{rows} rows examined"))
+    return findings
+
+
+def explain(cursor, query):
+    cursor.execute("EXPLAIN FORMAT=JSON " + sample_sql(query.sql))
+    return json.loads(cursor.fetchone()[0])
+
+
+def check(queries, cursor=None, max_rows=1000):
+    findings = []
+    explained = 0
+    for query in queries:
+        findings.extend(static_findings(query))
+        if cursor is None or not EXPLAINABLE.match(query.sql):
+            continue
+        try:
+            plan = explain(cursor, query)
+        except mysql.connector.Error as e:
+            findings.append(Finding(query, "explain_error", str(e)))
+            continue
+        explained += 1
+        findings.extend(plan_findings(query, plan, max_rows))
+    return findings, explained
+
+
+def load_baseline(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return set(json.load(f))
+
+
+def write_baseline(findings, path=BASELINE_FILE):
+    with open(path, "w") as f:
+        json.dump(sorted({finding.key for finding in findings}), f, indent=2)
+        f.write("\n")
+
+
+def _print_findings(title, findings):
+    print(f"\n{title} ({len(findings)}):")
+    for finding in findings:
+        variant = f" [{finding.query.variant}]" if finding.query.variant else ""
+        print(f"  {finding.kind:<13} {finding.query.where}{variant}: {finding.detail}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the app's SQL for full scans, filesorts and non-sargable predicates")
+    parser.add_argument("--static", action="store_true", help="only lint the SQL, don't connect to MySQL")
+    parser.add_argument("--max-rows", type=int, default=1000,
+                        help="flag scans / sorts whose row estimate is above this (default 1000)")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", help="a seeded scratch database (required unless --static)")
+    parser.add_argument("--write-baseline", action="store_true", help=f"accept current findings into {os.path.basename(BASELINE_FILE)}")
+    parser.add_argument("--verbose", action="store_true", help="also list baselined findings and skipped queries")
+    args = parser.parse_args(argv)
+
+    if not args.static and not args.database:
+        parser.error("--database is required unless --static")
+    if args.write_baseline and args.static:
+        # A lint-only baseline would drop every accepted plan finding
+        parser.error("--write-baseline needs --database, not --static")
+    if args.database and args.database == DB_CONFIG.get("database"):
+        print("Refusing to EXPLAIN against the app's own database; use a seeded scratch database")
+        return 2
+
+    queries, skipped = extract_queries()
+    conn = None
+    cursor = None
+    try:
+        if not args.static:
+            conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                           password=args.password, database=args.database)
+            cursor = conn.cursor()
+        findings, explained = check(queries, cursor, args.max_rows)
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        return 2
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+    print(f"{len(queries)} queries from the source, {explained} explained, {len(skipped)} skipped as dynamic")
+    if args.write_baseline:
+        write_baseline(findings)
+        print(f"Wrote {len(findings)} findings to {BASELINE_FILE}")
+        return 0
+
+    baseline = load_baseline()
+    new = [f for f in findings if f.key not in baseline]
+    if args.verbose:
+        _print_findings("Baselined findings", [f for f in findings if f.key in baseline])
+        if skipped:
+            print(f"\nSkipped: {', '.join(skipped)}")
+    if new:
+        _print_findings("New findings", new)
+        return 1
+    print("No new plan regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
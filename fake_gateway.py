@@ -0,0 +1,239 @@
+import random
+import threading
+import time
+import uuid
+
+# In-process stand-in for the parts of razorpay.Client this app uses
+# (client.order / client.payment / client.invoice), for load and
+# integration testing without the network. Select it with
+# PAYMENT_GATEWAY=fake; every call sleeps for the configured latency and
+# fails at the configured rate, so checkout can be benchmarked under
+# realistic gateway behaviour.
+#
+# All clients in a process share one store, so the payment worker, the UI
+# and scripts see the same orders, payments and invoices.
+
+
+class GatewayError(Exception):
+    pass
+
+
+class BadRequestError(GatewayError):
+    pass
+
+
+class ServerError(GatewayError):
+    pass
+
+
+class FakeStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.orders = {}
+        self.payments = {}
+        self.invoices = {}
+        self.calls = 0
+
+
+_store = FakeStore()
+
+
+def _new_id(prefix):
+    return f"{prefix}_fake{uuid.uuid4().hex[:14]}"
+
+
+def _page(items, options):
+    # Razorpay list semantics: newest first, from/to on created_at, count/skip
+    options = options or {}
+    if 'from' in options:
+        items = [i for i in items if i['created_at'] >= int(options['from'])]
+    if 'to' in options:
+        items = [i for i in items if i['created_at'] <= int(options['to'])]
+    items = sorted(items, key=lambda i: i['created_at'], reverse=True)
+    skip = int(options.get('skip', 0))
+    count = min(int(options.get('count', 10)), 100)
+    page = items[skip:skip + count]
+    return {"entity": "collection", "count": len(page), "items": page}
+
+
+class _Resource:
+    def __init__(self, client):
+        self._client = client
+        self._store = client.store
+
+    def _call(self):
+        self._client.simulate()
+
+
+class FakeOrders(_Resource):
+    def create(self, data=None, **kwargs):
+        self._call()
+        data = data or {}
+        if int(data.get('amount', 0)) < 100:
+            raise BadRequestError("Order amount less than minimum amount allowed")
+        order = {
+            "id": _new_id("order"),
+            "entity": "order",
+            "amount": int(data['amount']),
+            "amount_paid": 0,
+            "currency": data.get('currency', 'INR'),
+            "receipt": data.get('receipt'),
+            "status": "created",
+            "attempts": 0,
+            "notes": data.get('notes') or [],
+            "created_at": int(time.time()),
+        }
+        with self._store.lock:
+            self._store.orders[order['id']] = order
+        return dict(order)
+
+    def fetch(self, order_id, data=None, **kwargs):
+        self._call()
+        with self._store.lock:
+            order = self._store.orders.get(order_id)
+        if order is None:
+            raise BadRequestError("The id provided does not exist")
+        return dict(order)
+
+    def all(self, data=None, **kwargs):
+        self._call()
+        data = data or {}
+        with self._store.lock:
+            orders = list(self._store.orders.values())
+        if data.get('receipt'):
+            orders = [o for o in orders if o['receipt'] == data['receipt']]
+        return _page(orders, data)
+
+
+class FakePayments(_Resource):
+    def fetch(self, payment_id, data=None, **kwargs):
+        self._call()
+        with self._store.lock:
+            payment = self._store.payments.get(payment_id)
+        if payment is None:
+            raise BadRequestError("The id provided does not exist")
+        return dict(payment)
+
+    def all(self, data=None, **kwargs):
+        self._call()
+        with self._store.lock:
+            payments = list(self._store.payments.values())
+        return _page(payments, data)
+
+
+class FakeInvoices(_Resource):
+    def create(self, data=None, **kwargs):
+        self._call()
+        data = data or {}
+        line_items = data.get('line_items') or []
+        if not line_items:
+            raise BadRequestError("line_items is required")
+        invoice_id = _new_id("inv")
+        invoice = {
+            "id": invoice_id,
+            "entity": "invoice",
+            "type": data.get('type', 'invoice'),
+            "description": data.get('description'),
+            "customer_details": data.get('customer') or {},
+            "line_items": line_items,
+            "amount": sum(int(i['amount']) * int(i.get('quantity', 1)) for i in line_items),
+            "currency": data.get('currency', 'INR'),
+            "order_id": None,
+            "receipt": data.get('receipt'),
+            "status": "issued",
+            "short_url": f"http://localhost/fake-gateway/{invoice_id}",
+            "notes": data.get('notes') or [],
+            "created_at": int(time.time()),
+        }
+        with self._store.lock:
+            self._store.invoices[invoice_id] = invoice
+        return dict(invoice)
+
+    def fetch(self, invoice_id, data=None, **kwargs):
+        self._call()
+        with self._store.lock:
+            invoice = self._store.invoices.get(invoice_id)
+        if invoice is None:
+            raise BadRequestError("The id provided does not exist")
+        return dict(invoice)
+
+    def all(self, data=None, **kwargs):
+        self._call()
+        data = data or {}
+        with self._store.lock:
+            invoices = list(self._store.invoices.values())
+        if data.get('receipt'):
+            invoices = [i for i in invoices if i['receipt'] == data['receipt']]
+        return _page(invoices, data)
+
+
+class FakeClient:
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, seed=None, store=None):
+        # latency: mean seconds per call; jitter: +/- uniform spread around
+        # it; failure_rate: fraction of calls that raise ServerError
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.store = store or _store
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.order = FakeOrders(self)
+        self.payment = FakePayments(self)
+        self.invoice = FakeInvoices(self)
+
+    def simulate(self):
+        with self._random_lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            fail = self._random.random() < self.failure_rate
+        with self.store.lock:
+            self.store.calls += 1
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise ServerError("Simulated gateway failure")
+
+    def pay(self, razorpay_order_id, captured=True):
+        # Simulate the customer paying: records a payment against the order
+        # and settles the order (and any invoice for it) when captured
+        with self.store.lock:
+            order = self.store.orders.get(razorpay_order_id)
+            if order is None:
+                raise BadRequestError("The id provided does not exist")
+            payment = {
+                "id": _new_id("pay"),
+                "entity": "payment",
+                "amount": order['amount'],
+                "currency": order['currency'],
+                "status": "captured" if captured else "failed",
+                "order_id": razorpay_order_id,
+                "notes": order['notes'],
+                "created_at": int(time.time()),
+            }
+            self.store.payments[payment['id']] = payment
+            order['attempts'] += 1
+            if captured:
+                order['status'] = 'paid'
+                order['amount_paid'] = order['amount']
+                for invoice in self.store.invoices.values():
+                    if invoice['notes'] == order['notes'] or invoice['order_id'] == razorpay_order_id:
+                        invoice['status'] = 'paid'
+        return dict(payment)
+
+    def stats(self):
+        with self.store.lock:
+            return {
+                "calls": self.store.calls,
+                "orders": len(self.store.orders),
+                "payments": len(self.store.payments),
+                "invoices": len(self.store.invoices),
+            }
+
+
+def reset(store=None):
+    # Drop everything in the shared store (between benchmark runs)
+    store = store or _store
+    with store.lock:
+        store.orders.clear()
+        store.payments.clear()
+        store.invoices.clear()
+        store.calls = 0
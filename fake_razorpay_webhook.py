@@ -0,0 +1,123 @@
+import argparse
+import hashlib
+import hmac
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from config import RAZORPAY_WEBHOOK_SECRET, WEBHOOK_PORT
+
+# Stands in for Razorpay when developing against webhook_server.py: builds
+# events in Razorpay's payload shape, signs them with the webhook secret and
+# posts them, optionally concurrently and with redeliveries or bad
+# signatures mixed in.
+#
+#   python fake_razorpay_webhook.py --order-id 42
+#   python fake_razorpay_webhook.py --order-id 42 43 44 --redeliver 3 --concurrency 8
+
+
+def build_event(event, order_id=None, razorpay_order_id=None, amount=10000):
+    razorpay_order_id = razorpay_order_id or f"order_fake{uuid.uuid4().hex[:10]}"
+    notes = {"order_id": str(order_id)} if order_id is not None else []
+    payment = {
+        "id": f"pay_fake{uuid.uuid4().hex[:10]}",
+        "entity": "payment",
+        "amount": amount,
+        "currency": "INR",
+        "status": "failed" if event == "payment.failed" else "captured",
+        "order_id": razorpay_order_id,
+        "notes": notes,
+    }
+    payload = {"payment": {"entity": payment}}
+    if event == "order.paid":
+        payload["order"] = {"entity": {
+            "id": razorpay_order_id,
+            "entity": "order",
+            "amount": amount,
+            "status": "paid",
+            "receipt": f"order_{order_id}" if order_id is not None else None,
+            "notes": notes,
+        }}
+    return {
+        "entity": "event",
+        "event": event,
+        "contains": list(payload),
+        "payload": payload,
+        "created_at": int(time.time()),
+    }
+
+
+def sign(body, secret):
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def post(url, body, secret, event_id, bad_signature=False):
+    signature = sign(body, secret)
+    if bad_signature:
+        signature = signature[::-1]
+    request = urllib.request.Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        "X-Razorpay-Signature": signature,
+        "X-Razorpay-Event-Id": event_id,
+    })
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Post signed fake Razorpay webhooks")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{WEBHOOK_PORT}/razorpay/webhook")
+    parser.add_argument("--secret", default=RAZORPAY_WEBHOOK_SECRET)
+    parser.add_argument("--event", default="payment.captured",
+                        choices=["payment.captured", "order.paid", "payment.failed"])
+    parser.add_argument("--order-id", type=int, nargs="*", default=[],
+                        help="our order ids (sent in notes.order_id)")
+    parser.add_argument("--razorpay-order-id", nargs="*", default=[],
+                        help="gateway order ids, sent without notes")
+    parser.add_argument("--amount", type=int, default=10000, help="paise")
+    parser.add_argument("--redeliver", type=int, default=1,
+                        help="send each event this many times with the same event id")
+    parser.add_argument("--bad-signature", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    if not args.secret:
+        parser.error("no secret: set RAZORPAY_WEBHOOK_SECRET or pass --secret")
+
+    events = [build_event(args.event, order_id=o, amount=args.amount) for o in args.order_id]
+    events += [build_event(args.event, razorpay_order_id=r, amount=args.amount) for r in args.razorpay_order_id]
+    if not events:
+        parser.error("pass at least one --order-id or --razorpay-order-id")
+
+    deliveries = []
+    for event in events:
+        body = json.dumps(event).encode()
+        event_id = f"evt_fake{uuid.uuid4().hex[:14]}"
+        deliveries.extend([(body, event_id)] * args.redeliver)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(
+            lambda d: post(args.url, d[0], args.secret, d[1], args.bad_signature), deliveries
+        ))
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter(status for status, _ in results)
+    latencies = sorted(seconds * 1000 for _, seconds in results)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"Sent {len(results)} deliveries of {len(events)} {args.event} events in {elapsed:.2f}s")
+    print("Responses: " + ", ".join(f"{status} x{count}" for status, count in sorted(statuses.items())))
+    print(f"Latency: p50 {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import bisect
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from config import (
+    GATEWAY_CONNECT_TIMEOUT, GATEWAY_READ_TIMEOUT, GATEWAY_DEADLINE,
+    GATEWAY_READ_RETRIES, GATEWAY_RETRY_BACKOFF, GATEWAY_RATE_LIMIT,
+    GATEWAY_BURST, GATEWAY_POOL_SIZE
+)
+
+# Wraps a gateway client (razorpay.Client or fake_gateway.FakeClient) so no
+# call can hold a Streamlit or worker thread indefinitely:
+#   - one pooled, keep-alive HTTP session shared by every call
+#   - connect/read timeouts on every request, capped by a per-call deadline
+#   - reads (all/fetch) retried with full-jitter exponential backoff;
+#     creates are only retried when the gateway rejected them with 429
+#   - a process-wide token bucket that pauses when the gateway rate-limits
+#   - latency histograms per endpoint, e.g. "invoice.create"
+
+READ_METHODS = {"all", "fetch"}
+HISTOGRAM_BOUNDS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class GatewayTimeout(Exception):
+    pass
+
+
+class GatewayThrottled(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, deadline):
+        # Blocks until a token is free; raises GatewayThrottled if that
+        # would be after the monotonic deadline
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = max(self._paused_until - now, 0.0)
+                if not wait and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                if not wait:
+                    wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                raise GatewayThrottled("Gateway rate limit: no request slot before the deadline")
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        # Gateway said 429: stop handing out tokens for a while
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+class LatencyHistogram:
+    def __init__(self, bounds_ms=HISTOGRAM_BOUNDS_MS):
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+
+    def record(self, seconds, ok=True):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.total_ms += ms
+        if not ok:
+            self.errors += 1
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the given fraction of calls
+        total = sum(self.counts)
+        if not total:
+            return None
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= fraction * total:
+                return self.bounds_ms[i] if i < len(self.bounds_ms) else float("inf")
+
+    def snapshot(self):
+        calls = sum(self.counts)
+        return {
+            "calls": calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "mean_ms": self.total_ms / calls if calls else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip([f"<={b}ms" for b in self.bounds_ms] + ["slower"], self.counts)),
+        }
+
+
+class TimeoutSession(requests.Session):
+    # Keep-alive session whose requests always carry a timeout, and which
+    # tells the token bucket when the gateway answers 429
+
+    def __init__(self, bucket, pool_size=GATEWAY_POOL_SIZE,
+                 timeout=(GATEWAY_CONNECT_TIMEOUT, GATEWAY_READ_TIMEOUT)):
+        super().__init__()
+        self.default_timeout = timeout
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.hooks["response"].append(self._on_response)
+        self._bucket = bucket
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+    def _on_response(self, response, *args, **kwargs):
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After", 1))
+            except ValueError:
+                retry_after = 1.0
+            self._bucket.pause(retry_after)
+
+
+def _is_rate_limited(error):
+    return "too many requests" in str(error).lower()
+
+
+def _is_retryable(error):
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    # razorpay.errors and fake_gateway share these names for 5xx-type failures
+    return type(error).__name__ in ("ServerError", "GatewayError") or _is_rate_limited(error)
+
+
+class _Resource:
+    def __init__(self, client, name):
+        self._client = client
+        self._name = name
+        self._resource = getattr(client.inner, name)
+
+    def __getattr__(self, method):
+        call = getattr(self._resource, method)
+        if not callable(call):
+            return call
+
+        def wrapped(*args, **kwargs):
+            return self._client.call(f"{self._name}.{method}", method in READ_METHODS, call, args, kwargs)
+        return wrapped
+
+
+class GatewayClient:
+    def __init__(self, inner, bucket=None, deadline=GATEWAY_DEADLINE, read_retries=GATEWAY_READ_RETRIES,
+                 backoff=GATEWAY_RETRY_BACKOFF, http_timeouts=True,
+                 connect_timeout=GATEWAY_CONNECT_TIMEOUT, read_timeout=GATEWAY_READ_TIMEOUT):
+        self.inner = inner
+        self.bucket = bucket or TokenBucket(GATEWAY_RATE_LIMIT, GATEWAY_BURST)
+        self.deadline = deadline
+        self.read_retries = read_retries
+        self.backoff = backoff
+        # Fakes take the timeout kwarg but don't do HTTP, so passing it is harmless
+        self.http_timeouts = http_timeouts
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.order = _Resource(self, "order")
+        self.payment = _Resource(self, "payment")
+        self.invoice = _Resource(self, "invoice")
+
+    def __getattr__(self, name):
+        # Anything not wrapped (e.g. FakeClient.pay, utility) goes straight through
+        return getattr(self.inner, name)
+
+    def _histogram(self, endpoint):
+        with self._lock:
+            histogram = self._histograms.get(endpoint)
+            if histogram is None:
+                histogram = self._histograms[endpoint] = LatencyHistogram()
+            return histogram
+
+    def call(self, endpoint, idempotent, fn, args, kwargs):
+        histogram = self._histogram(endpoint)
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            self.bucket.acquire(deadline)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise GatewayTimeout(f"{endpoint}: deadline of {self.deadline}s exceeded")
+            if self.http_timeouts:
+                kwargs["timeout"] = (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    histogram.record(elapsed, ok=False)
+                # A 429 means the gateway did not act on the request, so even
+                # creates are safe to resend
+                retryable = _is_retryable(e) and (idempotent or _is_rate_limited(e))
+                if not retryable or attempt >= self.read_retries:
+                    if isinstance(e, requests.exceptions.Timeout):
+                        raise GatewayTimeout(f"{endpoint}: {e}") from e
+                    raise
+                attempt += 1
+                # Full jitter: sleep uniformly up to the exponential step
+                delay = random.uniform(0, self.backoff * 2 ** (attempt - 1))
+                if time.monotonic() + delay >= deadline:
+                    raise
+                with self._lock:
+                    histogram.retries += 1
+                time.sleep(delay)
+                continue
+            with self._lock:
+                histogram.record(time.perf_counter() - start)
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {endpoint: h.snapshot() for endpoint, h in sorted(self._histograms.items())}
@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from config import IMAGE_STORE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_MISS_TTL
+
+# Content-addressed store for menu images. Files are named by the SHA-256 of
+# their bytes and fanned out by the first two hex digits, e.g.
+# image_store/3f/3fa2...c9. The same bytes always land at the same path, so
+# writes are idempotent and rows only need to carry the hash.
+#
+# Pre-encoded variants (see convert_images.encode_variants) sit next to the
+# source they were derived from: image_store/3f/3fa2...c9.card.webp. They
+# are only ever encoded offline; serving never decodes an image.
+
+logger = logging.getLogger(__name__)
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def image_path(image_hash, root=IMAGE_STORE_DIR):
+    return os.path.join(root, image_hash[:2], image_hash)
+
+
+def has_image(image_hash, root=IMAGE_STORE_DIR):
+    return os.path.exists(image_path(image_hash, root))
+
+
+def put_image(data, root=IMAGE_STORE_DIR):
+    image_hash = hash_bytes(data)
+    path = image_path(image_hash, root)
+    if os.path.exists(path):
+        return image_hash
+
+    _write_atomic(path, data)
+    return image_hash
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Write to a temp file and rename so readers never see a partial image
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_image(image_hash, root=IMAGE_STORE_DIR):
+    return _read_file(image_path(image_hash, root))
+
+
+def variant_path(image_hash, variant, fmt, root=IMAGE_STORE_DIR):
+    return f"{image_path(image_hash, root)}.{variant}.{fmt}"
+
+
+def put_variants(image_hash, variants, root=IMAGE_STORE_DIR):
+    # variants: {(variant, fmt): encoded bytes}
+    for (variant, fmt), data in variants.items():
+        _write_atomic(variant_path(image_hash, variant, fmt, root), data)
+
+
+def has_variants(image_hash, variants, formats, root=IMAGE_STORE_DIR):
+    return all(
+        os.path.exists(variant_path(image_hash, variant, fmt, root))
+        for variant in variants
+        for fmt in formats
+    )
+
+
+def _read_file(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+class ImageCache:
+    # LRU of encoded image bytes bounded by total size, so the menu page can
+    # hand the same bytes to every session without touching disk or PIL.
+    # A loader that returns None is remembered for miss_ttl seconds, so a
+    # missing image costs one set of disk reads per TTL, not one per rerun.
+
+    def __init__(self, max_bytes, miss_ttl=IMAGE_MISS_TTL, max_missing=4096):
+        self._max_bytes = max_bytes
+        self._miss_ttl = miss_ttl
+        self._max_missing = max_missing
+        self._entries = OrderedDict()
+        self._missing = OrderedDict()  # key -> monotonic expiry
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "missing_hits": 0}
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return data
+            expires = self._missing.get(key)
+            if expires is not None:
+                if expires > time.monotonic():
+                    self._stats["missing_hits"] += 1
+                    return None
+                del self._missing[key]
+            self._stats["misses"] += 1
+
+        data = loader()
+        if data is None:
+            with self._lock:
+                self._missing[key] = time.monotonic() + self._miss_ttl
+                self._missing.move_to_end(key)
+                while len(self._missing) > self._max_missing:
+                    self._missing.popitem(last=False)
+            return None
+        if len(data) > self._max_bytes:
+            return data
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self._size += len(data)
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._stats["evictions"] += 1
+        return data
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._size
+            stats["missing"] = len(self._missing)
+        return stats
+
+
+image_cache = ImageCache(IMAGE_CACHE_MAX_BYTES)
+
+
+def load_image(image_hash, variant="card", fmt="jpeg", root=IMAGE_STORE_DIR):
+    # Encoded bytes for the requested variant (or its JPEG when that format
+    # is missing), or None for the caller's placeholder. The source is never
+    # served (it can be several MB) and never decoded here: images without
+    # variants are re-encoded offline by `python convert_images.py
+    # --missing-variants`.
+    def loader():
+        for path in (variant_path(image_hash, variant, fmt, root), variant_path(image_hash, variant, "jpeg", root)):
+            data = _read_file(path)
+            if data is not None:
+                return data
+        logger.warning("No %s variant for image %s; run convert_images.py --missing-variants", variant, image_hash)
+        return None
+
+    return image_cache.get_or_load((root, image_hash, variant, fmt), loader)
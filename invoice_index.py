@@ -0,0 +1,140 @@
+import argparse
+import traceback
+import mysql.connector
+from db import connection
+from order_feed import record_order_events
+
+# Invoice ids and pay links keyed by our order id. The payment worker
+# records each invoice here as it creates it, so pages resolve "View
+# Invoice" with one indexed read instead of listing every invoice from
+# Razorpay and scanning notes.order_id.
+
+UPSERT_INVOICE = """
+    INSERT INTO invoices (order_id, invoice_id, short_url, status)
+    VALUES (%s, %s, %s, %s) AS new
+    ON DUPLICATE KEY UPDATE
+        invoice_id = new.invoice_id,
+        short_url = new.short_url,
+        status = new.status
+"""
+
+
+def _invoice_row(order_id, invoice):
+    return (order_id, invoice['id'], invoice.get('short_url'), invoice.get('status'))
+
+
+def save_invoice(cursor, order_id, invoice):
+    # invoice: the dict returned by client.invoice.create / invoice.all
+    cursor.execute(UPSERT_INVOICE, _invoice_row(order_id, invoice))
+    # Lets open order views pick up the new invoice link
+    record_order_events(cursor, [order_id], 'invoice')
+
+
+def record_invoice(order_id, invoice):
+    with connection() as conn:
+        cursor = conn.cursor()
+        save_invoice(cursor, order_id, invoice)
+        conn.commit()
+        cursor.close()
+
+
+def get_invoice_urls(order_ids):
+    # {order_id: short_url} for every order that has an indexed invoice,
+    # fetched with a single IN (...) query
+    order_ids = list(order_ids)
+    if not order_ids:
+        return {}
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT order_id, short_url
+            FROM invoices
+            WHERE order_id IN ({placeholders}) AND short_url IS NOT NULL
+        """, order_ids)
+        urls = dict(cursor.fetchall())
+        cursor.close()
+    return urls
+
+
+def get_invoice_url(order_id):
+    return get_invoice_urls([order_id]).get(order_id)
+
+
+def _order_id_from_notes(invoice):
+    notes = invoice.get('notes') or {}
+    # Razorpay returns an empty list rather than a dict when there are no notes
+    if not isinstance(notes, dict):
+        return None
+    try:
+        return int(notes.get('order_id'))
+    except (TypeError, ValueError):
+        return None
+
+
+def sync_invoices(page_size=100):
+    # Backfill: page through every invoice on the gateway once and upsert
+    # the ones whose notes carry an order id we know about. Safe to re-run.
+    from payment import get_client
+    client = get_client()
+
+    synced = 0
+    skipped = 0
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            skip = 0
+            seen = set()
+            while True:
+                page = client.invoice.all({'count': page_size, 'skip': skip})
+                invoices = page.get('items', [])
+                if not invoices:
+                    break
+                skip += len(invoices)
+
+                candidates = {}
+                for invoice in invoices:
+                    order_id = _order_id_from_notes(invoice)
+                    if order_id is None:
+                        skipped += 1
+                        continue
+                    # The list is newest first; keep the latest invoice per order
+                    if order_id not in seen:
+                        seen.add(order_id)
+                        candidates[order_id] = invoice
+
+                if candidates:
+                    placeholders = ", ".join(["%s"] * len(candidates))
+                    cursor.execute(
+                        f"SELECT id FROM orders WHERE id IN ({placeholders})",
+                        list(candidates)
+                    )
+                    known = {row[0] for row in cursor.fetchall()}
+                    skipped += len(candidates) - len(known)
+
+                    rows = [_invoice_row(order_id, candidates[order_id]) for order_id in known]
+                    if rows:
+                        cursor.executemany(UPSERT_INVOICE, rows)
+                        conn.commit()
+                        synced += len(rows)
+                print(f"Scanned {skip} invoices, indexed {synced}")
+
+                if len(invoices) < page_size:
+                    break
+            cursor.close()
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(traceback.format_exc())
+    print(f"\nDone. {synced} invoices indexed, {skipped} skipped")
+    return synced
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index Razorpay invoices by order id")
+    parser.add_argument("--sync", action="store_true", help="backfill the index from the gateway")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    if args.sync:
+        sync_invoices(page_size=args.page_size)
+    else:
+        parser.print_help()
@@ -2,9 +2,9 @@ import streamlit as st
 from auth import login, signup, get_current_user
 from ui import customer_ui, vendor_ui, client_ui, admin_ui
 import mysql.connector
-from payment import verify_payment
 import time
-from config import DB_CONFIG
+from db import connect
+from query_trace import begin_rerun, end_rerun, set_page
 
 st.set_page_config(page_title="Campus Eats", page_icon="🍽")
 
@@ -31,20 +31,14 @@ def show_notification(title, body):
         st.write("")
 
 def check_payment_status(order_id):
+    # Local read only: orders.payment_status is kept up to date by the
+    # Razorpay webhook receiver (webhook_server.py)
     try:
-        # Connect to database
-        conn = mysql.connector.connect(
-            host=DB_CONFIG['host'],
-            port=DB_CONFIG['port'],
-            user=DB_CONFIG['user'],
-            password=DB_CONFIG['password'],
-            database=DB_CONFIG['database']
-        )
+        conn = connect()
         cursor = conn.cursor()
         
-        # Get order details
         cursor.execute("""
-            SELECT razorpay_order_id, status
+            SELECT payment_status
             FROM orders
             WHERE id = %s
         """, (order_id,))
@@ -53,25 +47,7 @@ def check_payment_status(order_id):
         if not order:
             return {"status": "error", "message": "Order not found"}
         
-        razorpay_order_id, status = order
-        
-        if status == "paid":
-            return {"status": "paid"}
-        
-        # Check payment status with Razorpay
-        if razorpay_order_id:
-            payment_status = verify_payment(razorpay_order_id)
-            if payment_status:
-                # Update order status
-                cursor.execute("""
-                    UPDATE orders
-                    SET status = 'paid'
-                    WHERE id = %s
-                """, (order_id,))
-                conn.commit()
-                return {"status": "paid"}
-        
-        return {"status": "pending"}
+        return {"status": order[0]}
         
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -116,6 +92,7 @@ def main():
             del st.session_state["user"]
             st.rerun()
         
+        set_page(user["role"])
         if user["role"] == "admin":
             admin_ui()
         elif user["role"] == "vendor":
@@ -124,4 +101,10 @@ def main():
             client_ui()
 
 if __name__ == "__main__":
-    main()
+    # Attribute every query this rerun issues to the page it renders; the
+    # UI narrows the page down as it dispatches (query_trace.set_page)
+    begin_rerun("login")
+    try:
+        main()
+    finally:
+        end_rerun()
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from db import connection
+from cache import cached
+
+
+@dataclass
+class MenuItem:
+    id: int
+    vendor_id: int
+    name: str
+    description: Optional[str]
+    price: float
+    available: bool
+    image_hash: Optional[str] = None
+
+
+@dataclass
+class Vendor:
+    id: int
+    name: str
+    description: Optional[str]
+    items: List[MenuItem] = field(default_factory=list)
+
+
+@dataclass
+class Catalog:
+    vendors: List[Vendor]
+    items_by_id: Dict[int, MenuItem]
+
+    def available_items(self):
+        return [item for vendor in self.vendors for item in vendor.items if item.available]
+
+
+def load_catalog():
+    # One round-trip for the whole menu: every vendor with its items, grouped
+    # in Python instead of one query per vendor tab. Images stay out of the
+    # row; only their image_store hash is selected
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT v.id, v.name, v.description,
+                   m.id, m.name, m.description, m.price, m.available, m.image_hash
+            FROM vendors v
+            LEFT JOIN menu_items m ON m.vendor_id = v.id
+            ORDER BY v.id, m.id
+        """)
+        rows = cursor.fetchall()
+        cursor.close()
+
+    vendors = []
+    items_by_id = {}
+    current = None
+    for (vendor_id, vendor_name, vendor_desc,
+         item_id, name, desc, price, available, image_hash) in rows:
+        if current is None or current.id != vendor_id:
+            current = Vendor(vendor_id, vendor_name, vendor_desc)
+            vendors.append(current)
+        if item_id is None:  # vendor without any menu items
+            continue
+        item = MenuItem(item_id, vendor_id, name, desc, price, bool(available), image_hash)
+        current.items.append(item)
+        items_by_id[item_id] = item
+
+    return Catalog(vendors, items_by_id)
+
+
+def get_catalog():
+    # Shared by every session; dropped by the vendor/admin writes that touch
+    # menu_items or vendors
+    return cached("catalog", load_catalog, tags=("menu", "vendors"))
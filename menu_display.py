@@ -1,25 +1,35 @@
 import mysql.connector
 import streamlit as st
 import os
-from PIL import Image
-import io
-from config import DB_CONFIG
+import base64
+import html
+from db import connect
+from menu_catalog import get_catalog
+from image_store import load_image
+from config import MENU_IMAGE_FORMAT
+
+def render_image(image_bytes, caption=None):
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        # st.image would transcode WebP to JPEG, so embed it directly
+        encoded = base64.b64encode(image_bytes).decode("ascii")
+        st.markdown(
+            f'<img src="data:image/webp;base64,{encoded}" style="width: 100%;" alt="{html.escape(caption or "")}">',
+            unsafe_allow_html=True
+        )
+        if caption:
+            st.caption(caption)
+    else:
+        st.image(
+            image_bytes,
+            caption=caption,
+            width=None  # This will make the image use container width
+        )
 
 def display_vendor_menu():
     try:
-        # Connect to database
-        conn = mysql.connector.connect(
-            host=DB_CONFIG['host'],
-            port=DB_CONFIG['port'],
-            user=DB_CONFIG['user'],
-            password=DB_CONFIG['password'],
-            database=DB_CONFIG['database']
-        )
-        cursor = conn.cursor()
-        
-        # Get all vendors
-        cursor.execute("SELECT id, name, description FROM vendors")
-        vendors = cursor.fetchall()
+        # Whole catalogue in one cached query instead of one query per vendor tab
+        catalog = get_catalog()
+        vendors = catalog.vendors
         
         if not vendors:
             st.info("No vendors available at the moment.")
@@ -30,24 +40,17 @@ def display_vendor_menu():
             st.session_state.cart = {}
         
         # Create tabs for each vendor
-        vendor_tabs = st.tabs([vendor[1] for vendor in vendors])
+        vendor_tabs = st.tabs([vendor.name for vendor in vendors])
         
-        for i, (vendor_id, vendor_name, vendor_desc) in enumerate(vendors):
+        for i, vendor in enumerate(vendors):
             with vendor_tabs[i]:
-                st.subheader(vendor_name)
-                st.write(vendor_desc)
+                st.subheader(vendor.name)
+                st.write(vendor.description)
                 
-                # Get menu items for this vendor
-                cursor.execute("""
-                    SELECT id, name, description, price, image_blob, available
-                    FROM menu_items 
-                    WHERE vendor_id = %s
-                """, (vendor_id,))
-                
-                menu_items = cursor.fetchall()
+                menu_items = vendor.items
                 
                 # Debug: Show menu items count for this vendor
-                st.write(f"Found {len(menu_items)} items for {vendor_name}")
+                st.write(f"Found {len(menu_items)} items for {vendor.name}")
                 
                 if not menu_items:
                     st.info("No items available from this vendor.")
@@ -55,26 +58,24 @@ def display_vendor_menu():
                 
                 # Display menu items in columns
                 cols = st.columns(2)
-                for idx, (item_id, name, desc, price, image_blob, available) in enumerate(menu_items):
+                for idx, item in enumerate(menu_items):
+                    item_id, name, desc, price = item.id, item.name, item.description, item.price
+                    available = item.available
                     with cols[idx % 2]:
                         # Create a container for each item
                         with st.container():
                             # Display image if available
-                            if image_blob is not None:
+                            image_bytes = (
+                                load_image(item.image_hash, "card", MENU_IMAGE_FORMAT)
+                                if item.image_hash else None
+                            )
+                            if image_bytes is not None:
                                 try:
-                                    # Convert blob to image
-                                    image = Image.open(io.BytesIO(image_blob))
-                                    # Display the image
-                                    st.image(
-                                        image,
-                                        caption=name,
-                                        width=None,  # This will make the image use container width
-                                        output_format='JPEG'
-                                    )
+                                    # Pre-encoded bytes from the in-process cache go
+                                    # straight to the browser; no PIL work per render
+                                    render_image(image_bytes, caption=name)
                                 except Exception as e:
                                     st.error(f"Error loading image for {name}: {str(e)}")
-                                    # Debug information
-                                    st.write(f"Image blob size: {len(image_blob) if image_blob else 0} bytes")
                             else:
                                 st.warning(f"No image available for {name}")
                             
@@ -108,21 +109,10 @@ def display_vendor_menu():
         st.error(f"Database error: {e}")
     except Exception as e:
         st.error(f"An error occurred: {e}")
-    finally:
-        if 'cursor' in locals():
-            cursor.close()
-        if 'conn' in locals():
-            conn.close()
 
 def get_menu_items():
     try:
-        conn = mysql.connector.connect(
-            host=DB_CONFIG['host'],
-            port=DB_CONFIG['port'],
-            user=DB_CONFIG['user'],
-            password=DB_CONFIG['password'],
-            database=DB_CONFIG['database']
-        )
+        conn = connect()
         cursor = conn.cursor()
         
         cursor.execute("""
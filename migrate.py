@@ -0,0 +1,173 @@
+import argparse
+import os
+import re
+import sys
+import traceback
+import mysql.connector
+from mysql.connector import errorcode
+from db import connection
+
+# Versioned schema migrations. Each file in migrations/ named
+# NNNN_description.sql is one version; applied versions are recorded in
+# schema_migrations, and a run applies only the missing ones, in order.
+#
+# MySQL commits DDL as it goes, so a migration that fails halfway cannot be
+# rolled back. Instead every statement is written to be safe to run again:
+# tables are CREATE ... IF NOT EXISTS, each ALTER adds a single column or
+# index, and "already exists" / "does not exist" errors only skip that
+# statement. Re-running after a failure (or against a database built by the
+# old setup scripts) picks up where it stopped.
+#
+#   python migrate.py             # apply pending migrations
+#   python migrate.py --status    # list applied and pending versions
+#   python migrate.py --seed      # also load sample vendors and menu into an empty database
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+SEED_FILE = os.path.join(MIGRATIONS_DIR, "seed.sql")
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+# The schema change is already in place
+ALREADY_APPLIED = {
+    errorcode.ER_TABLE_EXISTS_ERROR,      # 1050 table exists
+    errorcode.ER_DUP_FIELDNAME,           # 1060 duplicate column
+    errorcode.ER_DUP_KEYNAME,             # 1061 duplicate index
+    errorcode.ER_CANT_DROP_FIELD_OR_KEY,  # 1091 column / index already gone
+    errorcode.ER_FK_DUP_NAME,             # 1826 duplicate foreign key name
+}
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    # [(version, name, path)] sorted by version
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def split_statements(sql):
+    # Statements are separated by ';'. Comment lines are dropped so a
+    # comment after the last statement is not sent as an empty query.
+    statements = []
+    for chunk in sql.split(";"):
+        lines = [line for line in chunk.splitlines() if not line.strip().startswith("--")]
+        statement = "\n".join(lines).strip()
+        if statement:
+            statements.append(statement)
+    return statements
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def run_statements(cursor, statements):
+    # Returns how many statements were skipped as already applied
+    skipped = 0
+    for statement in statements:
+        try:
+            cursor.execute(statement)
+        except mysql.connector.Error as e:
+            if e.errno not in ALREADY_APPLIED:
+                raise
+            skipped += 1
+    return skipped
+
+
+def migrate(conn, migrations=None, log=print):
+    migrations = load_migrations() if migrations is None else migrations
+    cursor = conn.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        done = applied_versions(cursor)
+        applied = []
+        for version, name, path in migrations:
+            if version in done:
+                continue
+            with open(path) as f:
+                statements = split_statements(f.read())
+            skipped = run_statements(cursor, statements)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name)
+            )
+            conn.commit()
+            applied.append(version)
+            note = f" ({skipped} already in place)" if skipped else ""
+            log(f"Applied {version:04d}_{name}: {len(statements)} statements{note}")
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def seed(conn, log=print):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM vendors")
+        if cursor.fetchone()[0]:
+            log("Vendors already exist; skipping seed data")
+            return False
+        with open(SEED_FILE) as f:
+            run_statements(cursor, split_statements(f.read()))
+        conn.commit()
+        log("Loaded seed data")
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def status(conn):
+    cursor = conn.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        cursor.execute("SELECT version, applied_at FROM schema_migrations")
+        applied = dict(cursor.fetchall())
+    finally:
+        cursor.close()
+    for version, name, _ in load_migrations():
+        state = f"applied {applied[version]}" if version in applied else "pending"
+        print(f"{version:04d}_{name:<32} {state}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying them")
+    parser.add_argument("--seed", action="store_true", help="load sample vendors and menu if there are none")
+    args = parser.parse_args()
+
+    try:
+        with connection() as conn:
+            if args.status:
+                status(conn)
+                sys.exit(0)
+            applied = migrate(conn)
+            if not applied:
+                print("Schema is up to date")
+            if args.seed:
+                seed(conn)
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(traceback.format_exc())
+        sys.exit(1)
@@ -0,0 +1,72 @@
+import argparse
+import traceback
+import mysql.connector
+from db import connect
+from convert_images import ensure_image_hash_column, store_image
+
+# Moves menu_items.image_blob bytes into the on-disk image store (along with
+# their pre-encoded variants) and records the content hash in
+# menu_items.image_hash, so the menu query no longer has to pull LONGBLOBs.
+# Safe to re-run: rows that already have a hash are skipped.
+
+
+def migrate_image_blobs(batch_size=50, drop_blobs=False):
+    try:
+        conn = connect()
+        cursor = conn.cursor()
+
+        ensure_image_hash_column(cursor)
+
+        moved = 0
+        moved_bytes = 0
+        last_id = 0
+        while True:
+            # Walk the table by primary key so each batch is a bounded read
+            cursor.execute("""
+                SELECT id, image_blob
+                FROM menu_items
+                WHERE id > %s AND image_blob IS NOT NULL AND image_hash IS NULL
+                ORDER BY id
+                LIMIT %s
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            updates = []
+            for item_id, image_blob in rows:
+                updates.append((store_image(bytes(image_blob)), item_id))
+                moved_bytes += len(image_blob)
+            last_id = rows[-1][0]
+
+            cursor.executemany("UPDATE menu_items SET image_hash = %s WHERE id = %s", updates)
+            conn.commit()
+            moved += len(updates)
+            print(f"Moved {moved} images ({moved_bytes / 1024:.0f} KiB) so far")
+
+        if drop_blobs:
+            print("Clearing image_blob for rows that now have an image_hash...")
+            cursor.execute("UPDATE menu_items SET image_blob = NULL WHERE image_hash IS NOT NULL")
+            conn.commit()
+
+        print(f"\nDone. {moved} images moved to the image store")
+
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(traceback.format_exc())
+        if 'conn' in locals():
+            conn.rollback()
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals():
+            conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move menu image blobs into the content-addressed image store")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--drop-blobs", action="store_true",
+                        help="NULL out image_blob once the image is in the store")
+    args = parser.parse_args()
+    migrate_image_blobs(batch_size=args.batch_size, drop_blobs=args.drop_blobs)
@@ -0,0 +1,10 @@
+-- Columns the app reads that older databases were created without. Each
+-- ALTER adds one column, so a column that already exists only skips itself.
+ALTER TABLE users ADD COLUMN name VARCHAR(255) AFTER id;
+ALTER TABLE vendors ADD COLUMN description TEXT AFTER name;
+ALTER TABLE vendors ADD COLUMN user_id INT NULL AFTER description;
+ALTER TABLE menu_items ADD COLUMN available BOOLEAN NOT NULL DEFAULT TRUE AFTER price;
+ALTER TABLE menu_items ADD COLUMN image_path VARCHAR(255) AFTER available;
+ALTER TABLE menu_items ADD COLUMN image_hash CHAR(64) NULL AFTER image_path;
+ALTER TABLE orders ADD COLUMN payment_id VARCHAR(255) AFTER status;
+ALTER TABLE orders ADD COLUMN razorpay_order_id VARCHAR(255) AFTER payment_id;
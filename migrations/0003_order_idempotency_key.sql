@@ -0,0 +1,5 @@
+-- Client-generated idempotency key for checkout. A replayed "Place Order"
+-- finds the existing order through the unique index instead of inserting
+-- a duplicate.
+ALTER TABLE orders ADD COLUMN idempotency_key CHAR(36) NULL AFTER razorpay_order_id;
+ALTER TABLE orders ADD UNIQUE KEY uniq_orders_idempotency_key (idempotency_key);
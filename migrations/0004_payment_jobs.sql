@@ -0,0 +1,27 @@
+-- Outbox for gateway work. A row is written in the same transaction as the
+-- order. The payment worker creates the Razorpay order and invoice afterwards
+-- and records the outcome here for the checkout page to pick up.
+CREATE TABLE IF NOT EXISTS payment_jobs (
+    order_id INT PRIMARY KEY,
+    status ENUM('pending', 'running', 'done', 'failed') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    invoice_url VARCHAR(255),
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
+    KEY idx_payment_jobs_status (status, updated_at)
+);
+
+-- Local index of Razorpay invoices, written when an invoice is created and
+-- filled in for older orders by `python invoice_index.py --sync`
+CREATE TABLE IF NOT EXISTS invoices (
+    order_id INT PRIMARY KEY,
+    invoice_id VARCHAR(64) NOT NULL,
+    short_url VARCHAR(255),
+    status VARCHAR(32),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
+    UNIQUE KEY uniq_invoices_invoice_id (invoice_id)
+);
@@ -0,0 +1,24 @@
+-- Razorpay webhook events, written in batches by webhook_server.py. The
+-- event id is the primary key, so redelivered events are ignored.
+CREATE TABLE IF NOT EXISTS payment_events (
+    event_id VARCHAR(64) PRIMARY KEY,
+    event VARCHAR(64) NOT NULL,
+    order_id INT,
+    razorpay_order_id VARCHAR(255),
+    razorpay_payment_id VARCHAR(255),
+    amount INT,
+    payload JSON NOT NULL,
+    received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_payment_events_order (order_id),
+    KEY idx_payment_events_razorpay_order (razorpay_order_id)
+);
+
+-- Payment state is tracked separately from the kitchen status. Older
+-- databases have payment_status as a nullable ('pending', 'completed',
+-- 'failed'): fill in the NULLs, widen it, rename 'completed' to 'paid',
+-- then narrow it again.
+ALTER TABLE orders ADD COLUMN payment_status ENUM('pending', 'paid', 'failed') NOT NULL DEFAULT 'pending' AFTER status;
+UPDATE orders SET payment_status = 'pending' WHERE payment_status IS NULL;
+ALTER TABLE orders MODIFY payment_status ENUM('pending', 'completed', 'paid', 'failed') NOT NULL DEFAULT 'pending';
+UPDATE orders SET payment_status = 'paid' WHERE payment_status = 'completed';
+ALTER TABLE orders MODIFY payment_status ENUM('pending', 'paid', 'failed') NOT NULL DEFAULT 'pending';
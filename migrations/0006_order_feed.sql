@@ -0,0 +1,18 @@
+-- Change log behind the order views' "what changed since N" polling
+-- (order_feed.py). Every change to an order writes one row per vendor on
+-- the order, carrying the customer too, so both feeds are a single range
+-- scan on their own index and "nothing changed" is a MAX(id) lookup.
+CREATE TABLE IF NOT EXISTS order_events (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    order_id INT NOT NULL,
+    user_id INT NOT NULL,
+    vendor_id INT NOT NULL,
+    kind VARCHAR(32) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_order_events_user (user_id, id),
+    KEY idx_order_events_vendor (vendor_id, id)
+);
+
+-- Vendor dashboard: newest-first ordering and active orders per vendor
+ALTER TABLE orders ADD INDEX idx_orders_created_id (created_at, id);
+ALTER TABLE vendor_order_status ADD INDEX idx_vendor_order_status_vendor (vendor_id, status, order_id);
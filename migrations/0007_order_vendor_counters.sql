@@ -0,0 +1,26 @@
+-- Per-order vendor progress counters, maintained by
+-- order_service.set_vendor_order_status under a row lock on the order
+ALTER TABLE orders ADD COLUMN vendors_total INT NOT NULL DEFAULT 0;
+ALTER TABLE orders ADD COLUMN vendors_ready INT NOT NULL DEFAULT 0;     -- vendors at 'ready' or 'pickedup'
+ALTER TABLE orders ADD COLUMN vendors_pickedup INT NOT NULL DEFAULT 0;
+
+-- Backfill existing orders
+UPDATE orders o
+JOIN (
+    SELECT oi.order_id, COUNT(DISTINCT m.vendor_id) AS vendors_total
+    FROM order_items oi
+    JOIN menu_items m ON m.id = oi.menu_item_id
+    GROUP BY oi.order_id
+) t ON t.order_id = o.id
+SET o.vendors_total = t.vendors_total;
+
+UPDATE orders o
+JOIN (
+    SELECT order_id,
+           SUM(status IN ('ready', 'pickedup')) AS vendors_ready,
+           SUM(status = 'pickedup') AS vendors_pickedup
+    FROM vendor_order_status
+    GROUP BY order_id
+) t ON t.order_id = o.id
+SET o.vendors_ready = t.vendors_ready,
+    o.vendors_pickedup = t.vendors_pickedup;
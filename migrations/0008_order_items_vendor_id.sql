@@ -0,0 +1,18 @@
+-- Snapshot the vendor and item name onto each order line so order views,
+-- the vendor dashboard and the change feed stop joining through menu_items
+ALTER TABLE order_items ADD COLUMN vendor_id INT NULL AFTER menu_item_id;
+ALTER TABLE order_items ADD COLUMN item_name VARCHAR(255) NULL AFTER vendor_id;
+
+-- Backfill existing lines from the current menu
+UPDATE order_items oi
+JOIN menu_items m ON m.id = oi.menu_item_id
+SET oi.vendor_id = m.vendor_id,
+    oi.item_name = m.name
+WHERE oi.vendor_id IS NULL;
+
+ALTER TABLE order_items MODIFY vendor_id INT NOT NULL;
+ALTER TABLE order_items MODIFY item_name VARCHAR(255) NOT NULL;
+ALTER TABLE order_items ADD CONSTRAINT fk_order_items_vendor FOREIGN KEY (vendor_id) REFERENCES vendors(id);
+
+-- Vendor dashboard: a vendor's orders, newest first, as one range scan
+ALTER TABLE order_items ADD INDEX idx_order_items_vendor_order (vendor_id, order_id);
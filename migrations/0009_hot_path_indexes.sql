@@ -0,0 +1,20 @@
+-- Indexes behind the pages that run on every rerun
+--
+--   orders(created_at)       is covered by idx_orders_created_id from 0006.
+--                            InnoDB appends the primary key to every
+--                            secondary index, so (created_at) would be the
+--                            same index twice.
+
+-- Gateway order lookups from webhooks and reconcile_payments.py, and the
+-- reconciliation scan of paid orders by day
+ALTER TABLE orders ADD INDEX idx_orders_razorpay_order_id (razorpay_order_id);
+ALTER TABLE orders ADD INDEX idx_orders_payment_status_created (payment_status, created_at);
+
+-- A customer's orders, newest first (My Orders, Recent Orders)
+ALTER TABLE orders ADD INDEX idx_orders_user_created (user_id, created_at);
+
+-- Lines of a set of orders (order details, invoices, the change feed)
+ALTER TABLE order_items ADD INDEX idx_order_items_order (order_id);
+
+-- A vendor's available items (menu, catalog)
+ALTER TABLE menu_items ADD INDEX idx_menu_items_vendor_available (vendor_id, available);
@@ -0,0 +1,46 @@
+-- Per vendor per day totals behind the admin "Order Analysis" page,
+-- updated in place_order's transaction (vendor_rollup.record_order_rollup) and
+-- rebuilt for a date range by `python vendor_rollup.py`
+CREATE TABLE IF NOT EXISTS vendor_daily_rollup (
+    vendor_id INT NOT NULL,
+    day DATE NOT NULL,
+    orders INT NOT NULL DEFAULT 0,
+    items INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+    customers INT NOT NULL DEFAULT 0,           -- distinct customers that day
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (vendor_id, day),
+    KEY idx_vendor_daily_rollup_day (day, vendor_id)
+);
+
+-- Who ordered from a vendor on a day, so customers can be counted
+-- incrementally. first_order_id tells place_order whether its own insert
+-- was the one that added the customer.
+CREATE TABLE IF NOT EXISTS vendor_daily_customers (
+    vendor_id INT NOT NULL,
+    day DATE NOT NULL,
+    user_id INT NOT NULL,
+    first_order_id INT NOT NULL,
+    PRIMARY KEY (vendor_id, day, user_id)
+);
+
+-- Backfill from existing orders
+INSERT IGNORE INTO vendor_daily_customers (vendor_id, day, user_id, first_order_id)
+SELECT oi.vendor_id, DATE(o.created_at), o.user_id, MIN(o.id)
+FROM orders o
+JOIN order_items oi ON oi.order_id = o.id
+GROUP BY oi.vendor_id, DATE(o.created_at), o.user_id;
+
+INSERT INTO vendor_daily_rollup (vendor_id, day, orders, items, revenue, customers)
+SELECT * FROM (
+    SELECT oi.vendor_id, DATE(o.created_at) AS day, COUNT(DISTINCT o.id) AS orders, SUM(oi.quantity) AS items,
+           SUM(oi.quantity * oi.price_at_time) AS revenue, COUNT(DISTINCT o.user_id) AS customers
+    FROM orders o
+    JOIN order_items oi ON oi.order_id = o.id
+    GROUP BY oi.vendor_id, DATE(o.created_at)
+) AS new
+ON DUPLICATE KEY UPDATE
+    orders = new.orders,
+    items = new.items,
+    revenue = new.revenue,
+    customers = new.customers;
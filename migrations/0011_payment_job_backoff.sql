@@ -0,0 +1,5 @@
+-- When a pending payment job is next due. Failed attempts push it back
+-- exponentially (payment_worker.retry_delay) so a short gateway outage does
+-- not use up every attempt within seconds.
+ALTER TABLE payment_jobs ADD COLUMN next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP AFTER attempts;
+ALTER TABLE payment_jobs ADD INDEX idx_payment_jobs_due (status, next_attempt_at);
@@ -0,0 +1,29 @@
+-- Every vendor on an order now gets a 'pending' vendor_order_status row
+-- when the order is placed (order_service.place_order), so the vendor
+-- dashboard's Active view reads only the not-yet-picked-up rows of
+-- idx_vendor_order_status_vendor instead of the vendor's whole history.
+-- Older orders get theirs here, taking the order's own status.
+INSERT IGNORE INTO vendor_order_status (order_id, vendor_id, status)
+SELECT DISTINCT oi.order_id, oi.vendor_id,
+       CASE o.status
+           WHEN 'pickedup' THEN 'pickedup'
+           WHEN 'delivered' THEN 'pickedup'
+           WHEN 'ready' THEN 'ready'
+           ELSE 'pending'
+       END
+FROM order_items oi
+JOIN orders o ON o.id = oi.order_id;
+
+-- Recount the order counters (as in 0007) to include the new rows
+UPDATE orders o
+JOIN (
+    SELECT order_id,
+           COUNT(*) AS vendors_total,
+           SUM(status IN ('ready', 'pickedup')) AS vendors_ready,
+           SUM(status = 'pickedup') AS vendors_pickedup
+    FROM vendor_order_status
+    GROUP BY order_id
+) t ON t.order_id = o.id
+SET o.vendors_total = t.vendors_total,
+    o.vendors_ready = t.vendors_ready,
+    o.vendors_pickedup = t.vendors_pickedup;
@@ -0,0 +1,24 @@
+-- Deleting a menu item used to cascade to order_items and silently drop
+-- lines (and revenue) from past orders. Lines already carry the vendor and
+-- item name (0008), so they now outlive the item with menu_item_id NULL.
+--
+-- The original foreign key has a server-generated name
+-- (order_items_ibfk_N), so look it up; on a re-run only the new one is
+-- left and this is a no-op.
+SET @fk = (
+    SELECT CONSTRAINT_NAME
+    FROM information_schema.KEY_COLUMN_USAGE
+    WHERE TABLE_SCHEMA = DATABASE()
+      AND TABLE_NAME = 'order_items'
+      AND COLUMN_NAME = 'menu_item_id'
+      AND REFERENCED_TABLE_NAME = 'menu_items'
+      AND CONSTRAINT_NAME <> 'fk_order_items_menu_item'
+    LIMIT 1
+);
+SET @sql = IF(@fk IS NULL, 'DO 0', CONCAT('ALTER TABLE order_items DROP FOREIGN KEY `', @fk, '`'));
+PREPARE drop_fk FROM @sql;
+EXECUTE drop_fk;
+DEALLOCATE PREPARE drop_fk;
+
+ALTER TABLE order_items MODIFY menu_item_id INT NULL;
+ALTER TABLE order_items ADD CONSTRAINT fk_order_items_menu_item FOREIGN KEY (menu_item_id) REFERENCES menu_items(id) ON DELETE SET NULL;
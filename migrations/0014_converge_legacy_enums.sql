@@ -0,0 +1,14 @@
+-- Databases built by the old setup scripts kept their own ENUMs, which
+-- CREATE TABLE IF NOT EXISTS in 0001 never touched: orders.status as
+-- ('pending', 'preparing', 'ready', 'delivered') and users.role with
+-- 'customer'. Widen each to the union, move the rows to the canonical
+-- values, then narrow it to the 0001 definition. On a database that
+-- already has the canonical ENUMs this changes nothing.
+ALTER TABLE orders MODIFY status ENUM('pending', 'preparing', 'inmaking', 'ready', 'delivered', 'pickedup') NOT NULL DEFAULT 'inmaking';
+UPDATE orders SET status = 'inmaking' WHERE status IN ('pending', 'preparing');
+UPDATE orders SET status = 'pickedup' WHERE status = 'delivered';
+ALTER TABLE orders MODIFY status ENUM('inmaking', 'ready', 'pickedup') NOT NULL DEFAULT 'inmaking';
+
+ALTER TABLE users MODIFY role ENUM('admin', 'vendor', 'customer', 'user') NOT NULL DEFAULT 'user';
+UPDATE users SET role = 'user' WHERE role = 'customer';
+ALTER TABLE users MODIFY role ENUM('admin', 'vendor', 'user') NOT NULL DEFAULT 'user';
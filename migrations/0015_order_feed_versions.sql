@@ -0,0 +1,26 @@
+-- Commit-ordered versions for the order feed (order_feed.py). MAX(id) of
+-- order_events is not safe as a version: ids are assigned at insert but
+-- become visible at commit, so a slow writer's lower id can appear after a
+-- poll already moved past it. Each writer now bumps its customers' and
+-- vendors' rows here and holds them until it commits, and stamps its
+-- events with the versions it got.
+CREATE TABLE IF NOT EXISTS order_feed_versions (
+    scope ENUM('user', 'vendor') NOT NULL,
+    scope_id INT NOT NULL,
+    version BIGINT NOT NULL,
+    PRIMARY KEY (scope, scope_id)
+);
+
+ALTER TABLE order_events ADD COLUMN user_version BIGINT NOT NULL DEFAULT 0 AFTER kind;
+ALTER TABLE order_events ADD COLUMN vendor_version BIGINT NOT NULL DEFAULT 0 AFTER user_version;
+
+-- Existing events keep their order: their id becomes both versions, and
+-- each scope continues from its highest one
+UPDATE order_events SET user_version = id, vendor_version = id WHERE user_version = 0;
+INSERT IGNORE INTO order_feed_versions (scope, scope_id, version)
+SELECT 'user', user_id, MAX(user_version) FROM order_events GROUP BY user_id;
+INSERT IGNORE INTO order_feed_versions (scope, scope_id, version)
+SELECT 'vendor', vendor_id, MAX(vendor_version) FROM order_events GROUP BY vendor_id;
+
+ALTER TABLE order_events ADD INDEX idx_order_events_user_version (user_id, user_version);
+ALTER TABLE order_events ADD INDEX idx_order_events_vendor_version (vendor_id, vendor_version);
@@ -1,55 +1,5 @@
-CREATE DATABASE IF NOT EXISTS canteen;
-USE canteen;
-
-DROP TABLE IF EXISTS users;
-CREATE TABLE users (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    email VARCHAR(255) UNIQUE NOT NULL,
-    password VARCHAR(255) NOT NULL,
-    role ENUM('admin','vendor','customer') NOT NULL
-);
-
-DROP TABLE IF EXISTS vendors;
-CREATE TABLE vendors (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    name VARCHAR(255) NOT NULL,
-    description TEXT
-);
-
-DROP TABLE IF EXISTS menu_items;
-CREATE TABLE menu_items (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    vendor_id INT NOT NULL,
-    name VARCHAR(255) NOT NULL,
-    description TEXT,
-    price DECIMAL(10,2) NOT NULL,
-    available BOOLEAN NOT NULL DEFAULT TRUE,
-    FOREIGN KEY (vendor_id) REFERENCES vendors(id) ON DELETE CASCADE
-);
-
-DROP TABLE IF EXISTS orders;
-CREATE TABLE orders (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    user_id INT NOT NULL,
-    total DECIMAL(10,2) NOT NULL,
-    status ENUM('inmaking','ready','pickedup') NOT NULL DEFAULT 'inmaking',
-    payment_id VARCHAR(255),
-    razorpay_order_id VARCHAR(255),
-    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-);
-
-DROP TABLE IF EXISTS order_items;
-CREATE TABLE order_items (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    order_id INT NOT NULL,
-    menu_item_id INT NOT NULL,
-    quantity INT NOT NULL,
-    price_at_time DECIMAL(10,2) NOT NULL,
-    FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
-    FOREIGN KEY (menu_item_id) REFERENCES menu_items(id) ON DELETE CASCADE
-);
-
+-- Sample vendors and menu, loaded by `python migrate.py --seed` into an empty
+-- database. Not a migration: production data is never touched.
 INSERT INTO vendors (name, description) VALUES
 ('Fee Fa Foo', 'Chinese and Indian street food'),
 ('Mech Cafe', 'Specialty puffs and snacks'),
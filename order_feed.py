@@ -0,0 +1,132 @@
+from dataclasses import dataclass, field
+from typing import Dict
+
+# Incremental change feed for the order views. Writers append to
+# order_events whenever an order changes; a view remembers the version of
+# its scope (one customer, or one vendor) it rendered, and on each poll
+# reads the scope's current version, a primary key lookup in
+# order_feed_versions. Only when that moved does it fetch the ids of the
+# orders that changed and reload those.
+#
+# Versions are not event ids: an AUTO_INCREMENT id is assigned at insert
+# but becomes visible at commit, so a lower id can commit after a higher
+# one was already read as the version and be skipped for good. Instead each
+# writer bumps its scopes' version rows and keeps them locked until it
+# commits, so within a scope versions become visible strictly in order.
+
+# Feed scopes; the name prefixes the order_events columns
+# (user_id / user_version, vendor_id / vendor_version)
+SCOPES = ("user", "vendor")
+
+# Past this many changed orders a full reload is cheaper than a delta
+MAX_DELTA = 200
+
+
+@dataclass
+class FeedState:
+    version: int
+    orders: Dict[int, object] = field(default_factory=dict)
+
+
+def _check_scope(scope):
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown feed scope {scope!r}; expected one of {', '.join(SCOPES)}")
+    return scope
+
+
+def record_order_events(cursor, order_ids, kind):
+    # One event row per (order, vendor) for every order in order_ids; runs
+    # inside the caller's transaction, which holds the customers' and
+    # vendors' version rows until it commits. They are bumped in sorted
+    # order, so two writers cannot deadlock on them.
+    order_ids = list(order_ids)
+    if not order_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    cursor.execute(f"""
+        SELECT DISTINCT o.id, o.user_id, oi.vendor_id
+        FROM orders o
+        JOIN order_items oi ON oi.order_id = o.id
+        WHERE o.id IN ({placeholders})
+    """, order_ids)
+    rows = cursor.fetchall()
+    if not rows:
+        return
+
+    scopes = sorted({("user", user_id) for _, user_id, _ in rows} | {("vendor", vendor_id) for _, _, vendor_id in rows})
+    params = [value for scope in scopes for value in scope]
+    values = ", ".join(["(%s, %s, 1)"] * len(scopes))
+    cursor.execute(f"""
+        INSERT INTO order_feed_versions (scope, scope_id, version)
+        VALUES {values}
+        ON DUPLICATE KEY UPDATE version = order_feed_versions.version + 1
+    """, params)
+    pairs = ", ".join(["(%s, %s)"] * len(scopes))
+    cursor.execute(f"""
+        SELECT scope, scope_id, version
+        FROM order_feed_versions
+        WHERE (scope, scope_id) IN ({pairs})
+    """, params)
+    versions = {(scope, scope_id): version for scope, scope_id, version in cursor.fetchall()}
+
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(rows))
+    params = []
+    for order_id, user_id, vendor_id in rows:
+        params.extend((order_id, user_id, vendor_id, kind, versions[("user", user_id)], versions[("vendor", vendor_id)]))
+    cursor.execute(
+        f"INSERT INTO order_events (order_id, user_id, vendor_id, kind, user_version, vendor_version) VALUES {values}",
+        params
+    )
+
+
+def latest_version(cursor, scope, scope_id):
+    cursor.execute("""
+        SELECT version FROM order_feed_versions WHERE scope = %s AND scope_id = %s
+    """, (_check_scope(scope), scope_id))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def changed_orders(cursor, scope, scope_id, since, until):
+    # Order ids with events in versions (since, until], or None if there
+    # are too many to be worth a delta
+    scope = _check_scope(scope)
+    cursor.execute(f"""
+        SELECT DISTINCT order_id
+        FROM order_events
+        WHERE {scope}_id = %s AND {scope}_version > %s AND {scope}_version <= %s
+        LIMIT %s
+    """, (scope_id, since, until, MAX_DELTA + 1))
+    order_ids = [row[0] for row in cursor.fetchall()]
+    if len(order_ids) > MAX_DELTA:
+        return None
+    return order_ids
+
+
+def poll(cursor, scope, scope_id, state, load_all, load_some=None):
+    # Returns (state, changed). With nothing new this costs one primary
+    # key lookup. load_all() -> {order_id: order} rebuilds the view;
+    # load_some(order_ids) -> {order_id: order or None} reloads just the
+    # changed orders (None drops one). Without load_some any change means a
+    # full reload.
+    #
+    # The version is read before loading, so a change that lands while
+    # loading is picked up by the next poll rather than lost.
+    version = latest_version(cursor, scope, scope_id)
+    if state is not None and state.version == version:
+        return state, False
+
+    if state is None or load_some is None:
+        return FeedState(version, load_all()), True
+
+    order_ids = changed_orders(cursor, scope, scope_id, state.version, version)
+    if order_ids is None:
+        return FeedState(version, load_all()), True
+
+    orders = dict(state.orders)
+    for order_id, order in load_some(order_ids).items():
+        if order is None:
+            orders.pop(order_id, None)
+        else:
+            orders[order_id] = order
+    return FeedState(version, orders), True
@@ -0,0 +1,346 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from datetime import datetime
+from typing import List, Optional
+import mysql.connector
+from mysql.connector import errorcode
+from order_feed import record_order_events
+from vendor_rollup import record_order_rollup
+
+
+@dataclass
+class CartLine:
+    item_id: int
+    name: str
+    vendor_id: int
+    vendor_name: str
+    quantity: int
+    price: Decimal
+
+    @property
+    def subtotal(self):
+        return self.price * self.quantity
+
+
+@dataclass
+class PlacedOrder:
+    order_id: int
+    total: Decimal
+    razorpay_order_id: Optional[str] = None
+    replayed: bool = False  # True when the idempotency key matched an existing order
+    lines: List[CartLine] = field(default_factory=list)
+
+
+@dataclass
+class VendorOrderLine:
+    name: str
+    quantity: int
+    price: Decimal
+
+
+@dataclass
+class VendorOrder:
+    order_id: int
+    total: Decimal
+    status: str
+    razorpay_order_id: Optional[str]
+    created_at: datetime
+    customer_email: str
+    vendor_status: Optional[str]  # this vendor's own progress on the order
+    lines: List[VendorOrderLine] = field(default_factory=list)
+
+
+def price_cart(cursor, cart):
+    # Price every cart item with a single IN (...) query instead of one
+    # SELECT per item. Items that no longer exist are dropped.
+    if not cart:
+        return []
+    item_ids = list(cart)
+    placeholders = ", ".join(["%s"] * len(item_ids))
+    cursor.execute(f"""
+        SELECT m.id, m.name, m.price, m.vendor_id, v.name as vendor_name
+        FROM menu_items m
+        JOIN vendors v ON m.vendor_id = v.id
+        WHERE m.id IN ({placeholders})
+    """, item_ids)
+    rows = {row[0]: row for row in cursor.fetchall()}
+
+    lines = []
+    for item_id, quantity in cart.items():
+        row = rows.get(item_id)
+        if row:
+            _, name, price, vendor_id, vendor_name = row
+            lines.append(CartLine(item_id, name, vendor_id, vendor_name, quantity, price))
+    return lines
+
+
+def _find_order_by_key(cursor, user_id, idempotency_key):
+    cursor.execute("""
+        SELECT id, total, razorpay_order_id
+        FROM orders
+        WHERE idempotency_key = %s AND user_id = %s
+    """, (idempotency_key, user_id))
+    row = cursor.fetchone()
+    if row:
+        return PlacedOrder(row[0], row[1], row[2], replayed=True)
+    return None
+
+
+def place_order(conn, user_id, cart, idempotency_key=None):
+    # Creates the order and all of its items in one explicit transaction:
+    # one pricing query, one orders INSERT and one multi-row order_items
+    # INSERT. Raises on failure after rolling back, and ValueError if
+    # nothing in the cart can be ordered.
+    #
+    # With an idempotency_key, a retry (double click, Streamlit rerun) of
+    # the same checkout returns the order that was already created instead
+    # of writing a second one.
+    if conn.in_transaction:
+        # End the read snapshot left open by earlier SELECTs on this connection
+        conn.commit()
+    cursor = conn.cursor()
+    try:
+        if idempotency_key:
+            existing = _find_order_by_key(cursor, user_id, idempotency_key)
+            conn.commit()
+            if existing:
+                return existing
+
+        conn.start_transaction()
+        lines = price_cart(cursor, cart)
+        if not lines:
+            raise ValueError("None of the items in your cart are available any more.")
+        total = sum(line.subtotal for line in lines)
+
+        vendor_ids = sorted({line.vendor_id for line in lines})
+        vendors_total = len(vendor_ids)
+        cursor.execute(
+            "INSERT INTO orders (user_id, total, status, idempotency_key, vendors_total) VALUES (%s, %s, 'inmaking', %s, %s)",
+            (user_id, total, idempotency_key, vendors_total)
+        )
+        order_id = cursor.lastrowid
+
+        # vendor_id and the item name are snapshotted onto each line so
+        # order views never need to join back through menu_items
+        values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(lines))
+        params = []
+        for line in lines:
+            params.extend((order_id, line.item_id, line.vendor_id, line.name, line.quantity, line.price))
+        cursor.execute(
+            f"INSERT INTO order_items (order_id, menu_item_id, vendor_id, item_name, quantity, price_at_time) VALUES {values}",
+            params
+        )
+
+        # Each vendor's progress starts at 'pending', so the vendor
+        # dashboard's Active view can be read from vendor_order_status alone
+        values = ", ".join(["(%s, %s)"] * len(vendor_ids))
+        params = []
+        for vendor_id in vendor_ids:
+            params.extend((order_id, vendor_id))
+        cursor.execute(f"INSERT INTO vendor_order_status (order_id, vendor_id) VALUES {values}", params)
+
+        # Outbox row for the payment worker, committed atomically with the order
+        cursor.execute("INSERT INTO payment_jobs (order_id) VALUES (%s)", (order_id,))
+        record_order_events(cursor, [order_id], 'created')
+        # Last, so the vendor's row for the day is locked as briefly as possible
+        record_order_rollup(cursor, order_id)
+
+        conn.commit()
+        return PlacedOrder(order_id, total, lines=lines)
+    except mysql.connector.IntegrityError as e:
+        conn.rollback()
+        if idempotency_key and e.errno == errorcode.ER_DUP_ENTRY:
+            # A concurrent rerun with the same key won the insert
+            existing = _find_order_by_key(cursor, user_id, idempotency_key)
+            conn.commit()
+            if existing:
+                return existing
+        raise
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def mark_orders_paid(cursor, payments):
+    # payments: {order_id: razorpay_payment_id or None}. One UPDATE for the
+    # whole batch; orders already marked paid are left alone, and a missing
+    # payment id keeps whatever is stored. Returns the number of rows changed.
+    if not payments:
+        return 0
+    cases = " ".join(["WHEN %s THEN %s"] * len(payments))
+    placeholders = ", ".join(["%s"] * len(payments))
+    params = []
+    for order_id, payment_id in payments.items():
+        params.extend((order_id, payment_id))
+    params.extend(payments)
+    cursor.execute(f"""
+        UPDATE orders
+        SET payment_status = 'paid',
+            payment_id = COALESCE(CASE id {cases} END, payment_id)
+        WHERE id IN ({placeholders}) AND payment_status <> 'paid'
+    """, params)
+    updated = cursor.rowcount
+    if updated:
+        record_order_events(cursor, payments, 'payment')
+    return updated
+
+
+def vendor_order_page(cursor, vendor_id, active_only=True, before=None, limit=20):
+    # One page of a vendor's orders, newest first. `before` is the id of the
+    # last order on the previous page (keyset pagination); order ids are
+    # assigned in created_at order, so this is the (created_at, id) order.
+    # Active means this vendor has not marked the order picked up.
+    # Returns (orders, cursor for the next page or None).
+    #
+    # Either way the page's ids come from one index however long the
+    # history: Active reads only this vendor's pending / ready rows of
+    # vendor_order_status (vendor_id, status, order_id), and All is a
+    # backward range scan of order_items' (vendor_id, order_id) that stops
+    # at the LIMIT.
+    params = [vendor_id]
+    if active_only:
+        active_conditions = ["vos.vendor_id = %s", "vos.status IN ('pending', 'ready')"]
+        if before:
+            active_conditions.append("vos.order_id < %s")
+            params.append(before)
+        params.append(limit + 1)
+        cursor.execute(f"""
+            SELECT vos.order_id
+            FROM vendor_order_status vos
+            WHERE {" AND ".join(active_conditions)}
+            ORDER BY vos.order_id DESC
+            LIMIT %s
+        """, params)
+    else:
+        conditions = ["oi.vendor_id = %s"]
+        if before:
+            conditions.append("oi.order_id < %s")
+            params.append(before)
+        params.append(limit + 1)
+        cursor.execute(f"""
+            SELECT DISTINCT oi.order_id
+            FROM order_items oi
+            WHERE {" AND ".join(conditions)}
+            ORDER BY oi.order_id DESC
+            LIMIT %s
+        """, params)
+
+    # Then load only the page's lines
+    order_ids = [row[0] for row in cursor.fetchall()]
+    next_cursor = None
+    if len(order_ids) > limit:
+        order_ids = order_ids[:limit]
+        next_cursor = order_ids[-1]
+    if not order_ids:
+        return [], None
+
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    cursor.execute(f"""
+        SELECT o.id, o.total, o.status, o.razorpay_order_id, o.created_at,
+               u.email, vos.status, oi.item_name, oi.quantity, oi.price_at_time
+        FROM order_items oi
+        JOIN orders o ON o.id = oi.order_id
+        JOIN users u ON o.user_id = u.id
+        LEFT JOIN vendor_order_status vos ON vos.order_id = oi.order_id AND vos.vendor_id = oi.vendor_id
+        WHERE oi.vendor_id = %s AND oi.order_id IN ({placeholders})
+        ORDER BY oi.order_id DESC, oi.id
+    """, [vendor_id] + order_ids)
+
+    orders = {}
+    for order_id, total, status, razorpay_order_id, created_at, email, vendor_status, name, quantity, price in cursor.fetchall():
+        order = orders.get(order_id)
+        if order is None:
+            order = orders[order_id] = VendorOrder(
+                order_id, total, status, razorpay_order_id, created_at, email, vendor_status
+            )
+        order.lines.append(VendorOrderLine(name, quantity, price))
+    return list(orders.values()), next_cursor
+
+
+# How far each vendor status counts towards the order's counters:
+# (counts as ready, counts as picked up)
+_VENDOR_PROGRESS = {
+    None: (0, 0),
+    'pending': (0, 0),
+    'ready': (1, 0),
+    'pickedup': (1, 1),
+}
+
+
+def set_vendor_order_status(conn, order_id, vendor_id, status):
+    # Record one vendor's progress ('ready' / 'pickedup') on an order and
+    # move the whole order along once every vendor on it has got there.
+    #
+    # The order row is locked first (SELECT ... FOR UPDATE), so vendors
+    # finishing the same order concurrently are serialised and the last one
+    # always sees the others' counts; the order's vendors_ready /
+    # vendors_pickedup counters replace re-aggregating order_items.
+    if conn.in_transaction:
+        conn.commit()
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        cursor.execute("""
+            SELECT vendors_total, vendors_ready, vendors_pickedup
+            FROM orders
+            WHERE id = %s
+            FOR UPDATE
+        """, (order_id,))
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Order {order_id} not found")
+        vendors_total, vendors_ready, vendors_pickedup = row
+
+        if not vendors_total:
+            # Order predates the counters and was never backfilled
+            cursor.execute("""
+                SELECT COUNT(DISTINCT vendor_id)
+                FROM order_items
+                WHERE order_id = %s
+            """, (order_id,))
+            vendors_total = cursor.fetchone()[0]
+
+        cursor.execute("""
+            SELECT status
+            FROM vendor_order_status
+            WHERE order_id = %s AND vendor_id = %s
+        """, (order_id, vendor_id))
+        row = cursor.fetchone()
+        previous = row[0] if row else None
+        if previous == status:
+            conn.commit()
+            return
+
+        cursor.execute("""
+            INSERT INTO vendor_order_status (order_id, vendor_id, status)
+            VALUES (%s, %s, %s) AS new
+            ON DUPLICATE KEY UPDATE status = new.status
+        """, (order_id, vendor_id, status))
+
+        old_ready, old_pickedup = _VENDOR_PROGRESS[previous]
+        new_ready, new_pickedup = _VENDOR_PROGRESS[status]
+        vendors_ready += new_ready - old_ready
+        vendors_pickedup += new_pickedup - old_pickedup
+
+        if vendors_total and vendors_pickedup >= vendors_total:
+            order_status = 'pickedup'
+        elif vendors_total and vendors_ready >= vendors_total:
+            order_status = 'ready'
+        else:
+            order_status = 'inmaking'
+
+        cursor.execute("""
+            UPDATE orders
+            SET vendors_total = %s, vendors_ready = %s, vendors_pickedup = %s, status = %s
+            WHERE id = %s
+        """, (vendors_total, vendors_ready, vendors_pickedup, order_status, order_id))
+        record_order_events(cursor, [order_id], 'status')
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
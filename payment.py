@@ -1,60 +1,133 @@
-import razorpay
 import streamlit as st
 import mysql.connector
 from datetime import datetime
 import json
 import os
-from config import DB_CONFIG, RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET
+import threading
+from config import (
+    RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET, GATEWAY_HEALTH_TTL, PAYMENT_GATEWAY,
+    FAKE_GATEWAY_LATENCY, FAKE_GATEWAY_JITTER, FAKE_GATEWAY_FAILURE_RATE,
+    GATEWAY_RATE_LIMIT, GATEWAY_BURST
+)
+from db import connect
 import time
 
-# Initialize Razorpay client
-try:
-    client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
-    # Test the connection
-    client.payment.all()
-except razorpay.errors.BadRequestError as e:
-    st.error("Invalid Razorpay credentials. Please check your API keys.")
-    st.stop()
-except Exception as e:
-    st.error(f"Error initializing Razorpay client: {str(e)}")
-    st.stop()
+# The gateway client is built on first use rather than at import, so
+# starting the app (or importing this module from a script) neither pays
+# for the razorpay import nor depends on the gateway being reachable.
+#
+# Any object with razorpay.Client's order / payment / invoice resources
+# can serve as the gateway; PAYMENT_GATEWAY picks one from GATEWAYS.
+_client = None
+_client_lock = threading.Lock()
+_health = None
+_health_lock = threading.Lock()
 
-def create_payment_order(amount, order_id):
+def _razorpay():
+    # razorpay pulls in requests and pkg_resources; import it on first use
+    import razorpay
+    return razorpay
+
+def _razorpay_gateway():
+    # One keep-alive session with default timeouts for every Razorpay call,
+    # behind retries, throttling and latency histograms (gateway_client.py)
+    from gateway_client import GatewayClient, TimeoutSession, TokenBucket
+    bucket = TokenBucket(GATEWAY_RATE_LIMIT, GATEWAY_BURST)
+    session = TimeoutSession(bucket)
+    client = _razorpay().Client(session=session, auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
+    return GatewayClient(client, bucket=bucket)
+
+def _fake_gateway():
+    import fake_gateway
+    from gateway_client import GatewayClient
+    return GatewayClient(fake_gateway.FakeClient(
+        latency=FAKE_GATEWAY_LATENCY,
+        jitter=FAKE_GATEWAY_JITTER,
+        failure_rate=FAKE_GATEWAY_FAILURE_RATE
+    ), http_timeouts=False)
+
+GATEWAYS = {
+    "razorpay": _razorpay_gateway,
+    "fake": _fake_gateway,
+}
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GATEWAYS[PAYMENT_GATEWAY]()
+    return _client
+
+def set_client(client):
+    # Swap the gateway in-process (benchmarks, scripts); None rebuilds the
+    # configured one on next use
+    global _client, _health
+    with _client_lock:
+        _client = client
+        _health = None
+
+def gateway_stats():
+    # Per-endpoint latency histograms, e.g. {'invoice.create': {...}}
+    client = _client
+    if client is None or not hasattr(client, "inner"):
+        return {}
+    return client.stats()
+
+def _bad_request_error():
+    # Exception class the active gateway raises for rejected requests
+    inner = getattr(_client, "inner", _client)
+    if type(inner).__module__ == "fake_gateway" or (inner is None and PAYMENT_GATEWAY == "fake"):
+        import fake_gateway
+        return fake_gateway.BadRequestError
+    return _razorpay().errors.BadRequestError
+
+def __getattr__(name):
+    # Keeps `from payment import client` working without an eager client
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def gateway_health(max_age=GATEWAY_HEALTH_TTL):
+    # Cached probe of the gateway: {'ok': bool, 'error': str or None,
+    # 'checked_at': epoch seconds}. At most one request per max_age seconds
+    # per process; concurrent callers get the last result instead of
+    # probing in parallel.
+    global _health
+    health = _health
+    if health is not None and time.time() - health['checked_at'] < max_age:
+        return health
+    if not _health_lock.acquire(blocking=health is None):
+        return health
     try:
-        # Convert amount to paise (Razorpay uses smallest currency unit)
-        amount_paise = int(amount * 100)
-        
-        # Create order in Razorpay
-        order = client.order.create({
-            'amount': amount_paise,
-            'currency': 'INR',
-            'payment_capture': 1,
-            'notes': {
-                'order_id': order_id
-            }
-        })
-        
-        return order['id']
-    except razorpay.errors.BadRequestError as e:
-        st.error(f"Invalid request to Razorpay: {str(e)}")
-        return None
-    except Exception as e:
-        st.error(f"Error creating payment order: {str(e)}")
-        return None
+        if _health is not None and time.time() - _health['checked_at'] < max_age:
+            return _health
+        try:
+            get_client().payment.all({'count': 1})
+            _health = {'ok': True, 'error': None, 'checked_at': time.time()}
+        except Exception as e:
+            if isinstance(e, _bad_request_error()):
+                error = "Invalid Razorpay credentials. Please check your API keys."
+            else:
+                error = f"Error reaching Razorpay: {str(e)}"
+            _health = {'ok': False, 'error': error, 'checked_at': time.time()}
+        return _health
+    finally:
+        _health_lock.release()
 
 def verify_payment(payment_id, order_id):
     try:
         # Verify payment with Razorpay
-        payment = client.payment.fetch(payment_id)
+        payment = get_client().payment.fetch(payment_id)
         
         if payment['status'] == 'captured':
             # Update order status in database
-            conn = mysql.connector.connect(**DB_CONFIG)
+            conn = connect()
             db_executor = conn.cursor()
             
             db_executor.execute(
-                "UPDATE orders SET status = 'completed' WHERE id = %s",
-                (order_id,)
+                "UPDATE orders SET payment_status = 'paid', payment_id = %s WHERE id = %s",
+                (payment_id, order_id)
             )
             
             conn.commit()
@@ -64,122 +137,84 @@ def verify_payment(payment_id, order_id):
             return True
         return False
         
-    except razorpay.errors.BadRequestError as e:
+    except _bad_request_error() as e:
         st.error(f"Invalid payment verification request: {str(e)}")
         return False
     except Exception as e:
         st.error(f"Error verifying payment: {e}")
         return False
 
-def initiate_payment(amount, order_id):
-    try:
-        # Connect to database
-        conn = mysql.connector.connect(**DB_CONFIG)
-        db_executor = conn.cursor()
-        
-        # Get client details
-        db_executor.execute("""
-            SELECT u.name, u.email, u.role
-            FROM users u
-            JOIN orders o ON u.id = o.user_id
-            WHERE o.id = %s
-        """, (order_id,))
-        
-        client_details = db_executor.fetchone()
-        if not client_details:
-            st.error("Client details not found")
-            return None
-            
-        # Create Razorpay order
-        data = {
-            "amount": int(amount * 100),  # Convert to paise
-            "currency": "INR",
-            "receipt": f"order_{order_id}",
-            "payment_capture": 1,
-            "notes": {
-                "order_id": str(order_id)
-            }
+def create_gateway_order(amount, order_id, reuse_existing=False):
+    # No Streamlit calls in here: this also runs on the background payment
+    # worker threads
+    data = {
+        "amount": int(amount * 100),  # Convert to paise
+        "currency": "INR",
+        "receipt": f"order_{order_id}",
+        "payment_capture": 1,
+        "notes": {
+            "order_id": str(order_id)
         }
-        
-        order = client.order.create(data=data)
-        if not order:
-            return None
-        
-        # Get order items for invoice
-        db_executor.execute("""
-            SELECT m.name, oi.quantity, oi.price_at_time, v.name as vendor_name
-            FROM order_items oi
-            JOIN menu_items m ON oi.menu_item_id = m.id
-            JOIN vendors v ON m.vendor_id = v.id
-            WHERE oi.order_id = %s
-        """, (order_id,))
-        
-        order_items = db_executor.fetchall()
-        
-        # Prepare line items for invoice
-        line_items = []
-        for item in order_items:
-            line_items.append({
-                "name": f"{item[0]} (from {item[3]})",  # Include vendor name in item name
-                "quantity": item[1],
-                "amount": int(item[2] * 100),  # Convert to paise
-                "currency": "INR"
-            })
-        
-        # Create invoice
-        invoice_data = {
-            "type": "invoice",
-            "description": f"Invoice for Order #{order_id}",
-            "customer": {
-                "name": client_details[0],
-                "email": client_details[1],
-            },
-            "line_items": line_items,
-            "notes": {
-                "order_id": str(order_id)
-            },
+    }
+    
+    if reuse_existing:
+        # A retried checkout may already have a gateway order from an
+        # attempt that died before saving it; reuse it instead of creating
+        # a second one
+        existing = get_client().order.all({"receipt": data["receipt"]})
+        if existing.get('items'):
+            return existing['items'][0]
+    return get_client().order.create(data=data)
+
+def get_invoice_details(cursor, order_id):
+    # Customer (name, email, role) and line items (name, quantity, price, vendor)
+    cursor.execute("""
+        SELECT u.name, u.email, u.role
+        FROM users u
+        JOIN orders o ON u.id = o.user_id
+        WHERE o.id = %s
+    """, (order_id,))
+    client_details = cursor.fetchone()
+    
+    cursor.execute("""
+        SELECT oi.item_name, oi.quantity, oi.price_at_time, v.name as vendor_name
+        FROM order_items oi
+        JOIN vendors v ON oi.vendor_id = v.id
+        WHERE oi.order_id = %s
+    """, (order_id,))
+    order_items = cursor.fetchall()
+    return client_details, order_items
+
+def create_invoice(order_id, client_details, order_items, reuse_existing=False):
+    # Prepare line items for invoice
+    line_items = []
+    for item in order_items:
+        line_items.append({
+            "name": f"{item[0]} (from {item[3]})",  # Include vendor name in item name
+            "quantity": item[1],
+            "amount": int(item[2] * 100),  # Convert to paise
             "currency": "INR"
-        }
-        
-        # Try to create the invoice
-        try:
-            invoice = client.invoice.create(data=invoice_data)
-            
-            # Store the invoice URL in session state so we can access it later
-            if 'invoices' not in st.session_state:
-                st.session_state.invoices = {}
-            
-            st.session_state.invoices[str(order_id)] = invoice['short_url']
-            
-        except Exception as e:
-            st.error(f"Error creating invoice: {str(e)}")
-            return order['id']  # Return order ID even if invoice creation fails
-        
-        # Show success message
-        st.success("🎉 Payment initiated successfully! Please complete the payment to confirm your order.")
-        
-        # Display single Pay Now button
-        try:
-            invoice_url = invoice['short_url']
-            st.markdown(f'<a href="{invoice_url}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer; font-size: 16px; font-weight: bold;">Pay Now</button></a>', unsafe_allow_html=True)
-        except Exception as e:
-            st.error(f"Error displaying payment button: {str(e)}")
-        
-        st.balloons()
-        st.snow()
-        
-        return order['id']
-        
-    except razorpay.errors.BadRequestError as e:
-        st.error(f"Invalid payment request: {str(e)}")
-        return None
-    except Exception as e:
-        st.error(f"Error initiating payment: {str(e)}")
-        if 'conn' in locals():
-            conn.rollback()
-        return None
-    finally:
-        if 'db_executor' in locals():
-            db_executor.close()
-        if 'conn' in locals():
-            conn.close() 
\ No newline at end of file
+        })
+    
+    invoice_data = {
+        "type": "invoice",
+        "description": f"Invoice for Order #{order_id}",
+        "customer": {
+            "name": client_details[0],
+            "email": client_details[1],
+        },
+        "line_items": line_items,
+        "receipt": f"order_{order_id}",
+        "notes": {
+            "order_id": str(order_id)
+        },
+        "currency": "INR"
+    }
+    
+    if reuse_existing:
+        # Same as create_gateway_order: an earlier attempt may have created
+        # the invoice and died before recording it
+        existing = get_client().invoice.all({"receipt": invoice_data["receipt"]})
+        if existing.get('items'):
+            return existing['items'][0]
+    return get_client().invoice.create(data=invoice_data)
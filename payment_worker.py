@@ -0,0 +1,229 @@
+import argparse
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from db import connection
+from invoice_index import record_invoice, get_invoice_url
+from order_feed import record_order_events
+from config import (
+    PAYMENT_WORKERS,
+    PAYMENT_JOB_MAX_ATTEMPTS,
+    PAYMENT_JOB_STALE_AFTER,
+    PAYMENT_JOB_RETRY_DELAY,
+    PAYMENT_JOB_RETRY_MAX_DELAY,
+)
+
+# Creates Razorpay orders and invoices off the checkout render path.
+#
+# order_service.place_order writes a payment_jobs row in the same
+# transaction as the order (an outbox). submit() hands the job to a
+# process-wide thread pool; the checkout page only polls get_job(). Jobs
+# left behind by a crashed process are picked up again by drain(), which
+# the `python payment_worker.py` loop runs periodically.
+#
+# A failed attempt puts the job back to 'pending' with next_attempt_at
+# pushed out by retry_delay(); nothing claims it before then, however often
+# the checkout page re-submits it.
+
+_executor = None
+_executor_lock = threading.Lock()
+_in_flight = set()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PAYMENT_WORKERS, thread_name_prefix="payment")
+    return _executor
+
+
+def submit(order_id):
+    with _executor_lock:
+        if order_id in _in_flight:
+            return
+        _in_flight.add(order_id)
+    _get_executor().submit(_run, order_id)
+
+
+def _run(order_id):
+    try:
+        process_job(order_id)
+    except Exception:
+        print(f"Payment job for order {order_id} crashed")
+        print(traceback.format_exc())
+    finally:
+        with _executor_lock:
+            _in_flight.discard(order_id)
+
+
+def retry_delay(attempts):
+    # Seconds to wait after the attempts-th failure: 10, 20, 40, ... capped
+    return min(PAYMENT_JOB_RETRY_MAX_DELAY, PAYMENT_JOB_RETRY_DELAY * 2 ** max(0, attempts - 1))
+
+
+def _claim(order_id):
+    # Only one worker (in any process) gets to run a job at a time; a
+    # pending job is only claimed once it is due, and a 'running' job whose
+    # worker died is reclaimed once it goes stale
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE payment_jobs
+            SET status = 'running', attempts = attempts + 1
+            WHERE order_id = %s
+            AND ((status = 'pending' AND next_attempt_at <= NOW())
+                 OR (status = 'running' AND updated_at < NOW() - INTERVAL %s SECOND))
+        """, (order_id, PAYMENT_JOB_STALE_AFTER))
+        claimed = cursor.rowcount == 1
+        conn.commit()
+
+        job = None
+        if claimed:
+            cursor.execute("""
+                SELECT j.attempts, j.last_error IS NOT NULL, o.total, o.razorpay_order_id
+                FROM payment_jobs j
+                JOIN orders o ON o.id = j.order_id
+                WHERE j.order_id = %s
+            """, (order_id,))
+            job = cursor.fetchone()
+        cursor.close()
+    return job
+
+
+def _finish(order_id, status, invoice_url=None, error=None, retry_in=0):
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE payment_jobs
+            SET status = %s, invoice_url = %s, last_error = %s,
+                next_attempt_at = NOW() + INTERVAL %s SECOND
+            WHERE order_id = %s
+        """, (status, invoice_url, error, retry_in, order_id))
+        conn.commit()
+        cursor.close()
+
+
+def process_job(order_id):
+    # Imported here so the worker module stays cheap to import
+    from payment import create_gateway_order, create_invoice, get_invoice_details
+
+    job = _claim(order_id)
+    if job is None:
+        return False
+    attempts, had_error, total, razorpay_order_id = job
+    # Counts "Try again" after a failed job too, which resets attempts
+    retrying = attempts > 1 or bool(had_error)
+
+    try:
+        if not razorpay_order_id:
+            # On retries the gateway may already have an order for this
+            # receipt from an attempt that died before saving it
+            gateway_order = create_gateway_order(total, order_id, reuse_existing=retrying)
+            razorpay_order_id = gateway_order['id']
+            with connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "UPDATE orders SET razorpay_order_id = %s WHERE id = %s",
+                    (razorpay_order_id, order_id)
+                )
+                record_order_events(cursor, [order_id], 'payment')
+                conn.commit()
+                cursor.close()
+
+        # A retry may follow an attempt that created the invoice but died
+        # before finishing: take it from the local index, or from the
+        # gateway by receipt, rather than issuing a second invoice
+        invoice_url = get_invoice_url(order_id) if retrying else None
+        if invoice_url is None:
+            with connection() as conn:
+                cursor = conn.cursor()
+                client_details, order_items = get_invoice_details(cursor, order_id)
+                cursor.close()
+            invoice = create_invoice(order_id, client_details, order_items, reuse_existing=retrying)
+            record_invoice(order_id, invoice)
+            invoice_url = invoice['short_url']
+
+        _finish(order_id, 'done', invoice_url=invoice_url)
+        return True
+
+    except Exception as e:
+        if attempts >= PAYMENT_JOB_MAX_ATTEMPTS:
+            _finish(order_id, 'failed', error=str(e))
+        else:
+            _finish(order_id, 'pending', error=str(e), retry_in=retry_delay(attempts))
+        print(f"Payment job for order {order_id} failed (attempt {attempts}): {e}")
+        return False
+
+
+def get_job(order_id):
+    with connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT j.status, j.attempts, j.next_attempt_at, j.invoice_url, j.last_error,
+                   o.razorpay_order_id, o.payment_status
+            FROM payment_jobs j
+            JOIN orders o ON o.id = j.order_id
+            WHERE j.order_id = %s
+        """, (order_id,))
+        job = cursor.fetchone()
+        cursor.close()
+    return job
+
+
+def retry(order_id):
+    # Put a failed job back in the queue (e.g. from a "Try again" button)
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE payment_jobs SET status = 'pending', attempts = 0, next_attempt_at = NOW() WHERE order_id = %s AND status = 'failed'",
+            (order_id,)
+        )
+        conn.commit()
+        cursor.close()
+    submit(order_id)
+
+
+def drain(limit=100):
+    # Run every due pending job (and stale running ones) on this thread
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT order_id
+            FROM payment_jobs
+            WHERE status = 'pending' AND next_attempt_at <= NOW()
+            ORDER BY next_attempt_at
+            LIMIT %s
+        """, (limit,))
+        order_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("""
+            SELECT order_id
+            FROM payment_jobs
+            WHERE status = 'running' AND updated_at < NOW() - INTERVAL %s SECOND
+            LIMIT %s
+        """, (PAYMENT_JOB_STALE_AFTER, limit))
+        order_ids += [row[0] for row in cursor.fetchall()]
+        cursor.close()
+
+    processed = 0
+    for order_id in order_ids:
+        if process_job(order_id):
+            processed += 1
+    return processed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process the payment_jobs outbox")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between polls")
+    parser.add_argument("--once", action="store_true", help="drain the outbox once and exit")
+    args = parser.parse_args()
+
+    while True:
+        processed = drain()
+        if processed:
+            print(f"Processed {processed} payment jobs")
+        if args.once:
+            break
+        time.sleep(args.interval)
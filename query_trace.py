@@ -0,0 +1,271 @@
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional
+from config import SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE, QUERY_STATS_MAX_FINGERPRINTS
+
+# Per-statement instrumentation for every cursor handed out by the pool
+# (db.PooledConnection.cursor), including execute_query's.
+#
+#   - each statement is reduced to a fingerprint (literals and IN lists
+#     collapsed), timed from execute() to the last fetch, and its rows and
+#     approximate bytes fetched are counted
+#   - statements run on a Streamlit script thread are added to that
+#     rerun's trace (begin_rerun / end_rerun in main.py); worker threads
+#     only feed the process-wide totals
+#   - totals are kept per fingerprint and per page, and statements slower
+#     than SLOW_QUERY_MS go into a rolling slow-query log
+#
+# The admin "Query Performance" page reads get_stats().
+
+
+@dataclass
+class QueryRecord:
+    fingerprint: str
+    seconds: float
+    rows: int
+    bytes: int
+
+
+@dataclass
+class RerunTrace:
+    page: str
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def seconds(self):
+        return sum(q.seconds for q in self.queries)
+
+    @property
+    def rows(self):
+        return sum(q.rows for q in self.queries)
+
+    @property
+    def bytes(self):
+        return sum(q.bytes for q in self.queries)
+
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_ROWS = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    # "SELECT ... WHERE id IN (%s, %s, %s) AND name = 'x'" and the same
+    # query with 50 ids share "SELECT ... WHERE id IN (...) AND name = ?"
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _LIST.sub("(...)", sql)
+    sql = _ROWS.sub(r"\1", sql)
+    return " ".join(sql.split())
+
+
+def row_bytes(row):
+    # Rough payload size of one fetched row
+    if isinstance(row, dict):
+        row = row.values()
+    size = 0
+    for value in row:
+        if value is None:
+            continue
+        if isinstance(value, (str, bytes, bytearray)):
+            size += len(value)
+        else:
+            size += 8
+    return size
+
+
+class QueryStats:
+    def __init__(self, slow_ms=SLOW_QUERY_MS, log_size=SLOW_QUERY_LOG_SIZE,
+                 max_fingerprints=QUERY_STATS_MAX_FINGERPRINTS):
+        self.slow_ms = slow_ms
+        self._max_fingerprints = max_fingerprints
+        self._queries = OrderedDict()  # fingerprint -> totals, least recently seen first
+        self._pages = {}  # page -> totals per rerun
+        self._slow = deque(maxlen=log_size)
+        self._lock = threading.Lock()
+
+    def record(self, record, page=None):
+        with self._lock:
+            totals = self._queries.get(record.fingerprint)
+            if totals is None:
+                totals = self._queries[record.fingerprint] = {
+                    "calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "bytes": 0,
+                }
+                while len(self._queries) > self._max_fingerprints:
+                    self._queries.popitem(last=False)
+            self._queries.move_to_end(record.fingerprint)
+            totals["calls"] += 1
+            totals["seconds"] += record.seconds
+            totals["max_seconds"] = max(totals["max_seconds"], record.seconds)
+            totals["rows"] += record.rows
+            totals["bytes"] += record.bytes
+            if record.seconds * 1000 >= self.slow_ms:
+                self._slow.append({
+                    "at": time.time(),
+                    "page": page,
+                    "fingerprint": record.fingerprint,
+                    "seconds": record.seconds,
+                    "rows": record.rows,
+                    "bytes": record.bytes,
+                })
+
+    def record_rerun(self, trace):
+        with self._lock:
+            totals = self._pages.setdefault(trace.page, {
+                "reruns": 0, "queries": 0, "max_queries": 0, "seconds": 0.0, "rows": 0, "bytes": 0,
+            })
+            totals["reruns"] += 1
+            totals["queries"] += len(trace.queries)
+            totals["max_queries"] = max(totals["max_queries"], len(trace.queries))
+            totals["seconds"] += trace.seconds
+            totals["rows"] += trace.rows
+            totals["bytes"] += trace.bytes
+
+    def queries(self):
+        # [(fingerprint, totals)], worst total time first
+        with self._lock:
+            items = [(fp, dict(totals)) for fp, totals in self._queries.items()]
+        return sorted(items, key=lambda item: item[1]["seconds"], reverse=True)
+
+    def pages(self):
+        with self._lock:
+            items = [(page, dict(totals)) for page, totals in self._pages.items()]
+        return sorted(items, key=lambda item: item[1]["seconds"], reverse=True)
+
+    def slow_queries(self):
+        # Newest first
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+            self._pages.clear()
+            self._slow.clear()
+
+
+_stats = QueryStats()
+_local = threading.local()
+
+
+def get_stats():
+    return _stats
+
+
+def begin_rerun(page="unknown"):
+    _local.trace = RerunTrace(page)
+    return _local.trace
+
+
+def set_page(page):
+    trace = current_trace()
+    if trace is not None:
+        trace.page = page
+
+
+def current_trace() -> Optional[RerunTrace]:
+    return getattr(_local, "trace", None)
+
+
+def end_rerun():
+    trace = current_trace()
+    _local.trace = None
+    if trace is not None:
+        _stats.record_rerun(trace)
+    return trace
+
+
+def record(sql, seconds, rows, nbytes):
+    record = QueryRecord(fingerprint(sql), seconds, rows, nbytes)
+    trace = current_trace()
+    if trace is not None:
+        trace.queries.append(record)
+    _stats.record(record, trace.page if trace is not None else None)
+    return record
+
+
+class TracedCursor:
+    # Wraps a mysql.connector cursor. A statement's record is closed when
+    # the next statement starts or the cursor is closed, so time spent
+    # fetching (unbuffered cursors stream rows) is counted with it.
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._sql = None
+        self._seconds = 0.0
+        self._rows = 0
+        self._bytes = 0
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _flush(self):
+        if self._sql is not None:
+            record(self._sql, self._seconds, self._rows, self._bytes)
+            self._sql = None
+
+    def _timed(self, method, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self._seconds += time.perf_counter() - start
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._flush()
+        self._sql, self._seconds, self._rows, self._bytes = operation, 0.0, 0, 0
+        return self._timed(self._cursor.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._flush()
+        self._sql, self._seconds, self._rows, self._bytes = operation, 0.0, 0, 0
+        return self._timed(self._cursor.executemany, operation, seq_params, *args, **kwargs)
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None and self._sql is not None:
+            self._rows += 1
+            self._bytes += row_bytes(row)
+        return row
+
+    def _fetched(self, rows):
+        if self._sql is not None:
+            self._rows += len(rows)
+            self._bytes += sum(row_bytes(row) for row in rows)
+        return rows
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetched(self._timed(self._cursor.fetchmany, *args, **kwargs))
+
+    def fetchall(self):
+        return self._fetched(self._timed(self._cursor.fetchall))
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
+
+    def __del__(self):
+        # Cursors that are never closed still get their last statement counted
+        try:
+            self._flush()
+        except Exception:
+            pass
@@ -0,0 +1,211 @@
+import argparse
+import csv
+import sys
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import mysql.connector
+from db import connection
+from order_service import mark_orders_paid
+
+# End-of-day reconciliation of Razorpay payments against orders.
+#
+# Gateway payments for the window are listed in pages of up to 100, matched
+# to orders on razorpay_order_id (indexed, see migrations/0009_hot_path_indexes.sql)
+# with one IN (...) query per batch, and missing 'paid' statuses are applied
+# with one UPDATE per batch. API and database round-trips grow with
+# payments / page size and orders / batch size, never one per order.
+#
+#   python reconcile_payments.py                          # yesterday
+#   python reconcile_payments.py --from 2024-03-01 --to 2024-03-08 --dry-run
+
+GATEWAY_PAGE_SIZE = 100  # Razorpay's maximum for payment.all
+
+
+@dataclass
+class Mismatch:
+    kind: str
+    order_id: object
+    razorpay_order_id: object
+    razorpay_payment_id: object
+    detail: str
+
+
+def fetch_payments(client, start, end, page_size=GATEWAY_PAGE_SIZE):
+    # Every gateway payment created in [start, end), newest first
+    payments = []
+    calls = 0
+    skip = 0
+    while True:
+        page = client.payment.all({
+            'from': int(start.timestamp()),
+            'to': int(end.timestamp()) - 1,
+            'count': page_size,
+            'skip': skip,
+        })
+        calls += 1
+        items = page.get('items', [])
+        payments.extend(items)
+        skip += len(items)
+        if len(items) < page_size:
+            break
+    return payments, calls
+
+
+def _chunks(items, size):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def load_orders(cursor, razorpay_order_ids, batch_size):
+    orders = {}
+    for chunk in _chunks(razorpay_order_ids, batch_size):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"""
+            SELECT razorpay_order_id, id, total, payment_status
+            FROM orders
+            WHERE razorpay_order_id IN ({placeholders})
+        """, chunk)
+        for razorpay_order_id, order_id, total, payment_status in cursor.fetchall():
+            orders[razorpay_order_id] = (order_id, total, payment_status)
+    return orders
+
+
+def reconcile(client, start, end, batch_size=500, dry_run=False):
+    payments, api_calls = fetch_payments(client, start, end)
+
+    # One captured payment is enough to settle an order; keep it over any
+    # failed attempts for the same gateway order
+    by_order = {}
+    for payment in payments:
+        razorpay_order_id = payment.get('order_id')
+        if not razorpay_order_id:
+            continue
+        current = by_order.get(razorpay_order_id)
+        if current is None or (payment.get('status') == 'captured' and current.get('status') != 'captured'):
+            by_order[razorpay_order_id] = payment
+
+    mismatches = []
+    to_mark_paid = {}
+    db_statements = 0
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            orders = load_orders(cursor, by_order, batch_size)
+            db_statements += -(-len(by_order) // batch_size)
+
+            captured_orders = set()
+            for razorpay_order_id, payment in by_order.items():
+                captured = payment.get('status') == 'captured'
+                order = orders.get(razorpay_order_id)
+                if order is None:
+                    if captured:
+                        mismatches.append(Mismatch(
+                            "unknown_order", None, razorpay_order_id, payment['id'],
+                            "captured at the gateway but no local order has this razorpay_order_id"
+                        ))
+                    continue
+
+                order_id, total, payment_status = order
+                if not captured:
+                    continue
+                captured_orders.add(order_id)
+                expected = int(round(total * 100))
+                if payment.get('amount') != expected:
+                    mismatches.append(Mismatch(
+                        "amount", order_id, razorpay_order_id, payment['id'],
+                        f"gateway captured {payment.get('amount')} paise, order total is {expected}"
+                    ))
+                    continue
+                if payment_status != 'paid':
+                    to_mark_paid[order_id] = payment['id']
+                    mismatches.append(Mismatch(
+                        "missing_paid", order_id, razorpay_order_id, payment['id'],
+                        f"captured at the gateway but order is '{payment_status}'"
+                    ))
+
+            # Orders we believe are paid that have no captured payment in the window
+            cursor.execute("""
+                SELECT id, razorpay_order_id
+                FROM orders
+                WHERE created_at >= %s AND created_at < %s AND payment_status = 'paid'
+            """, (start, end))
+            db_statements += 1
+            for order_id, razorpay_order_id in cursor.fetchall():
+                if order_id not in captured_orders:
+                    mismatches.append(Mismatch(
+                        "not_captured", order_id, razorpay_order_id, None,
+                        "marked paid locally but no captured gateway payment in the window"
+                    ))
+
+            updated = 0
+            if not dry_run:
+                for chunk in _chunks(to_mark_paid, batch_size):
+                    updated += mark_orders_paid(cursor, {order_id: to_mark_paid[order_id] for order_id in chunk})
+                    db_statements += 1
+                conn.commit()
+            else:
+                conn.rollback()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    return {
+        "payments": len(payments),
+        "gateway_orders": len(by_order),
+        "updated": updated,
+        "mismatches": mismatches,
+        "api_calls": api_calls,
+        "db_statements": db_statements,
+    }
+
+
+def write_report(mismatches, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["kind", "order_id", "razorpay_order_id", "razorpay_payment_id", "detail"])
+        for m in mismatches:
+            writer.writerow([m.kind, m.order_id, m.razorpay_order_id, m.razorpay_payment_id, m.detail])
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+if __name__ == "__main__":
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    parser = argparse.ArgumentParser(description="Reconcile Razorpay payments against orders")
+    parser.add_argument("--from", dest="start", type=_parse_date, default=today - timedelta(days=1),
+                        help="first day, YYYY-MM-DD (default: yesterday)")
+    parser.add_argument("--to", dest="end", type=_parse_date, default=today,
+                        help="day after the last one, YYYY-MM-DD (default: today)")
+    parser.add_argument("--batch-size", type=int, default=500, help="orders per SELECT/UPDATE")
+    parser.add_argument("--dry-run", action="store_true", help="report without updating orders")
+    parser.add_argument("--report", help="write mismatches to this CSV file")
+    args = parser.parse_args()
+
+    from payment import get_client
+
+    try:
+        result = reconcile(get_client(), args.start, args.end, args.batch_size, args.dry_run)
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(traceback.format_exc())
+        sys.exit(1)
+
+    print(f"Window {args.start:%Y-%m-%d} to {args.end:%Y-%m-%d}: "
+          f"{result['payments']} gateway payments for {result['gateway_orders']} orders")
+    print(f"{result['updated']} orders marked paid{' (dry run)' if args.dry_run else ''}")
+    print(f"{result['api_calls']} gateway calls, {result['db_statements']} database statements")
+
+    mismatches = result["mismatches"]
+    if mismatches:
+        print(f"\n{len(mismatches)} mismatches:")
+        for m in mismatches:
+            print(f"  {m.kind:<14} order {m.order_id or '-':<8} {m.razorpay_order_id or '-':<24} {m.detail}")
+    if args.report:
+        write_report(mismatches, args.report)
+        print(f"\nReport written to {args.report}")
@@ -0,0 +1,88 @@
+import os
+import pytest
+import mysql.connector
+
+# Tests that use the `mysql_conn` fixture run against a scratch database
+# named by TEST_DB_DATABASE (plus TEST_DB_HOST / TEST_DB_PORT / TEST_DB_USER /
+# TEST_DB_PASSWORD). It is migrated once and emptied before each test, and
+# the app's connection pool is pointed at it for the test's duration. Without
+# TEST_DB_DATABASE those tests are skipped.
+TEST_DB = {
+    "host": os.getenv("TEST_DB_HOST", "localhost"),
+    "port": int(os.getenv("TEST_DB_PORT", 3306)),
+    "user": os.getenv("TEST_DB_USER", "root"),
+    "password": os.getenv("TEST_DB_PASSWORD", ""),
+    "database": os.getenv("TEST_DB_DATABASE"),
+}
+
+
+@pytest.fixture(scope="session")
+def _migrated_db():
+    if not TEST_DB["database"]:
+        pytest.skip("TEST_DB_DATABASE not set")
+    from migrate import migrate
+    conn = mysql.connector.connect(**TEST_DB)
+    try:
+        migrate(conn, log=lambda message: None)
+        cursor = conn.cursor()
+        cursor.execute("SHOW TABLES")
+        tables = [row[0] for row in cursor.fetchall() if row[0] != "schema_migrations"]
+        cursor.close()
+    finally:
+        conn.close()
+    return tables
+
+
+@pytest.fixture
+def mysql_conn(_migrated_db, monkeypatch):
+    import db
+    conn = mysql.connector.connect(**TEST_DB)
+    cursor = conn.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in _migrated_db:
+        cursor.execute(f"TRUNCATE TABLE {table}")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    cursor.close()
+    conn.commit()
+
+    pool = db.ConnectionPool(TEST_DB, size=4, timeout=5, max_age=60, ping_after=30)
+    monkeypatch.setattr(db, "_pool", pool)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def seed_menu(mysql_conn):
+    # One customer and two vendors with two items each. Returns
+    # (user_id, {vendor_id: [menu_item_id, ...]})
+    cursor = mysql_conn.cursor()
+    cursor.execute("INSERT INTO users (name, email, password, role) VALUES ('Test', 'test@example.com', 'x', 'user')")
+    user_id = cursor.lastrowid
+    menu = {}
+    for vendor in ("Canteen", "Cafe"):
+        cursor.execute("INSERT INTO vendors (name, description) VALUES (%s, '')", (vendor,))
+        vendor_id = cursor.lastrowid
+        menu[vendor_id] = []
+        for name, price in ((f"{vendor} Thali", 80), (f"{vendor} Chai", 15)):
+            cursor.execute("INSERT INTO menu_items (vendor_id, name, description, price) VALUES (%s, %s, '', %s)",
+                           (vendor_id, name, price))
+            menu[vendor_id].append(cursor.lastrowid)
+    cursor.close()
+    mysql_conn.commit()
+    return user_id, menu
+
+
+@pytest.fixture
+def extra_connection(mysql_conn):
+    # Opens more sessions on the test database, for tests that need two
+    # transactions at once; closed after the test
+    opened = []
+
+    def connect():
+        conn = mysql.connector.connect(**TEST_DB)
+        opened.append(conn)
+        return conn
+
+    yield connect
+    for conn in opened:
+        conn.close()
@@ -0,0 +1,40 @@
+from datetime import date, datetime
+import pytest
+from analytics import hourly_profile, revenue_trend
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params):
+        self.statements.append((" ".join(sql.split()), list(params)))
+
+    def fetchall(self):
+        return []
+
+
+@pytest.mark.parametrize("run", [
+    lambda c, vendor_id: revenue_trend(c, date(2025, 7, 1), date(2025, 7, 8), "hour", vendor_id),
+    lambda c, vendor_id: revenue_trend(c, date(2025, 7, 1), date(2025, 7, 8), "week", vendor_id),
+    lambda c, vendor_id: hourly_profile(c, date(2025, 7, 1), date(2025, 7, 8), vendor_id),
+])
+def test_vendor_filter_is_only_added_for_a_vendor(run):
+    cursor = RecordingCursor()
+    run(cursor, None)
+    [(sql, params)] = cursor.statements
+    assert "IS NULL" not in sql and "vendor_id = %s" not in sql
+    assert len(params) == 2
+
+    cursor = RecordingCursor()
+    run(cursor, 3)
+    [(sql, params)] = cursor.statements
+    assert "IS NULL" not in sql and "vendor_id = %s" in sql
+    assert params[-1] == 3 and len(params) == 3
+
+
+def test_rollup_range_covers_a_partial_last_day():
+    cursor = RecordingCursor()
+    revenue_trend(cursor, date(2025, 7, 1), datetime(2025, 7, 8, 12), "day", 3)
+    [(_, params)] = cursor.statements
+    assert params == [date(2025, 7, 1), date(2025, 7, 9), 3]
@@ -0,0 +1,75 @@
+import threading
+import time
+from cache import QueryCache
+
+
+def test_serves_cached_value_until_invalidated():
+    cache = QueryCache(max_entries=10, ttl=60)
+    loads = []
+    loader = lambda: loads.append(1) or len(loads)
+
+    assert cache.get_or_load("menu", loader, tags=("menu",)) == 1
+    assert cache.get_or_load("menu", loader, tags=("menu",)) == 1
+    cache.invalidate("menu")
+    assert cache.get_or_load("menu", loader, tags=("menu",)) == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidate_only_drops_matching_tags():
+    cache = QueryCache(max_entries=10, ttl=60)
+    cache.get_or_load("catalog", lambda: "catalog", tags=("menu", "vendors"))
+    cache.get_or_load("vendors", lambda: "vendors", tags=("vendors",))
+    cache.get_or_load("other", lambda: "other", tags=("other",))
+
+    cache.invalidate("menu")
+
+    assert cache.get_or_load("catalog", lambda: "reloaded") == "reloaded"
+    assert cache.get_or_load("vendors", lambda: "reloaded") == "vendors"
+    assert cache.get_or_load("other", lambda: "reloaded") == "other"
+
+
+def test_entries_expire_after_ttl():
+    cache = QueryCache(max_entries=10, ttl=0.01)
+    cache.get_or_load("menu", lambda: "old")
+    time.sleep(0.02)
+    assert cache.get_or_load("menu", lambda: "new") == "new"
+
+
+def test_failed_loads_are_not_cached():
+    cache = QueryCache(max_entries=10, ttl=60)
+    assert cache.get_or_load("menu", lambda: None) is None
+    assert cache.get_or_load("menu", lambda: "loaded") == "loaded"
+
+
+def test_value_loaded_across_an_invalidation_is_not_kept():
+    cache = QueryCache(max_entries=10, ttl=60)
+    loading = threading.Event()
+    release = threading.Event()
+
+    def slow_loader():
+        loading.set()
+        release.wait(5)
+        return "stale"
+
+    result = []
+    reader = threading.Thread(target=lambda: result.append(cache.get_or_load("menu", slow_loader, tags=("menu",))))
+    reader.start()
+    loading.wait(5)
+    cache.invalidate("menu")  # a write lands while the read is in flight
+    release.set()
+    reader.join(5)
+
+    assert result == ["stale"]  # served once to the reader that loaded it
+    assert cache.get_or_load("menu", lambda: "fresh", tags=("menu",)) == "fresh"
+
+
+def test_evicts_least_recently_used():
+    cache = QueryCache(max_entries=2, ttl=60)
+    cache.get_or_load("a", lambda: "a")
+    cache.get_or_load("b", lambda: "b")
+    cache.get_or_load("a", lambda: "a2")  # touch a
+    cache.get_or_load("c", lambda: "c")
+
+    assert cache.get_or_load("a", lambda: "reloaded") == "a"
+    assert cache.get_or_load("b", lambda: "reloaded") == "reloaded"
+    assert cache.stats()["evictions"] >= 1
@@ -0,0 +1,156 @@
+from contextlib import contextmanager
+from decimal import Decimal
+from types import SimpleNamespace
+import pytest
+from streamlit.testing.v1 import AppTest
+import order_service
+import payment_worker
+import ui
+from order_feed import FeedState
+from order_service import CartLine, PlacedOrder
+
+
+def _cart_page():
+    import ui
+    ui.cart_ui()
+
+
+class FakeConn:
+    def __init__(self):
+        self.closed = False
+        self.rolled_back = False
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor()
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCursor:
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def checkout(monkeypatch):
+    # cart_ui with the database and gateway replaced; records what checkout did
+    calls = {"place_order": [], "submit": [], "conns": []}
+
+    def connect():
+        conn = FakeConn()
+        calls["conns"].append(conn)
+        return conn
+
+    def place_order(conn, user_id, cart, idempotency_key=None):
+        calls["place_order"].append((conn, user_id, dict(cart), idempotency_key))
+        return PlacedOrder(41, Decimal("95.00"))
+
+    monkeypatch.setattr(ui, "connect", connect)
+    monkeypatch.setattr(ui, "price_cart", lambda cursor, cart: [
+        CartLine(item_id, f"Item {item_id}", 1, "Canteen", quantity, Decimal("15.00"))
+        for item_id, quantity in cart.items()
+    ])
+    monkeypatch.setattr(ui, "gateway_health", lambda: {"ok": True, "error": None})
+    # Patched on the modules themselves, so checkout must call through them
+    monkeypatch.setattr(order_service, "place_order", place_order)
+    monkeypatch.setattr(payment_worker, "submit", lambda order_id: calls["submit"].append(order_id))
+    monkeypatch.setattr(payment_worker, "get_job", lambda order_id: {
+        "status": "pending", "payment_status": "pending", "last_error": None,
+        "invoice_url": None, "razorpay_order_id": None,
+    })
+
+    app = AppTest.from_function(_cart_page, default_timeout=10)
+    app.session_state["user"] = {"id": 7, "name": "Test", "email": "test@example.com"}
+    app.session_state["cart"] = {3: 2, 5: 1}
+    return app, calls
+
+
+def _click(app, label):
+    [button] = [b for b in app.button if b.label == label]
+    button.click().run()
+
+
+def test_place_order_calls_order_service_and_queues_payment(checkout):
+    app, calls = checkout
+    app.run()
+    assert not app.exception
+    assert "**Total Amount: ₹45.00**" in [m.value for m in app.markdown]
+
+    _click(app, "Place Order")
+
+    assert not app.exception
+    [(conn, user_id, cart, key)] = calls["place_order"]
+    assert (user_id, cart) == (7, {3: 2, 5: 1})
+    assert key
+    # Queued at checkout, then re-submitted by the pending page (idempotent)
+    assert set(calls["submit"]) == {41}
+    assert app.session_state["pending_payment"] == 41
+    assert any("Setting up your payment" in i.value for i in app.info)
+    assert app.session_state["cart"] == {}
+    assert all(conn.closed for conn in calls["conns"])
+
+
+
+def test_unexpected_checkout_error_is_shown_not_raised(checkout, monkeypatch):
+    app, calls = checkout
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("gateway queue unavailable")
+
+    monkeypatch.setattr(payment_worker, "submit", broken)
+    app.run()
+    _click(app, "Place Order")
+
+    assert not app.exception
+    assert any("gateway queue unavailable" in e.value for e in app.error)
+    assert all(conn.closed for conn in calls["conns"])
+
+
+def _customer_page():
+    import ui
+    ui.customer_ui()
+
+
+def test_customer_page_checks_out_like_the_cart_page(monkeypatch):
+    calls = {"place_order": [], "submit": []}
+
+    @contextmanager
+    def connection():
+        yield FakeConn()
+
+    def place_order(conn, user_id, cart, idempotency_key=None):
+        calls["place_order"].append((user_id, dict(cart), idempotency_key))
+        return PlacedOrder(42, Decimal("30.00"))
+
+    items = [SimpleNamespace(id=3, name="Chai", description="", price=Decimal("15.00"), vendor_id=1)]
+    monkeypatch.setattr(ui, "st_autorefresh", lambda **kwargs: None)
+    monkeypatch.setattr(ui, "get_current_user", lambda: {"id": 7})
+    monkeypatch.setattr(ui, "get_catalog", lambda: SimpleNamespace(available_items=lambda: items))
+    monkeypatch.setattr(ui, "connection", connection)
+    monkeypatch.setattr(ui, "poll", lambda cursor, scope, scope_id, state, load_all, load_some: (FeedState(0), False))
+    monkeypatch.setattr(order_service, "place_order", place_order)
+    monkeypatch.setattr(payment_worker, "submit", lambda order_id: calls["submit"].append(order_id))
+    monkeypatch.setattr(payment_worker, "get_job", lambda order_id: {
+        "status": "pending", "payment_status": "pending", "last_error": None,
+        "invoice_url": None, "razorpay_order_id": None,
+    })
+
+    app = AppTest.from_function(_customer_page, default_timeout=10)
+    app.session_state["cart"] = {3: 2}
+    app.run()
+    _click(app, "🛒 Place Order")
+    _click(app, "🛒 Place Order")  # a double click finds the cart already empty
+
+    assert not app.exception
+    [(user_id, cart, key)] = calls["place_order"]
+    assert (user_id, cart) == (7, {3: 2})
+    assert key
+    # Queued at checkout, then re-submitted by the pending page (idempotent)
+    assert set(calls["submit"]) == {42}
+    assert app.session_state["pending_payment"] == 42
+    assert any("Setting up your payment" in i.value for i in app.info)
+    assert app.session_state["cart"] == {}
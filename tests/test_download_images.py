@@ -0,0 +1,79 @@
+import functools
+import io
+import json
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from PIL import Image
+from download_images import download_all, create_session, MANIFEST_NAME
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def image_server(tmp_path):
+    # Serves tmp_path/site over HTTP on a free local port
+    site = tmp_path / "site"
+    site.mkdir()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(site)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield site, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _jpeg(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 600), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def test_downloads_dedups_and_resumes(image_server, tmp_path):
+    site, base = image_server
+    (site / "tea.jpg").write_bytes(_jpeg("brown"))
+    (site / "coffee.jpg").write_bytes(_jpeg("black"))
+    (site / "chai.jpg").write_bytes((site / "tea.jpg").read_bytes())  # same bytes, other URL
+    (site / "broken.jpg").write_bytes(b"<html>not an image</html>")
+    images = {
+        "tea": f"{base}/tea.jpg",
+        "coffee": f"{base}/coffee.jpg",
+        "masala chai": f"{base}/chai.jpg",
+        "broken": f"{base}/broken.jpg",
+        "missing": f"{base}/missing.jpg",
+    }
+    dest = tmp_path / "images"
+
+    first = download_all(images, dest=str(dest), workers=4, session=create_session(4, retries=0))
+
+    assert first == {"downloaded": 2, "resumed": 0, "duplicates": 1, "failed": 2}
+    manifest = json.loads((dest / MANIFEST_NAME).read_text())
+    assert set(manifest) == {"tea", "coffee", "masala chai"}
+    assert manifest["tea"]["filename"] == manifest["masala chai"]["filename"]
+    assert sorted(p.name for p in dest.glob("*.jpg")) == sorted({manifest["tea"]["filename"], "coffee.jpg"})
+    assert max(Image.open(dest / "coffee.jpg").size) == 800
+    assert not list(dest.glob("*.part"))
+
+    # Second run: everything already fetched is skipped, failures are retried
+    (site / "missing.jpg").write_bytes(_jpeg("green"))
+    second = download_all(images, dest=str(dest), workers=4, session=create_session(4, retries=0))
+
+    assert second == {"downloaded": 1, "resumed": 3, "duplicates": 0, "failed": 1}
+    assert "missing" in json.loads((dest / MANIFEST_NAME).read_text())
+
+
+def test_changed_file_on_disk_is_fetched_again(image_server, tmp_path):
+    site, base = image_server
+    (site / "tea.jpg").write_bytes(_jpeg("brown"))
+    images = {"tea": f"{base}/tea.jpg"}
+    dest = tmp_path / "images"
+    download_all(images, dest=str(dest), workers=1, session=create_session(1, retries=0))
+
+    (dest / "tea.jpg").write_bytes(b"truncated")
+    again = download_all(images, dest=str(dest), workers=1, session=create_session(1, retries=0))
+
+    assert again["downloaded"] == 1 and again["resumed"] == 0
+    assert Image.open(dest / "tea.jpg").format == "JPEG"
@@ -0,0 +1,19 @@
+import pytest
+import explain_check
+from config import DB_CONFIG
+
+
+def test_explain_needs_a_scratch_database(capsys):
+    with pytest.raises(SystemExit):
+        explain_check.main([])
+    with pytest.raises(SystemExit):
+        explain_check.main(["--static", "--write-baseline"])
+    assert explain_check.main(["--database", DB_CONFIG["database"]]) == 2
+    assert "Refusing" in capsys.readouterr().out
+
+
+def test_committed_baseline_covers_the_lint_findings():
+    queries, _ = explain_check.extract_queries()
+    findings, _ = explain_check.check(queries)
+    baseline = explain_check.load_baseline()
+    assert [f.key for f in findings if f.key not in baseline] == []
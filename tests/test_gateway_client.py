@@ -0,0 +1,106 @@
+import time
+import pytest
+import requests
+from gateway_client import GatewayClient, GatewayThrottled, LatencyHistogram, TokenBucket
+
+
+class ServerError(Exception):
+    pass
+
+
+class FlakyResource:
+    # Fails the first `failures` calls of each method with `error`
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.calls = {"all": 0, "create": 0}
+
+    def _call(self, method):
+        self.calls[method] += 1
+        if self.calls[method] <= self.failures:
+            raise self.error
+        return {"method": method}
+
+    def all(self, data=None, **kwargs):
+        return self._call("all")
+
+    def create(self, data=None, **kwargs):
+        return self._call("create")
+
+
+class Inner:
+    def __init__(self, resource):
+        self.order = resource
+        self.payment = resource
+        self.invoice = resource
+
+
+def _client(resource, **kwargs):
+    kwargs.setdefault("backoff", 0.001)
+    return GatewayClient(Inner(resource), bucket=TokenBucket(1000, 1000), http_timeouts=False, **kwargs)
+
+
+def test_reads_are_retried_on_server_errors():
+    resource = FlakyResource(2, ServerError("502"))
+    client = _client(resource, read_retries=3)
+
+    assert client.order.all({}) == {"method": "all"}
+    assert resource.calls["all"] == 3
+    assert client.stats()["order.all"]["retries"] == 2
+    assert client.stats()["order.all"]["errors"] == 2
+
+
+def test_creates_are_not_retried_unless_rate_limited():
+    resource = FlakyResource(1, ServerError("502"))
+    with pytest.raises(ServerError):
+        _client(resource).invoice.create(data={})
+    assert resource.calls["create"] == 1
+
+    resource = FlakyResource(1, ServerError("429 Too Many Requests"))
+    assert _client(resource).invoice.create(data={}) == {"method": "create"}
+    assert resource.calls["create"] == 2
+
+
+def test_client_errors_are_not_retried():
+    resource = FlakyResource(1, ValueError("bad request"))
+    with pytest.raises(ValueError):
+        _client(resource).order.all({})
+    assert resource.calls["all"] == 1
+
+
+def test_connection_errors_are_retried():
+    resource = FlakyResource(1, requests.exceptions.ConnectionError("reset"))
+    assert _client(resource).payment.all({}) == {"method": "all"}
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, burst=5)
+    start = time.monotonic()
+    for _ in range(15):
+        bucket.acquire(start + 5)
+    # 5 from the burst, the other 10 at 100/s
+    assert time.monotonic() - start >= 0.09
+
+
+def test_token_bucket_gives_up_at_deadline():
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.acquire(time.monotonic() + 1)
+    with pytest.raises(GatewayThrottled):
+        bucket.acquire(time.monotonic() + 0.1)
+
+
+def test_pause_after_429_blocks_tokens():
+    bucket = TokenBucket(rate=1000, burst=10)
+    bucket.pause(0.05)
+    start = time.monotonic()
+    bucket.acquire(start + 1)
+    assert time.monotonic() - start >= 0.04
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram(bounds_ms=[10, 100, 1000])
+    for ms in [5] * 90 + [50] * 9 + [5000]:
+        histogram.record(ms / 1000)
+    snapshot = histogram.snapshot()
+    assert (snapshot["p50_ms"], snapshot["p95_ms"], snapshot["p99_ms"]) == (10, 100, 100)
+    assert snapshot["buckets"]["slower"] == 1
@@ -0,0 +1,81 @@
+import io
+import logging
+from PIL import Image
+import image_store
+from convert_images import encode_variants, encode_missing_variants
+from image_store import load_image, put_image, put_variants, ImageCache
+
+
+def _jpeg(size=(1200, 900)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "orange").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _fresh_cache(monkeypatch, miss_ttl=300):
+    monkeypatch.setattr(image_store, "image_cache", ImageCache(10 * 1024 * 1024, miss_ttl=miss_ttl))
+
+
+def test_serves_pre_encoded_variant(tmp_path, monkeypatch):
+    _fresh_cache(monkeypatch)
+    source = _jpeg()
+    image_hash = put_image(source, root=tmp_path)
+    put_variants(image_hash, encode_variants(source), root=tmp_path)
+
+    data = load_image(image_hash, "card", "webp", root=tmp_path)
+
+    assert Image.open(io.BytesIO(data)).format == "WEBP"
+    assert max(Image.open(io.BytesIO(data)).size) == 400
+
+
+def test_missing_variant_is_a_logged_placeholder_not_the_source(tmp_path, monkeypatch, caplog):
+    _fresh_cache(monkeypatch)
+    image_hash = put_image(_jpeg(), root=tmp_path)  # stored before variants existed
+
+    with caplog.at_level(logging.WARNING, logger="image_store"):
+        assert load_image(image_hash, "card", "jpeg", root=tmp_path) is None
+
+    # Nothing is decoded or encoded on the request path
+    assert not hasattr(image_store, "Image")
+    assert not (tmp_path / image_hash[:2] / f"{image_hash}.card.jpeg").exists()
+    assert any(image_hash in r.getMessage() for r in caplog.records)
+
+
+def test_missing_variant_is_remembered_until_the_ttl_expires(tmp_path, monkeypatch):
+    _fresh_cache(monkeypatch)
+    reads = []
+    real_read = image_store._read_file
+    monkeypatch.setattr(image_store, "_read_file", lambda path: reads.append(path) or real_read(path))
+
+    for _ in range(3):
+        assert load_image("0" * 64, root=tmp_path) is None
+    assert len(reads) == 2  # the requested format and its JPEG, once
+    assert image_store.image_cache.stats()["missing_hits"] == 2
+
+    _fresh_cache(monkeypatch, miss_ttl=0)
+    reads.clear()
+    load_image("0" * 64, root=tmp_path)
+    load_image("0" * 64, root=tmp_path)
+    assert len(reads) == 4
+
+
+def test_missing_variants_are_encoded_offline(tmp_path, monkeypatch):
+    _fresh_cache(monkeypatch)
+    source = _jpeg()
+    image_hash = put_image(source, root=tmp_path)
+    broken_hash = put_image(b"not an image", root=tmp_path)
+
+    assert encode_missing_variants([image_hash, broken_hash, "0" * 64], root=tmp_path) == 1
+    assert encode_missing_variants([image_hash], root=tmp_path) == 0  # already there
+
+    data = load_image(image_hash, "card", "jpeg", root=tmp_path)
+    assert max(Image.open(io.BytesIO(data)).size) == 400
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = ImageCache(max_bytes=10)
+    cache.get_or_load("a", lambda: b"123456")
+    cache.get_or_load("b", lambda: b"123456")
+
+    assert cache.stats()["bytes"] <= 10
+    assert cache.stats()["evictions"] == 1
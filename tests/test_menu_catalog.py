@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+from decimal import Decimal
+import menu_catalog
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+def _patch_connection(monkeypatch, rows):
+    cursor = FakeCursor(rows)
+
+    class FakeConn:
+        def cursor(self):
+            return cursor
+
+    @contextmanager
+    def connection():
+        yield FakeConn()
+
+    monkeypatch.setattr(menu_catalog, "connection", connection)
+    return cursor
+
+
+def test_loads_whole_menu_in_one_query(monkeypatch):
+    cursor = _patch_connection(monkeypatch, [
+        (1, "Canteen", "Meals", 10, "Thali", "Full meal", Decimal("80"), 1, "ab" * 32),
+        (1, "Canteen", "Meals", 11, "Chai", None, Decimal("15"), 0, None),
+        (2, "Cafe", None, None, None, None, None, None, None),  # no items yet
+        (3, "Juice Bar", "", 30, "Lassi", "", Decimal("40"), 1, None),
+    ])
+
+    catalog = menu_catalog.load_catalog()
+
+    assert len(cursor.statements) == 1
+    assert [v.name for v in catalog.vendors] == ["Canteen", "Cafe", "Juice Bar"]
+    assert [i.name for i in catalog.vendors[0].items] == ["Thali", "Chai"]
+    assert catalog.vendors[1].items == []
+    assert set(catalog.items_by_id) == {10, 11, 30}
+    assert catalog.items_by_id[11].available is False
+    assert catalog.items_by_id[10].image_hash == "ab" * 32
+    assert [i.id for i in catalog.available_items()] == [10, 30]
@@ -0,0 +1,48 @@
+import os
+import migrate
+
+
+def _statements(prefix):
+    [(_, _, path)] = [m for m in migrate.load_migrations() if os.path.basename(m[2]).startswith(prefix)]
+    with open(path) as f:
+        return migrate.split_statements(f.read())
+
+
+def test_versions_are_contiguous():
+    versions = [version for version, _, _ in migrate.load_migrations()]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+def test_payment_status_nulls_are_filled_before_it_is_made_not_null():
+    statements = _statements("0005_")
+    fill = next(i for i, s in enumerate(statements) if "payment_status IS NULL" in s)
+    first_modify = next(i for i, s in enumerate(statements) if "MODIFY payment_status" in s)
+    assert fill < first_modify
+
+
+def test_legacy_order_statuses_and_roles_converge(mysql_conn):
+    cursor = mysql_conn.cursor()
+    # Back to the old setup scripts' ENUMs
+    cursor.execute("ALTER TABLE orders MODIFY status ENUM('pending', 'preparing', 'ready', 'delivered') DEFAULT 'pending'")
+    cursor.execute("ALTER TABLE users MODIFY role ENUM('admin', 'vendor', 'customer') DEFAULT 'customer'")
+    try:
+        cursor.execute("INSERT INTO users (name, email, password, role) VALUES ('Old', 'old@example.com', 'x', 'customer')")
+        user_id = cursor.lastrowid
+        for status in ('pending', 'preparing', 'ready', 'delivered'):
+            cursor.execute("INSERT INTO orders (user_id, total, status) VALUES (%s, 10, %s)", (user_id, status))
+        mysql_conn.commit()
+
+        migrate.run_statements(cursor, _statements("0014_"))
+        mysql_conn.commit()
+
+        cursor.execute("SELECT status FROM orders ORDER BY id")
+        assert [row[0] for row in cursor.fetchall()] == ['inmaking', 'inmaking', 'ready', 'pickedup']
+        cursor.execute("SELECT role FROM users WHERE id = %s", (user_id,))
+        assert cursor.fetchone()[0] == 'user'
+        cursor.execute("SELECT COLUMN_TYPE FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'orders' AND COLUMN_NAME = 'status'")
+        assert cursor.fetchone()[0] == "enum('inmaking','ready','pickedup')"
+    finally:
+        # Leave the canonical schema for the other tests
+        migrate.run_statements(cursor, _statements("0014_"))
+        mysql_conn.commit()
+        cursor.close()
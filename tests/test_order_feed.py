@@ -0,0 +1,159 @@
+import threading
+import pytest
+import order_feed
+from order_feed import FeedState, changed_orders, latest_version, poll, record_order_events
+from order_service import place_order, set_vendor_order_status
+
+
+class FeedCursor:
+    # Answers the feed's two reads from an in-memory order_events list of
+    # (version, order_id, user_id, vendor_id), counting the statements run.
+    # One version sequence stands in for both scopes.
+    def __init__(self, events):
+        self.events = events
+        self.statements = []
+        self._rows = []
+
+    def execute(self, sql, params):
+        self.statements.append(sql)
+        if "order_feed_versions" in sql:
+            scope, scope_id = params
+            index = 2 if scope == "user" else 3
+            versions = [e[0] for e in self.events if e[index] == scope_id]
+            self._rows = [(max(versions),)] if versions else []
+        else:
+            index = 2 if "user_id =" in sql else 3
+            scope_id, since, until, limit = params
+            order_ids = []
+            for e in self.events:
+                if e[index] == scope_id and since < e[0] <= until and e[1] not in order_ids:
+                    order_ids.append(e[1])
+            self._rows = [(order_id,) for order_id in order_ids[:limit]]
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return self._rows
+
+
+def test_poll_loads_everything_first_then_only_what_changed():
+    cursor = FeedCursor([(1, 10, 7, 1), (2, 11, 7, 1)])
+    loaded = []
+
+    def load_all():
+        loaded.append("all")
+        return {10: "order 10", 11: "order 11"}
+
+    def load_some(order_ids):
+        loaded.append(sorted(order_ids))
+        return {order_id: f"order {order_id} v2" for order_id in order_ids}
+
+    state, changed = poll(cursor, "user", 7, None, load_all, load_some)
+    assert changed and state.version == 2 and loaded == ["all"]
+
+    # Nothing new: one version lookup and no loading
+    cursor.statements.clear()
+    same, changed = poll(cursor, "user", 7, state, load_all, load_some)
+    assert same is state and not changed
+    assert len(cursor.statements) == 1 and loaded == ["all"]
+
+    cursor.events.append((3, 11, 7, 1))
+    cursor.events.append((4, 99, 8, 1))  # another customer's order
+    state, changed = poll(cursor, "user", 7, state, load_all, load_some)
+    assert changed and state.version == 3
+    assert loaded == ["all", [11]]
+    assert state.orders == {10: "order 10", 11: "order 11 v2"}
+
+
+def test_poll_drops_orders_that_load_some_returns_none_for():
+    cursor = FeedCursor([(1, 10, 7, 1), (2, 11, 7, 1), (3, 11, 7, 1)])
+    state = FeedState(2, {10: "order 10", 11: "order 11"})
+    state, _ = poll(cursor, "user", 7, state, dict, lambda ids: {11: None})
+    assert state.orders == {10: "order 10"}
+
+
+def test_poll_reloads_everything_without_load_some_or_past_max_delta(monkeypatch):
+    monkeypatch.setattr(order_feed, "MAX_DELTA", 2)
+    cursor = FeedCursor([(n, n, 7, 1) for n in range(1, 5)])
+    state = FeedState(1, {1: "order 1"})
+
+    reloaded, _ = poll(cursor, "user", 7, state, lambda: {"all": True})
+    assert reloaded.orders == {"all": True} and reloaded.version == 4
+
+    def load_some(order_ids):
+        pytest.fail("three changed orders is past MAX_DELTA")
+    reloaded, _ = poll(cursor, "user", 7, state, lambda: {"all": True}, load_some)
+    assert reloaded.orders == {"all": True}
+
+
+def test_unknown_scope_is_rejected():
+    with pytest.raises(ValueError):
+        latest_version(FeedCursor([]), "orders; DROP TABLE users", 1)
+    with pytest.raises(ValueError):
+        changed_orders(FeedCursor([]), "user_id = 1 OR 1", 1, 0, 1)
+
+
+def test_order_changes_are_recorded_per_vendor(mysql_conn, seed_menu):
+    user_id, menu = seed_menu
+    vendor_id, other_vendor_id = menu
+    cursor = mysql_conn.cursor()
+    assert latest_version(cursor, "user", user_id) == 0
+
+    both = place_order(mysql_conn, user_id, {menu[vendor_id][0]: 1, menu[other_vendor_id][0]: 2}).order_id
+    one = place_order(mysql_conn, user_id, {menu[other_vendor_id][1]: 1}).order_id
+    mysql_conn.commit()
+    user_version = latest_version(cursor, "user", user_id)
+    vendor_version = latest_version(cursor, "vendor", vendor_id)
+    assert sorted(changed_orders(cursor, "user", user_id, 0, user_version)) == [both, one]
+    assert changed_orders(cursor, "vendor", vendor_id, 0, vendor_version) == [both]
+
+    # One vendor's progress is an event for the customer and for every
+    # vendor on the order, since it can move the order's own status
+    other_version = latest_version(cursor, "vendor", other_vendor_id)
+    set_vendor_order_status(mysql_conn, both, vendor_id, 'ready')
+    mysql_conn.commit()
+    assert changed_orders(cursor, "user", user_id, user_version, latest_version(cursor, "user", user_id)) == [both]
+    assert latest_version(cursor, "vendor", vendor_id) > vendor_version
+    assert latest_version(cursor, "vendor", other_vendor_id) > other_version
+
+    record_order_events(cursor, [], 'payment')  # no-op
+    record_order_events(cursor, [one], 'payment')
+    mysql_conn.commit()
+    cursor.execute("SELECT kind, vendor_id FROM order_events WHERE order_id = %s ORDER BY id", (one,))
+    assert cursor.fetchall() == [('created', other_vendor_id), ('payment', other_vendor_id)]
+    cursor.close()
+
+
+def test_an_event_is_not_skipped_when_an_earlier_writer_commits_late(mysql_conn, seed_menu, extra_connection):
+    # Two checkouts for the same vendor: the first is still open (e.g.
+    # waiting on the rollup row) when a second one records its events.
+    # A reader must not see a version that hides the first one's event.
+    user_id, menu = seed_menu
+    vendor_id = next(iter(menu))
+    first = place_order(mysql_conn, user_id, {menu[vendor_id][0]: 1}).order_id
+    second = place_order(mysql_conn, user_id, {menu[vendor_id][1]: 1}).order_id
+    cursor = mysql_conn.cursor()
+    seen = latest_version(cursor, "vendor", vendor_id)
+    mysql_conn.commit()
+
+    slow = extra_connection()
+    fast = extra_connection()
+    slow.start_transaction()
+    record_order_events(slow.cursor(), [first], 'status')
+
+    # The second writer waits for the first one's version rows
+    fast_thread = threading.Thread(target=lambda: (record_order_events(fast.cursor(), [second], 'status'), fast.commit()))
+    fast_thread.start()
+    fast_thread.join(timeout=1)
+    assert fast_thread.is_alive()
+    assert latest_version(cursor, "vendor", vendor_id) == seen
+    mysql_conn.commit()
+
+    slow.commit()
+    fast_thread.join(timeout=10)
+    assert not fast_thread.is_alive()
+
+    now = latest_version(cursor, "vendor", vendor_id)
+    assert sorted(changed_orders(cursor, "vendor", vendor_id, seen, now)) == [first, second]
+    cursor.close()
@@ -0,0 +1,142 @@
+from contextlib import contextmanager
+from decimal import Decimal
+import pytest
+import fake_gateway
+import payment
+import payment_worker
+from gateway_client import GatewayClient
+
+
+class NullCursor:
+    def execute(self, *args, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullConn:
+    def cursor(self, *args, **kwargs):
+        return NullCursor()
+
+    def commit(self):
+        pass
+
+
+@pytest.fixture
+def gateway():
+    client = fake_gateway.FakeClient(store=fake_gateway.FakeStore())
+    payment.set_client(GatewayClient(client, http_timeouts=False))
+    yield client
+    payment.set_client(None)
+
+
+@pytest.fixture
+def worker(monkeypatch, gateway):
+    # process_job with the database replaced; returns the recorded outcome
+    state = {"job": (1, False, Decimal("95.00"), "order_existing"), "finished": [],
+             "recorded": [], "indexed_url": None}
+
+    @contextmanager
+    def connection():
+        yield NullConn()
+
+    monkeypatch.setattr(payment_worker, "connection", connection)
+    monkeypatch.setattr(payment_worker, "_claim", lambda order_id: state["job"])
+    monkeypatch.setattr(payment_worker, "_finish", lambda order_id, status, **kwargs: state["finished"].append((status, kwargs)))
+    monkeypatch.setattr(payment_worker, "record_invoice", lambda order_id, invoice: state["recorded"].append(invoice))
+    monkeypatch.setattr(payment_worker, "get_invoice_url", lambda order_id: state["indexed_url"])
+    monkeypatch.setattr(payment, "get_invoice_details", lambda cursor, order_id: (
+        ("Test", "test@example.com", "user"), [("Thali", 1, Decimal("80.00"), "Canteen")]
+    ))
+    return state
+
+
+def test_retry_delay_doubles_and_is_capped(monkeypatch):
+    monkeypatch.setattr(payment_worker, "PAYMENT_JOB_RETRY_DELAY", 10)
+    monkeypatch.setattr(payment_worker, "PAYMENT_JOB_RETRY_MAX_DELAY", 60)
+    assert [payment_worker.retry_delay(n) for n in range(1, 6)] == [10, 20, 40, 60, 60]
+
+
+def test_failed_attempt_backs_off(worker, gateway, monkeypatch):
+    gateway.failure_rate = 1.0
+    worker["job"] = (2, True, Decimal("95.00"), "order_existing")
+
+    assert payment_worker.process_job(7) is False
+
+    [(status, kwargs)] = worker["finished"]
+    assert status == "pending"
+    assert kwargs["retry_in"] == payment_worker.retry_delay(2) > 0
+
+
+def test_last_attempt_fails_the_job(worker, gateway, monkeypatch):
+    gateway.failure_rate = 1.0
+    worker["job"] = (payment_worker.PAYMENT_JOB_MAX_ATTEMPTS, True, Decimal("95.00"), "order_existing")
+
+    payment_worker.process_job(7)
+
+    assert worker["finished"][0][0] == "failed"
+
+
+def test_first_attempt_creates_invoice(worker, gateway):
+    assert payment_worker.process_job(7) is True
+
+    [invoice] = worker["recorded"]
+    assert invoice["receipt"] == "order_7"
+    assert worker["finished"] == [("done", {"invoice_url": invoice["short_url"]})]
+    assert len(gateway.store.invoices) == 1
+
+
+def test_retry_reuses_invoice_from_local_index(worker, gateway):
+    worker["job"] = (2, True, Decimal("95.00"), "order_existing")
+    worker["indexed_url"] = "http://localhost/fake-gateway/inv_earlier"
+
+    payment_worker.process_job(7)
+
+    assert gateway.store.invoices == {}
+    assert worker["finished"] == [("done", {"invoice_url": "http://localhost/fake-gateway/inv_earlier"})]
+
+
+def test_retry_reuses_invoice_the_gateway_already_has(worker, gateway):
+    # First attempt created the invoice, then failed to record it
+    payment_worker.process_job(7)
+    [earlier] = gateway.store.invoices.values()
+    worker["finished"].clear()
+    worker["recorded"].clear()
+
+    worker["job"] = (2, True, Decimal("95.00"), "order_existing")
+    payment_worker.process_job(7)
+
+    assert len(gateway.store.invoices) == 1
+    assert worker["recorded"][0]["id"] == earlier["id"]
+
+
+def _insert_order(cursor, user_id):
+    cursor.execute("INSERT INTO orders (user_id, total) VALUES (%s, 10)", (user_id,))
+    order_id = cursor.lastrowid
+    cursor.execute("INSERT INTO payment_jobs (order_id) VALUES (%s)", (order_id,))
+    return order_id
+
+
+def test_claim_respects_backoff_and_reclaims_stale_jobs(mysql_conn, seed_menu):
+    user_id, _ = seed_menu
+    cursor = mysql_conn.cursor()
+    order_id = _insert_order(cursor, user_id)
+    mysql_conn.commit()
+
+    assert payment_worker._claim(order_id)[0] == 1
+    assert payment_worker._claim(order_id) is None  # running elsewhere
+
+    payment_worker._finish(order_id, 'pending', error="gateway down", retry_in=300)
+    assert payment_worker._claim(order_id) is None  # backing off
+    assert payment_worker.drain() == 0
+
+    cursor.execute("UPDATE payment_jobs SET next_attempt_at = NOW() - INTERVAL 1 SECOND WHERE order_id = %s", (order_id,))
+    mysql_conn.commit()
+    assert payment_worker._claim(order_id)[:2] == (2, 1)
+
+    # The worker died mid-run: reclaimed once stale
+    cursor.execute("UPDATE payment_jobs SET updated_at = NOW() - INTERVAL 1 HOUR WHERE order_id = %s", (order_id,))
+    mysql_conn.commit()
+    assert payment_worker._claim(order_id)[0] == 3
+    cursor.close()
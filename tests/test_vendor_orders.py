@@ -0,0 +1,72 @@
+import explain_check
+from order_service import place_order, set_vendor_order_status, vendor_order_page
+
+
+def _vendor_page_queries():
+    queries, _ = explain_check.extract_queries()
+    return [q for q in queries if q.function == "vendor_order_page"]
+
+
+def test_active_page_variants_are_checked_as_bounded():
+    queries = _vendor_page_queries()
+    active = [q for q in queries if "FROM vendor_order_status vos" in q.sql]
+    assert len(active) == 2
+    assert all(q.bounded for q in active)
+    assert all("order_items" not in q.sql for q in active)
+
+
+def test_bounded_query_reading_many_rows_through_an_index_is_a_finding():
+    query = next(q for q in _vendor_page_queries() if q.bounded)
+    plan = {"query_block": {"ordering_operation": {"table": {
+        "table_name": "vos", "access_type": "ref", "key": "idx_vendor_order_status_vendor",
+        "rows_examined_per_scan": 50000,
+    }}}}
+    findings = explain_check.plan_findings(query, plan, max_rows=1000)
+    assert [f.kind for f in findings] == ["unbounded"]
+
+    plan["query_block"]["ordering_operation"]["table"]["rows_examined_per_scan"] = 12
+    assert explain_check.plan_findings(query, plan, max_rows=1000) == []
+
+
+def test_active_page_skips_picked_up_orders_and_pages_by_order_id(mysql_conn, seed_menu):
+    user_id, menu = seed_menu
+    vendor_id, other_vendor_id = menu
+    order_ids = [
+        place_order(mysql_conn, user_id, {menu[vendor_id][0]: 1, menu[other_vendor_id][0]: 1}).order_id
+        for _ in range(5)
+    ]
+    set_vendor_order_status(mysql_conn, order_ids[1], vendor_id, 'pickedup')
+    set_vendor_order_status(mysql_conn, order_ids[3], vendor_id, 'ready')
+
+    cursor = mysql_conn.cursor()
+    page, before = vendor_order_page(cursor, vendor_id, active_only=True, limit=2)
+    assert [o.order_id for o in page] == [order_ids[4], order_ids[3]]
+    assert [o.vendor_status for o in page] == ['pending', 'ready']
+    page, before = vendor_order_page(cursor, vendor_id, active_only=True, before=before, limit=2)
+    assert [o.order_id for o in page] == [order_ids[2], order_ids[0]]
+    assert before is None
+
+    # Picked up by this vendor only: still active for the other one, and
+    # still listed under All
+    page, _ = vendor_order_page(cursor, other_vendor_id, active_only=True, limit=10)
+    assert order_ids[1] in [o.order_id for o in page]
+    page, _ = vendor_order_page(cursor, vendor_id, active_only=False, limit=10)
+    assert [o.order_id for o in page] == order_ids[::-1]
+    cursor.close()
+
+
+def test_deleting_a_menu_item_keeps_its_past_order_lines(mysql_conn, seed_menu):
+    user_id, menu = seed_menu
+    vendor_id = next(iter(menu))
+    item_id = menu[vendor_id][0]
+    order_id = place_order(mysql_conn, user_id, {item_id: 2}).order_id
+
+    cursor = mysql_conn.cursor()
+    cursor.execute("DELETE FROM menu_items WHERE id = %s", (item_id,))
+    mysql_conn.commit()
+    cursor.execute("SELECT menu_item_id, item_name, quantity FROM order_items WHERE order_id = %s", (order_id,))
+    assert cursor.fetchall() == [(None, "Canteen Thali", 2)]
+
+    [order], _ = vendor_order_page(cursor, vendor_id, active_only=False)
+    assert [(line.name, line.quantity) for line in order.lines] == [("Canteen Thali", 2)]
+    cursor.close()
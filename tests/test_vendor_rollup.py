@@ -0,0 +1,72 @@
+import glob
+import os
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+import invoice_index
+import migrate
+from order_service import place_order, set_vendor_order_status
+from vendor_rollup import rebuild, vendor_summary
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_upserts_use_the_row_alias_not_values():
+    # VALUES(col) in ON DUPLICATE KEY UPDATE is deprecated since MySQL 8.0.20
+    paths = glob.glob(os.path.join(ROOT, "*.py")) + glob.glob(os.path.join(migrate.MIGRATIONS_DIR, "*.sql"))
+    offenders = []
+    for path in paths:
+        with open(path) as f:
+            if re.search(r"\bVALUES\(\w+\)", f.read()):
+                offenders.append(os.path.basename(path))
+    assert offenders == []
+
+
+def _rollup(cursor):
+    cursor.execute("SELECT vendor_id, day, orders, items, revenue, customers FROM vendor_daily_rollup ORDER BY vendor_id, day")
+    return cursor.fetchall()
+
+
+def test_rollup_counts_orders_and_customers_and_matches_a_rebuild(mysql_conn, seed_menu):
+    user_id, menu = seed_menu
+    vendor_id, other_vendor_id = menu
+    thali, chai = menu[vendor_id]
+    cursor = mysql_conn.cursor()
+    cursor.execute("INSERT INTO users (name, email, password, role) VALUES ('Second', 'second@example.com', 'x', 'user')")
+    second_user_id = cursor.lastrowid
+    mysql_conn.commit()
+
+    place_order(mysql_conn, user_id, {thali: 2, chai: 1})
+    place_order(mysql_conn, user_id, {chai: 3, menu[other_vendor_id][0]: 1})
+    place_order(mysql_conn, second_user_id, {thali: 1})
+    mysql_conn.commit()
+
+    today = date.today()
+    [summary] = [s for s in vendor_summary(cursor, today, today + timedelta(days=1)) if s.vendor_id == vendor_id]
+    assert (summary.orders, summary.items) == (3, 7)
+    assert summary.revenue == Decimal("80.00") * 3 + Decimal("15.00") * 4
+    assert summary.customer_days == 2  # the first customer's second order does not count again
+
+    incremental = _rollup(cursor)
+    rebuild(mysql_conn, today, today + timedelta(days=1))
+    assert _rollup(cursor) == incremental
+    cursor.close()
+
+
+def test_repeated_upserts_overwrite_the_row(mysql_conn, seed_menu):
+    user_id, menu = seed_menu
+    vendor_id = next(iter(menu))
+    order_id = place_order(mysql_conn, user_id, {menu[vendor_id][0]: 1}).order_id
+
+    cursor = mysql_conn.cursor()
+    for status in ('pending', 'paid'):
+        invoice_index.save_invoice(cursor, order_id, {"id": f"inv_{status}", "short_url": "https://rzp.io/i/x", "status": status})
+    mysql_conn.commit()
+    cursor.execute("SELECT invoice_id, status FROM invoices WHERE order_id = %s", (order_id,))
+    assert cursor.fetchall() == [("inv_paid", "paid")]
+
+    set_vendor_order_status(mysql_conn, order_id, vendor_id, 'ready')
+    set_vendor_order_status(mysql_conn, order_id, vendor_id, 'pickedup')
+    cursor.execute("SELECT status FROM vendor_order_status WHERE order_id = %s", (order_id,))
+    assert cursor.fetchall() == [("pickedup",)]
+    cursor.close()
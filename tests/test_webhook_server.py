@@ -0,0 +1,133 @@
+import json
+import threading
+import pytest
+from fake_razorpay_webhook import build_event, sign, post
+from webhook_server import (
+    EventWriter, make_server, parse_event, verify_signature, write_events, WEBHOOK_PATH
+)
+
+SECRET = "test-secret"
+
+
+def _body(event, **kwargs):
+    return json.dumps(build_event(event, **kwargs)).encode()
+
+
+def test_signature_must_match_body():
+    body = _body("payment.captured", order_id=1)
+    assert verify_signature(body, sign(body, SECRET), SECRET)
+    assert not verify_signature(body + b" ", sign(body, SECRET), SECRET)
+    assert not verify_signature(body, sign(body, SECRET), "")
+
+
+def test_parse_event_reads_order_from_notes():
+    event = parse_event(_body("order.paid", order_id=42, razorpay_order_id="order_abc", amount=9500), "evt_1")
+    assert (event.event_id, event.event, event.order_id) == ("evt_1", "order.paid", 42)
+    assert event.razorpay_order_id == "order_abc"
+    assert event.amount == 9500
+
+
+def test_redelivery_without_event_id_gets_the_same_id():
+    body = _body("payment.captured")
+    assert parse_event(body).event_id == parse_event(body).event_id
+
+
+def test_writer_groups_concurrent_events_into_batches():
+    batches = []
+    writer = EventWriter(batch_size=50, flush_interval=0.2, write=lambda events: batches.append(list(events)))
+    threads = [threading.Thread(target=writer.submit, args=(n,)) for n in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(e for batch in batches for e in batch) == list(range(20))
+    assert len(batches) < 20
+    assert writer.stats()["events"] == 20
+
+
+def test_writer_reports_failed_batch_to_every_caller():
+    def broken(events):
+        raise RuntimeError("database down")
+
+    writer = EventWriter(batch_size=10, flush_interval=0.01, write=broken)
+    with pytest.raises(RuntimeError):
+        writer.submit("event", timeout=5)
+    assert writer.stats()["errors"] == 1
+
+
+@pytest.fixture
+def server():
+    written = []
+    fail = threading.Event()
+
+    def write(events):
+        if fail.is_set():
+            raise RuntimeError("database down")
+        written.extend(events)
+
+    server = make_server("127.0.0.1", 0, secret=SECRET, writer=EventWriter(flush_interval=0.01, write=write), quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}{WEBHOOK_PATH}", written, fail
+    server.shutdown()
+    server.server_close()
+
+
+def test_acknowledges_only_stored_signed_events(server):
+    url, written, fail = server
+    body = _body("payment.captured", order_id=7)
+
+    assert post(url, body, SECRET, "evt_ok")[0] == 200
+    assert post(url, body, SECRET, "evt_forged", bad_signature=True)[0] == 400
+    fail.set()
+    assert post(url, body, SECRET, "evt_unstored")[0] == 500  # Razorpay will redeliver
+
+    assert [e.event_id for e in written] == ["evt_ok"]
+
+
+def _order(mysql_conn, user_id):
+    cursor = mysql_conn.cursor()
+    cursor.execute("INSERT INTO orders (user_id, total, razorpay_order_id) VALUES (%s, 10, 'order_rzp1')", (user_id,))
+    order_id = cursor.lastrowid
+    cursor.close()
+    mysql_conn.commit()
+    return order_id
+
+
+def _payment_state(mysql_conn, order_id):
+    mysql_conn.commit()  # fresh snapshot
+    cursor = mysql_conn.cursor()
+    cursor.execute("SELECT payment_status, payment_id FROM orders WHERE id = %s", (order_id,))
+    state = cursor.fetchone()
+    cursor.execute("SELECT COUNT(*) FROM payment_events WHERE order_id = %s", (order_id,))
+    events = cursor.fetchone()[0]
+    cursor.close()
+    return state, events
+
+
+def test_redelivered_events_are_stored_once(mysql_conn, seed_menu):
+    user_id, _ = seed_menu
+    order_id = _order(mysql_conn, user_id)
+    captured = parse_event(_body("payment.captured", razorpay_order_id="order_rzp1"), "evt_1")
+
+    write_events([captured])
+    write_events([parse_event(captured.payload.encode(), "evt_1")])
+
+    (status, payment_id), events = _payment_state(mysql_conn, order_id)
+    assert (status, events) == ("paid", 1)
+    assert payment_id == captured.razorpay_payment_id
+
+
+def test_later_success_wins_over_earlier_failure(mysql_conn, seed_menu):
+    user_id, _ = seed_menu
+    order_id = _order(mysql_conn, user_id)
+
+    write_events([
+        parse_event(_body("payment.failed", order_id=order_id), "evt_failed"),
+        parse_event(_body("payment.captured", order_id=order_id), "evt_paid"),
+    ])
+    write_events([parse_event(_body("payment.failed", order_id=order_id), "evt_failed_late")])
+
+    (status, _), events = _payment_state(mysql_conn, order_id)
+    assert (status, events) == ("paid", 3)
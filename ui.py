@@ -2,15 +2,26 @@
 
 import streamlit as st
 from streamlit_autorefresh import st_autorefresh
-from db import execute_query
+from db import connect, connection
 from auth import get_current_user
 import time
+import uuid
+from datetime import timedelta
 import mysql.connector
-from menu_display import display_vendor_menu, get_menu_items
-from payment import initiate_payment, verify_payment
-import os
+from menu_display import display_vendor_menu
+from payment import gateway_health, gateway_stats
 from components.razorpay_button import razorpay_button
-from config import DB_CONFIG
+from cache import invalidate
+from menu_catalog import get_catalog
+import order_service
+from order_service import price_cart, vendor_order_page, set_vendor_order_status
+import payment_worker
+from config import VENDOR_ORDERS_PAGE_SIZE, PAYMENT_JOB_MAX_ATTEMPTS
+from invoice_index import get_invoice_urls
+from order_feed import poll, latest_version
+from query_trace import get_stats, set_page
+from vendor_rollup import vendor_summary
+from analytics import BUCKETS, revenue_trend, hourly_profile
 
 # ---------- Customer UI ----------
 def customer_ui():
@@ -25,53 +36,95 @@ def customer_ui():
         st.error("Please log in again.")
         return
 
+    if st.session_state.get('pending_payment'):
+        payment_status_ui(st.session_state.pending_payment)
+
     # --- Browse & Cart as before ---
-    menu = execute_query("SELECT * FROM menu_items WHERE available = TRUE", fetch=True)
+    menu = get_catalog().available_items()
     cart = st.session_state.setdefault("cart", {})
 
     for item in menu:
         c1, c2 = st.columns([3, 1])
         with c1:
-            st.markdown(f"**{item['name']}** – {item['description']} ($ {item['price']})")
+            st.markdown(f"**{item.name}** – {item.description} ($ {item.price})")
         with c2:
-            qty = st.number_input(f"Qty_{item['id']}", min_value=0, value=cart.get(item['id'], 0))
+            qty = st.number_input(f"Qty_{item.id}", min_value=0, value=cart.get(item.id, 0))
             if qty > 0:
-                cart[item['id']] = qty
-            elif item['id'] in cart:
-                del cart[item['id']]
+                cart[item.id] = qty
+            elif item.id in cart:
+                del cart[item.id]
 
     if st.button("🛒 Place Order"):
         if not cart:
             st.error("Cart is empty.")
         else:
-            total = sum(item["price"] * cart[item["id"]] for item in menu if item["id"] in cart)
-            execute_query("INSERT INTO orders (user_id, total) VALUES (%s, %s)", (user["id"], total))
-            order_id = execute_query("SELECT LAST_INSERT_ID() AS id", fetch=True)[0]["id"]
-            for item_id, qty in cart.items():
-                execute_query(
-                    "INSERT INTO order_items (order_id, menu_item_id, quantity, price_at_time) VALUES (%s, %s, %s, %s)",
-                    (order_id, item_id, qty, next(item["price"] for item in menu if item["id"] == item_id))
-                )
-            st.session_state.cart = {}
-            st.success("Order placed successfully!")
+            try:
+                with connection() as conn:
+                    _checkout(conn, user["id"])
+            except ValueError as e:
+                st.error(str(e))
+            except mysql.connector.Error as e:
+                st.error(f"Database error: {e}")
+            else:
+                st.rerun()
 
     # --- Show live‑updating recent orders ---
     st.markdown("---")
     st.subheader("📦 Your Recent Orders")
-    orders = execute_query(
-        "SELECT * FROM orders WHERE user_id = %s ORDER BY created_at DESC LIMIT 5",
-        (user["id"],),
-        fetch=True
-    )
+    # Each poll only asks the order feed whether anything changed since the
+    # last render, and reloads just the orders that did
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            state, _ = poll(
+                cursor, "user", user["id"], st.session_state.get("recent_orders_feed"),
+                load_all=lambda: _load_recent_orders(cursor, user["id"]),
+                load_some=lambda order_ids: _load_recent_orders(cursor, user["id"], order_ids)
+            )
+            cursor.close()
+    except mysql.connector.Error as e:
+        st.error(f"Database error: {e}")
+        return
+    # Keep the 5 newest
+    state.orders = dict(sorted(state.orders.items(), key=lambda kv: kv[1]["created_at"], reverse=True)[:5])
+    st.session_state.recent_orders_feed = state
+    
     status_map = {
         "inmaking": "👩‍🍳 In making",
         "ready":    "🔔 Ready for pick‑up",
         "pickedup": "✅ Picked up"
     }
-    for o in orders:
+    for o in state.orders.values():
         st.info(f"Order #{o['id']} – {status_map[o['status']]}")
 
 
+def _load_recent_orders(cursor, user_id, order_ids=None):
+    # {order_id: row} for the user's 5 newest orders, or for just order_ids
+    # (None for ids that no longer exist)
+    if order_ids is None:
+        cursor.execute("""
+            SELECT id, status, created_at
+            FROM orders
+            WHERE user_id = %s
+            ORDER BY created_at DESC
+            LIMIT 5
+        """, (user_id,))
+        rows = cursor.fetchall()
+        found = {}
+    else:
+        placeholders = ", ".join(["%s"] * len(order_ids))
+        cursor.execute(f"""
+            SELECT id, status, created_at
+            FROM orders
+            WHERE user_id = %s AND id IN ({placeholders})
+        """, [user_id] + list(order_ids))
+        rows = cursor.fetchall()
+        found = dict.fromkeys(order_ids)
+    for order_id, status, created_at in rows:
+        found[order_id] = {"id": order_id, "status": status, "created_at": created_at}
+    return found
+
+
 
 # ---------- Vendor UI ----------
 def vendor_ui():
@@ -105,210 +158,71 @@ def vendor_ui():
         key="vendor_navigation_tabs",
         label_visibility="collapsed"
     )
+    set_page(f"vendor:{selected_tab}")
     
     if selected_tab == "Orders":
         st.header(f"{vendor_name} Orders")
+        
+        view = st.radio("Show", ["Active", "History"], horizontal=True, key="vendor_orders_view")
+        # Stack of keyset cursors for the pages already visited in this view
+        if st.session_state.get('vendor_orders_view_last') != view:
+            st.session_state.vendor_orders_view_last = view
+            st.session_state.vendor_orders_cursors = [None]
+        cursors = st.session_state.vendor_orders_cursors
+        
+        # Poll for new orders and status changes
+        st_autorefresh(interval=5_000, limit=None, key="vendor_orders_poll")
+        
         try:
             # Connect to database
-            conn = mysql.connector.connect(**DB_CONFIG)
+            conn = connect()
             db_executor = conn.cursor()
             
-            # Get vendor's ID
-            db_executor.execute("SELECT id FROM vendors WHERE name = %s", (vendor_name,))
-            vendor_id = db_executor.fetchone()[0]
-            
-            # Get orders for this vendor only
-            db_executor.execute("""
-                SELECT 
-                    o.id,
-                    o.user_id,
-                    o.total,
-                    o.status,
-                    o.razorpay_order_id,
-                    o.created_at,
-                    u.email,
-                    m.name as item_name,
-                    oi.quantity,
-                    oi.price_at_time,
-                    v.name as vendor_name,
-                    vos.status as vendor_status
-                FROM orders o
-                JOIN users u ON o.user_id = u.id
-                JOIN order_items oi ON o.id = oi.order_id
-                JOIN menu_items m ON oi.menu_item_id = m.id
-                JOIN vendors v ON m.vendor_id = v.id
-                LEFT JOIN vendor_order_status vos ON o.id = vos.order_id AND v.id = vos.vendor_id
-                WHERE m.vendor_id = %s
-                ORDER BY o.created_at DESC
-            """, (vendor_id,))
+            # Get vendor's ID (once per session)
+            vendor_id = st.session_state.get('vendor_id')
+            if st.session_state.get('vendor_id_for') != vendor_name:
+                db_executor.execute("SELECT id FROM vendors WHERE name = %s", (vendor_name,))
+                vendor_id = db_executor.fetchone()[0]
+                st.session_state.vendor_id = vendor_id
+                st.session_state.vendor_id_for = vendor_name
             
-            orders = db_executor.fetchall()
+            # Reuse the rendered page unless the vendor's order feed has moved
+            # on since; an unchanged poll costs one primary key lookup
+            version = latest_version(db_executor, "vendor", vendor_id)
+            page_key = (vendor_id, view, cursors[-1])
+            cached = st.session_state.get('vendor_orders_page')
+            if cached and cached['key'] == page_key and cached['version'] == version:
+                orders, next_cursor, invoice_urls = cached['orders'], cached['next_cursor'], cached['invoice_urls']
+            else:
+                # One page of this vendor's orders
+                orders, next_cursor = vendor_order_page(
+                    db_executor, vendor_id,
+                    active_only=(view == "Active"),
+                    before=cursors[-1],
+                    limit=VENDOR_ORDERS_PAGE_SIZE
+                )
+                # Every invoice link on the page in one indexed lookup
+                invoice_urls = get_invoice_urls({order.order_id for order in orders if order.razorpay_order_id})
+                st.session_state.vendor_orders_page = {
+                    'key': page_key, 'version': version, 'orders': orders,
+                    'next_cursor': next_cursor, 'invoice_urls': invoice_urls,
+                }
             
             if not orders:
-                st.info("No orders found.")
-                return
-            
-            # Group orders by order_id
-            current_order = None
-            items = []
-            
-            for order in orders:
-                if current_order != order[0]:  # New order
-                    if current_order is not None:  # If not first order, display previous order's items and buttons
-                        # Display all items
-                        for item in items:
-                            st.write(f"₹{item[9]:.2f} x {item[8]} (₹{item[9] * item[8]:.2f}) {item[7]} from {item[10]}")
-                        
-                        # Add status update buttons after all items
-                        st.write("---")  # Add separator before buttons
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            if st.button(f"Mark Ready #{current_order}", key=f"ready_{current_order}"):
-                                # Update vendor-specific status
-                                db_executor.execute("""
-                                    INSERT INTO vendor_order_status (order_id, vendor_id, status)
-                                    VALUES (%s, %s, 'ready')
-                                    ON DUPLICATE KEY UPDATE status = 'ready'
-                                """, (current_order, vendor_id))
-                                
-                                # Check if all vendors have marked as ready
-                                db_executor.execute("""
-                                    SELECT COUNT(DISTINCT m.vendor_id) as total_vendors,
-                                           COUNT(DISTINCT vos.vendor_id) as ready_vendors
-                                    FROM order_items oi
-                                    JOIN menu_items m ON oi.menu_item_id = m.id
-                                    LEFT JOIN vendor_order_status vos ON oi.order_id = vos.order_id AND m.vendor_id = vos.vendor_id AND vos.status = 'ready'
-                                    WHERE oi.order_id = %s
-                                """, (current_order,))
-                                
-                                result = db_executor.fetchone()
-                                if result[0] == result[1]:  # All vendors are ready
-                                    db_executor.execute(
-                                        "UPDATE orders SET status = 'ready' WHERE id = %s",
-                                        (current_order,)
-                                    )
-                                
-                                conn.commit()
-                                st.rerun()
-                        
-                        with col2:
-                            if st.button(f"Mark Picked Up #{current_order}", key=f"pickedup_{current_order}"):
-                                # Update vendor-specific status
-                                db_executor.execute("""
-                                    INSERT INTO vendor_order_status (order_id, vendor_id, status)
-                                    VALUES (%s, %s, 'pickedup')
-                                    ON DUPLICATE KEY UPDATE status = 'pickedup'
-                                """, (current_order, vendor_id))
-                                
-                                # Check if all vendors have marked as picked up
-                                db_executor.execute("""
-                                    SELECT COUNT(DISTINCT m.vendor_id) as total_vendors,
-                                           COUNT(DISTINCT vos.vendor_id) as pickedup_vendors
-                                    FROM order_items oi
-                                    JOIN menu_items m ON oi.menu_item_id = m.id
-                                    LEFT JOIN vendor_order_status vos ON oi.order_id = vos.order_id AND m.vendor_id = vos.vendor_id AND vos.status = 'pickedup'
-                                    WHERE oi.order_id = %s
-                                """, (current_order,))
-                                
-                                result = db_executor.fetchone()
-                                if result[0] == result[1]:  # All vendors are picked up
-                                    db_executor.execute(
-                                        "UPDATE orders SET status = 'pickedup' WHERE id = %s",
-                                        (current_order,)
-                                    )
-                                
-                                conn.commit()
-                                st.rerun()
-                        
-                        with col3:
-                            # Add View Invoice button if Razorpay order exists
-                            if order[4]:  # razorpay_order_id
-                                # First check in session state
-                                if 'invoices' in st.session_state and str(current_order) in st.session_state.invoices:
-                                    invoice_url = st.session_state.invoices[str(current_order)]
-                                    st.markdown(f'<a href="{invoice_url}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer;">View Invoice</button></a>', unsafe_allow_html=True)
-                                else:
-                                    # If not in session state, try to fetch from Razorpay
-                                    try:
-                                        from payment import client
-                                        invoices = client.invoice.all()
-                                        for invoice in invoices['items']:
-                                            if invoice['notes'].get('order_id') == str(current_order):
-                                                invoice_url = invoice['short_url']
-                                                st.markdown(f'<a href="{invoice_url}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer;">View Invoice</button></a>', unsafe_allow_html=True)
-                                                # Store in session state for future
-                                                if 'invoices' not in st.session_state:
-                                                    st.session_state.invoices = {}
-                                                st.session_state.invoices[str(current_order)] = invoice_url
-                                                break
-                                        else:
-                                            st.write("Invoice not found")
-                                    except Exception as e:
-                                        st.error(f"Error fetching invoice: {str(e)}")
-                        
-                        st.write("---")  # Add separator between orders
-                        items = []  # Clear items for next order
-                    
-                    current_order = order[0]
-                    st.subheader(f"Order #{order[0]}")
-                    st.write(f"Customer: {order[6]}")  # user email
-                    st.write(f"Status: {order[11] or 'pending'}")  # vendor-specific status
-                    st.write(f"Total: ₹{order[2]:.2f}")
-                    order_date = order[5].strftime("%Y-%m-%d %H:%M:%S")
-                    st.write(f"Date: {order_date}")
-                    st.write("Items:")
-                
-                # Add item to current order's items
-                items.append(order)
+                st.info("No active orders." if view == "Active" else "No orders found.")
+            else:
+                for order in orders:
+                    vendor_order_card(conn, vendor_id, order, invoice_urls.get(order.order_id))
             
-            # Display last order's items and buttons
-            if items:
-                for item in items:
-                    st.write(f"₹{item[9]:.2f} x {item[8]} (₹{item[9] * item[8]:.2f}) {item[7]} from {item[10]}")
-                
-                st.write("---")  # Add separator before buttons
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    if st.button(f"Mark Ready #{current_order}", key=f"ready_{current_order}_last"):
-                        db_executor.execute(
-                            "UPDATE orders SET status = 'ready' WHERE id = %s",
-                            (current_order,)
-                        )
-                        conn.commit()
-                        st.rerun()
-                with col2:
-                    if st.button(f"Mark Picked Up #{current_order}", key=f"pickedup_{current_order}_last"):
-                        db_executor.execute(
-                            "UPDATE orders SET status = 'pickedup' WHERE id = %s",
-                            (current_order,)
-                        )
-                        conn.commit()
-                        st.rerun()
-                with col3:
-                    # Add View Invoice button if Razorpay order exists
-                    if order[4]:  # razorpay_order_id
-                        # First check in session state
-                        if 'invoices' in st.session_state and str(current_order) in st.session_state.invoices:
-                            invoice_url = st.session_state.invoices[str(current_order)]
-                            st.markdown(f'<a href="{invoice_url}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer;">View Invoice</button></a>', unsafe_allow_html=True)
-                        else:
-                            # If not in session state, try to fetch from Razorpay
-                            try:
-                                from payment import client
-                                invoices = client.invoice.all()
-                                for invoice in invoices['items']:
-                                    if invoice['notes'].get('order_id') == str(current_order):
-                                        invoice_url = invoice['short_url']
-                                        st.markdown(f'<a href="{invoice_url}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer;">View Invoice</button></a>', unsafe_allow_html=True)
-                                        # Store in session state for future
-                                        if 'invoices' not in st.session_state:
-                                            st.session_state.invoices = {}
-                                        st.session_state.invoices[str(current_order)] = invoice_url
-                                        break
-                                else:
-                                    st.write("Invoice not found")
-                            except Exception as e:
-                                st.error(f"Error fetching invoice: {str(e)}")
+            col1, col2 = st.columns(2)
+            with col1:
+                if len(cursors) > 1 and st.button("← Newer", key="vendor_orders_newer"):
+                    cursors.pop()
+                    st.rerun()
+            with col2:
+                if next_cursor and st.button("Older →", key="vendor_orders_older"):
+                    cursors.append(next_cursor)
+                    st.rerun()
         
         except mysql.connector.Error as e:
             st.error(f"Database error: {e}")
@@ -324,7 +238,7 @@ def vendor_ui():
         st.header(f"{vendor_name} Menu Management")
         try:
             # Connect to database
-            conn = mysql.connector.connect(**DB_CONFIG)
+            conn = connect()
             db_executor = conn.cursor()
             
             # Get vendor's ID
@@ -391,6 +305,7 @@ def vendor_ui():
                                 """, (new_status, item_id))
                             
                             conn.commit()
+                            invalidate("menu")
                             st.success("Menu items updated successfully!")
                             st.rerun()
                         except mysql.connector.Error as e:
@@ -427,6 +342,7 @@ def vendor_ui():
                             """, (vendor_id, name, description, price, available, image_path or None))
                             
                             conn.commit()
+                            invalidate("menu")
                             st.success(f"Successfully added {name} to the menu!")
                             st.rerun()
                         except mysql.connector.Error as e:
@@ -458,6 +374,7 @@ def client_ui():
         "Go to",
         ["View Menu", "Cart", "My Orders"]
     )
+    set_page(f"customer:{page}")
     
     if page == "View Menu":
         display_vendor_menu()
@@ -497,9 +414,139 @@ def client_ui():
     </div>
     """, unsafe_allow_html=True)
 
+def _checkout_key(cart):
+    # One idempotency key per distinct cart: retries of the same checkout
+    # reuse it, while changing the cart starts a fresh order
+    fingerprint = tuple(sorted(cart.items()))
+    key = st.session_state.get('checkout_key')
+    if not key or key[0] != fingerprint:
+        key = (fingerprint, str(uuid.uuid4()))
+        st.session_state.checkout_key = key
+    return key[1]
+
+def _checkout(conn, user_id):
+    # Places the session's cart as an order and queues its payment; both
+    # checkout buttons go through here. The order and all its items are one
+    # transaction, re-pricing the cart at commit time, and the checkout key
+    # makes a double click or rerun return the same order instead of a new
+    # one. Raises ValueError when nothing in the cart can be ordered.
+    placed = order_service.place_order(
+        conn,
+        user_id,
+        st.session_state.cart,
+        idempotency_key=_checkout_key(st.session_state.cart)
+    )
+    
+    # Gateway order and invoice are created in the background; the page
+    # shows a pending state and picks up the pay link when ready
+    payment_worker.submit(placed.order_id)
+    st.session_state.pending_payment = placed.order_id
+    
+    # Clear cart
+    st.session_state.cart = {}
+    st.session_state.pop('checkout_key', None)
+    return placed
+
+def vendor_order_card(conn, vendor_id, order, invoice_url):
+    st.subheader(f"Order #{order.order_id}")
+    st.write(f"Customer: {order.customer_email}")
+    st.write(f"Status: {order.vendor_status or 'pending'}")  # vendor-specific status
+    st.write(f"Total: ₹{order.total:.2f}")
+    st.write(f"Date: {order.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
+    st.write("Items:")
+    for line in order.lines:
+        st.write(f"₹{line.price:.2f} x {line.quantity} (₹{line.price * line.quantity:.2f}) {line.name}")
+    
+    # Add status update buttons after all items
+    st.write("---")  # Add separator before buttons
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button(f"Mark Ready #{order.order_id}", key=f"ready_{order.order_id}"):
+            set_vendor_order_status(conn, order.order_id, vendor_id, 'ready')
+            st.rerun()
+    with col2:
+        if st.button(f"Mark Picked Up #{order.order_id}", key=f"pickedup_{order.order_id}"):
+            set_vendor_order_status(conn, order.order_id, vendor_id, 'pickedup')
+            st.rerun()
+    with col3:
+        # Add View Invoice button if Razorpay order exists
+        if order.razorpay_order_id:
+            invoice_button(invoice_url)
+    
+    st.write("---")  # Add separator between orders
+
+def invoice_button(invoice_url):
+    if invoice_url:
+        st.markdown(f'<a href="{invoice_url}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer;">View Invoice</button></a>', unsafe_allow_html=True)
+    else:
+        st.write("Invoice not found")
+
+def payment_status_ui(order_id):
+    # Shows the checkout's payment state: polls while the background worker
+    # creates the pay link, then until the webhook marks the order paid
+    st.subheader(f"Order #{order_id}")
+    try:
+        job = payment_worker.get_job(order_id)
+    except mysql.connector.Error as e:
+        st.error(f"Database error: {e}")
+        return
+    
+    if not job:
+        st.session_state.pop('pending_payment', None)
+        return
+    
+    if job['status'] in ('pending', 'running'):
+        st_autorefresh(interval=2_000, limit=None, key=f"payment_poll_{order_id}")
+        # Make sure this process is working on it (e.g. after a restart);
+        # a job backing off after a failure is not claimed until it is due
+        payment_worker.submit(order_id)
+        if job['last_error']:
+            st.warning(f"The payment gateway is not responding; retrying automatically "
+                       f"(attempt {job['attempts']} of {PAYMENT_JOB_MAX_ATTEMPTS} failed).")
+        st.info("⏳ Setting up your payment... this page will update automatically.")
+        return
+    
+    if job['status'] == 'failed':
+        st.error(f"We could not set up the payment: {job['last_error']}")
+        if st.button("Try again", key=f"retry_payment_{order_id}"):
+            payment_worker.retry(order_id)
+            st.rerun()
+        return
+    
+    if job['payment_status'] == 'paid':
+        # Set by the Razorpay webhook receiver
+        st.balloons()
+        st.markdown("""
+        <div style='text-align: center; padding: 20px; background-color: #4CAF50; color: white; border-radius: 5px; margin: 20px 0;'>
+            <h3 style='margin: 0;'>🎉 Payment Successful!</h3>
+            <p style='margin: 10px 0; font-size: 16px;'>Your order is being prepared.</p>
+        </div>
+        """, unsafe_allow_html=True)
+        st.session_state.pop('pending_payment', None)
+        return
+    
+    # Pay link is ready
+    if job['payment_status'] == 'failed':
+        st.error("Your last payment attempt failed. Please try again.")
+    else:
+        st.success("🎉 Payment initiated successfully! Please complete the payment to confirm your order.")
+    if job['invoice_url']:
+        st.markdown(f'<a href="{job["invoice_url"]}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer; font-size: 16px; font-weight: bold;">Pay Now</button></a>', unsafe_allow_html=True)
+    else:
+        user = st.session_state.user
+        razorpay_button(None, order_id, job['razorpay_order_id'], user['name'], user['email'])
+    
+    # Re-check every 5 seconds; this is a primary key read of payment_status,
+    # which the webhook receiver updates, so it never calls the gateway
+    st_autorefresh(interval=5_000, limit=None, key=f"payment_status_poll_{order_id}")
+
 def cart_ui():
     st.title("🛒 Your Cart")
     
+    if st.session_state.get('pending_payment'):
+        payment_status_ui(st.session_state.pending_payment)
+        st.write("---")
+    
     if 'cart' not in st.session_state or not st.session_state.cart:
         st.info("Your cart is empty. Please add items from the menu.")
         return
@@ -509,109 +556,37 @@ def cart_ui():
     total = 0
     
     try:
-        # Use the config for database connection
-        conn = mysql.connector.connect(**DB_CONFIG)
+        # Borrow a pooled connection
+        conn = connect()
         db_executor = conn.cursor()
         
-        for item_id, quantity in st.session_state.cart.items():
-            # Get item details from database
-            db_executor.execute("""
-                SELECT m.name, m.price, v.name as vendor_name
-                FROM menu_items m
-                JOIN vendors v ON m.vendor_id = v.id
-                WHERE m.id = %s
-            """, (item_id,))
-            
-            item = db_executor.fetchone()
-            if item:
-                name, price, vendor = item
-                item_total = price * quantity
-                total += item_total
-                st.write(f"{name} (from {vendor}) x {quantity} = ₹{item_total:.2f}")
+        # Price the whole cart with one query
+        for line in price_cart(db_executor, st.session_state.cart):
+            total += line.subtotal
+            st.write(f"{line.name} (from {line.vendor_name}) x {line.quantity} = ₹{line.subtotal:.2f}")
         
         st.write("---")
         st.write(f"**Total Amount: ₹{total:.2f}**")
         
+        health = gateway_health()
+        if not health['ok']:
+            # Orders still go through; the payment worker retries the gateway
+            st.warning(f"Payments are temporarily unavailable ({health['error']}). You can still place your order and pay once it is back.")
+        
         if st.button("Place Order"):
-            # Create order
-            db_executor.execute(
-                "INSERT INTO orders (user_id, total, status) VALUES (%s, %s, 'inmaking')",
-                (st.session_state.user['id'], total)
-            )
-            
-            order_id = db_executor.lastrowid
-            
-            # Add order items
-            for item_id, quantity in st.session_state.cart.items():
-                db_executor.execute("""
-                    SELECT price FROM menu_items WHERE id = %s
-                """, (item_id,))
-                price = db_executor.fetchone()[0]
-                
-                db_executor.execute(
-                    "INSERT INTO order_items (order_id, menu_item_id, quantity, price_at_time) VALUES (%s, %s, %s, %s)",
-                    (order_id, item_id, quantity, price)
-                )
-            
-            conn.commit()
-            
-            # Display payment section
-            st.write("### Payment")
-            st.info("Please wait while we redirect you to the payment gateway...")
-            
-            # Initiate payment and get Razorpay order ID
-            razorpay_order_id = initiate_payment(total, order_id)
-            if razorpay_order_id:
-                # Update order with Razorpay order ID
-                db_executor.execute(
-                    "UPDATE orders SET razorpay_order_id = %s WHERE id = %s",
-                    (razorpay_order_id, order_id)
-                )
-                conn.commit()
-                
-                # Clear cart
-                st.session_state.cart = {}
-                
-                # Add payment status checker with Streamlit notifications
-                st.markdown(f"""
-                <script>
-                function checkPaymentStatus() {{
-                    fetch('/check_payment_status?order_id={order_id}')
-                        .then(response => response.json())
-                        .then(data => {{
-                            if (data.status === 'paid') {{
-                                // Show success message
-                                const successDiv = document.createElement('div');
-                                successDiv.innerHTML = `
-                                    <div style='text-align: center; padding: 20px; background-color: #4CAF50; color: white; border-radius: 5px; margin: 20px 0;'>
-                                        <h3 style='margin: 0;'>🎉 Payment Successful!</h3>
-                                        <p style='margin: 10px 0; font-size: 16px;'>Your order is being prepared.</p>
-                                    </div>
-                                `;
-                                document.body.appendChild(successDiv);
-                                
-                                // Show balloons
-                                window.parent.postMessage({{type: 'streamlit:balloons'}}, '*');
-                                
-                                // Redirect after 3 seconds
-                                setTimeout(() => {{
-                                    window.location.href = '/my_orders';
-                                }}, 3000);
-                            }}
-                        }});
-                }}
-                
-                // Check payment status every 5 seconds
-                setInterval(checkPaymentStatus, 5000);
-                </script>
-                """, unsafe_allow_html=True)
+            try:
+                _checkout(conn, st.session_state.user['id'])
+            except ValueError as e:
+                st.error(str(e))
+                return
+            st.rerun()
         
     except mysql.connector.Error as e:
         st.error(f"Database error: {e}")
         if 'conn' in locals():
             conn.rollback()
     except Exception as e:
-        st.error(f"An error occurred: {e}")
+        st.error(f"Error placing order: {e}")
         if 'conn' in locals():
             conn.rollback()
     finally:
@@ -625,20 +600,19 @@ def view_my_orders_ui():
     
     try:
         # Use the config for database connection
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = connect()
         db_executor = conn.cursor()
         
         # Get user's orders with vendor information and status
         db_executor.execute("""
             SELECT o.id, o.status, o.total, o.created_at, o.razorpay_order_id,
-                   v.name as vendor_name, m.name as item_name, 
+                   v.name as vendor_name, oi.item_name, 
                    oi.quantity, oi.price_at_time,
                    vos.status as vendor_status
             FROM orders o
             JOIN order_items oi ON o.id = oi.order_id
-            JOIN menu_items m ON oi.menu_item_id = m.id
-            JOIN vendors v ON m.vendor_id = v.id
-            LEFT JOIN vendor_order_status vos ON o.id = vos.order_id AND v.id = vos.vendor_id
+            JOIN vendors v ON oi.vendor_id = v.id
+            LEFT JOIN vendor_order_status vos ON o.id = vos.order_id AND oi.vendor_id = vos.vendor_id
             WHERE o.user_id = %s
             ORDER BY o.created_at DESC
         """, (st.session_state.user['id'],))
@@ -649,6 +623,9 @@ def view_my_orders_ui():
             st.info("You have no orders yet.")
             return
         
+        # Every invoice link on the page in one indexed lookup
+        invoice_urls = get_invoice_urls({order[0] for order in orders if order[4]})
+        
         # Group orders by order_id
         current_order = None
         items = []
@@ -663,28 +640,7 @@ def view_my_orders_ui():
                     
                     # Add View Invoice button if Razorpay order exists
                     if items[0][4]:  # razorpay_order_id
-                        # First check in session state
-                        if 'invoices' in st.session_state and str(current_order) in st.session_state.invoices:
-                            invoice_url = st.session_state.invoices[str(current_order)]
-                            st.markdown(f'<a href="{invoice_url}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer;">View Invoice</button></a>', unsafe_allow_html=True)
-                        else:
-                            # If not in session state, try to fetch from Razorpay
-                            try:
-                                from payment import client
-                                invoices = client.invoice.all()
-                                for invoice in invoices['items']:
-                                    if invoice['notes'].get('order_id') == str(current_order):
-                                        invoice_url = invoice['short_url']
-                                        st.markdown(f'<a href="{invoice_url}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer;">View Invoice</button></a>', unsafe_allow_html=True)
-                                        # Store in session state for future
-                                        if 'invoices' not in st.session_state:
-                                            st.session_state.invoices = {}
-                                        st.session_state.invoices[str(current_order)] = invoice_url
-                                        break
-                                else:
-                                    st.write("Invoice not found")
-                            except Exception as e:
-                                st.error(f"Error fetching invoice: {str(e)}")
+                        invoice_button(invoice_urls.get(current_order))
                     
                     st.write("---")  # Add separator between orders
                     items = []  # Clear items for next order
@@ -707,28 +663,7 @@ def view_my_orders_ui():
             
             # Add View Invoice button if Razorpay order exists
             if items[0][4]:  # razorpay_order_id
-                # First check in session state
-                if 'invoices' in st.session_state and str(current_order) in st.session_state.invoices:
-                    invoice_url = st.session_state.invoices[str(current_order)]
-                    st.markdown(f'<a href="{invoice_url}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer;">View Invoice</button></a>', unsafe_allow_html=True)
-                else:
-                    # If not in session state, try to fetch from Razorpay
-                    try:
-                        from payment import client
-                        invoices = client.invoice.all()
-                        for invoice in invoices['items']:
-                            if invoice['notes'].get('order_id') == str(current_order):
-                                invoice_url = invoice['short_url']
-                                st.markdown(f'<a href="{invoice_url}" target="_blank"><button style="background-color: #4CAF50; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer;">View Invoice</button></a>', unsafe_allow_html=True)
-                                # Store in session state for future
-                                if 'invoices' not in st.session_state:
-                                    st.session_state.invoices = {}
-                                st.session_state.invoices[str(current_order)] = invoice_url
-                                break
-                        else:
-                            st.write("Invoice not found")
-                    except Exception as e:
-                        st.error(f"Error fetching invoice: {str(e)}")
+                invoice_button(invoice_urls.get(current_order))
         
     except mysql.connector.Error as e:
         st.error(f"Database error: {e}")
@@ -740,134 +675,6 @@ def view_my_orders_ui():
         if 'conn' in locals():
             conn.close()
 
-def place_order():
-    try:
-        # Connect to database
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="canteen1"
-        )
-        db_executor = conn.cursor()
-        
-        # Start transaction
-        conn.start_transaction()
-        
-        # Get menu items
-        menu_items = get_menu_items()
-        if not menu_items:
-            print("No items available in the menu.")
-            return
-        
-        # Display menu by vendors
-        current_vendor = None
-        print("\nAvailable Menu Items:")
-        print("=" * 80)
-        
-        for item in menu_items:
-            if current_vendor != item[1]:  # vendor_name
-                current_vendor = item[1]
-                print(f"\n{current_vendor}:")
-                print("-" * 40)
-            
-            print(f"{item[2]}. {item[3]} - ₹{item[5]:.2f}")
-            if item[4]:  # description
-                print(f"   {item[4]}")
-        
-        # Get order items
-        order_items = []
-        total = 0.0
-        
-        while True:
-            item_id = input("\nEnter item ID to add to cart (or 'done' to finish): ")
-            if item_id.lower() == 'done':
-                break
-                
-            try:
-                item_id = int(item_id)
-                quantity = int(input("Enter quantity: "))
-                
-                # Find the selected item
-                selected_item = next((item for item in menu_items if item[2] == item_id), None)
-                if selected_item:
-                    order_items.append({
-                        'item_id': item_id,
-                        'quantity': quantity,
-                        'price': selected_item[5]
-                    })
-                    total += selected_item[5] * quantity
-                else:
-                    print("Invalid item ID. Please try again.")
-            except ValueError:
-                print("Please enter valid numbers.")
-        
-        if not order_items:
-            print("No items selected. Order cancelled.")
-            return
-        
-        # Create order
-        db_executor.execute(
-            "INSERT INTO orders (user_id, total, status) VALUES (%s, %s, 'inmaking')",
-            (st.session_state.user['id'], total)
-        )
-        
-        # Get the auto-incremented order ID
-        order_id = db_executor.lastrowid
-        print(f"\nCreated order with ID: {order_id}")
-        
-        # Add order items
-        for item in order_items:
-            db_executor.execute(
-                "INSERT INTO order_items (order_id, menu_item_id, quantity, price_at_time) VALUES (%s, %s, %s, %s)",
-                (order_id, item['item_id'], item['quantity'], item['price'])
-            )
-            print(f"Added item {item['item_id']} (quantity: {item['quantity']}) to order {order_id}")
-        
-        # Commit transaction
-        conn.commit()
-        print(f"\nOrder placed successfully! Order ID: {order_id}")
-        print(f"Total amount: ₹{total:.2f}")
-        
-        # Verify the order was created
-        db_executor.execute("""
-            SELECT o.*, v.name as vendor_name, m.name as item_name, 
-                   m.price, oi.quantity, oi.price_at_time
-            FROM orders o
-            JOIN order_items oi ON o.id = oi.order_id
-            JOIN menu_items m ON oi.menu_item_id = m.id
-            JOIN vendors v ON m.vendor_id = v.id
-            WHERE o.id = %s
-        """, (order_id,))
-        
-        items = db_executor.fetchall()
-        if items:
-            print("\nOrder verification:")
-            print(f"Order ID: {items[0][0]}")
-            print(f"User ID: {items[0][1]}")
-            print(f"Total: ₹{items[0][2]:.2f}")
-            print(f"Status: {items[0][3]}")
-            print(f"Created at: {items[0][4]}")
-            
-            print("\nOrder items:")
-            for item in items:
-                print(f"Vendor: {item[5]}")
-                print(f"Item: {item[6]} x {item[7]}")
-                print(f"Price at time: ₹{item[8]:.2f}")
-                print("-" * 40)
-        
-    except mysql.connector.Error as e:
-        print(f"Database error: {e}")
-        conn.rollback()
-    except Exception as e:
-        print(f"Error: {e}")
-        conn.rollback()
-    finally:
-        if 'db_executor' in locals():
-            db_executor.close()
-        if 'conn' in locals():
-            conn.close()
-
 def register():
     try:
         # Connect to database
@@ -929,9 +736,10 @@ def admin_ui():
     # Add tabs for different admin functions
     admin_tab = st.sidebar.radio(
         "Admin Functions",
-        ["Vendor Management", "Order Analysis"],
+        ["Vendor Management", "Order Analysis", "Payment Gateway", "Query Performance"],
         key="admin_navigation_tabs"
     )
+    set_page(f"admin:{admin_tab}")
     
     if admin_tab == "Vendor Management":
         st.header("Vendor Management")
@@ -945,7 +753,7 @@ def admin_ui():
             
             if st.form_submit_button("Add Vendor"):
                 try:
-                    conn = mysql.connector.connect(**DB_CONFIG)
+                    conn = connect()
                     db_executor = conn.cursor()
                     
                     # Check if vendor email already exists
@@ -967,6 +775,7 @@ def admin_ui():
                         )
                         
                         conn.commit()
+                        invalidate("vendors")
                         st.success(f"Successfully added vendor: {vendor_name}")
                         st.rerun()
                         
@@ -981,7 +790,7 @@ def admin_ui():
         # Remove vendor section
         st.subheader("Remove Vendor")
         try:
-            conn = mysql.connector.connect(**DB_CONFIG)
+            conn = connect()
             db_executor = conn.cursor()
             
             # Get all vendors
@@ -1006,6 +815,7 @@ def admin_ui():
                     db_executor.execute("DELETE FROM users WHERE name = (SELECT name FROM vendors WHERE id = %s)", (vendor_id,))
                     
                     conn.commit()
+                    invalidate("vendors", "menu")
                     st.success(f"Successfully removed vendor: {selected_vendor}")
                     st.rerun()
             else:
@@ -1023,7 +833,7 @@ def admin_ui():
         st.header("Order Analysis by Vendor")
         
         try:
-            conn = mysql.connector.connect(**DB_CONFIG)
+            conn = connect()
             db_executor = conn.cursor()
             
             # Get date range for analysis
@@ -1032,25 +842,10 @@ def admin_ui():
                 start_date = st.date_input("Start Date")
             with col2:
                 end_date = st.date_input("End Date")
-            
-            # Get vendor-wise order statistics
-            db_executor.execute("""
-                SELECT 
-                    v.name as vendor_name,
-                    COUNT(DISTINCT o.id) as total_orders,
-                    SUM(oi.quantity) as total_items,
-                    SUM(oi.quantity * oi.price_at_time) as total_revenue,
-                    AVG(oi.quantity * oi.price_at_time) as avg_order_value
-                FROM vendors v
-                JOIN menu_items m ON v.id = m.vendor_id
-                JOIN order_items oi ON m.id = oi.menu_item_id
-                JOIN orders o ON oi.order_id = o.id
-                WHERE DATE(o.created_at) BETWEEN %s AND %s
-                GROUP BY v.id, v.name
-                ORDER BY total_revenue DESC
-            """, (start_date, end_date))
-            
-            vendor_stats = db_executor.fetchall()
+            # Read from the daily rollup (vendor_rollup.py): one row per
+            # vendor per day, however many orders the range holds
+            end_before = end_date + timedelta(days=1)
+            vendor_stats = vendor_summary(db_executor, start_date, end_before)
             
             if vendor_stats:
                 # Display summary statistics
@@ -1058,42 +853,40 @@ def admin_ui():
                 
                 # Create columns for metrics
                 cols = st.columns(len(vendor_stats))
-                for i, (vendor, orders, items, revenue, avg_value) in enumerate(vendor_stats):
+                for i, stats in enumerate(vendor_stats):
                     with cols[i]:
                         st.metric(
-                            label=vendor,
-                            value=f"₹{revenue:,.2f}",
-                            delta=f"{orders} orders"
+                            label=stats.vendor_name,
+                            value=f"₹{stats.revenue:,.2f}",
+                            delta=f"{stats.orders} orders"
                         )
                 
                 # Display detailed statistics in a table
                 st.subheader("Detailed Statistics")
                 stats_data = {
-                    "Vendor": [v[0] for v in vendor_stats],
-                    "Total Orders": [v[1] for v in vendor_stats],
-                    "Total Items Sold": [v[2] for v in vendor_stats],
-                    "Total Revenue": [f"₹{v[3]:,.2f}" for v in vendor_stats],
-                    "Average Order Value": [f"₹{v[4]:,.2f}" for v in vendor_stats]
+                    "Vendor": [v.vendor_name for v in vendor_stats],
+                    "Total Orders": [v.orders for v in vendor_stats],
+                    "Total Items Sold": [v.items for v in vendor_stats],
+                    "Total Revenue": [f"₹{v.revenue:,.2f}" for v in vendor_stats],
+                    "Average Order Value": [f"₹{v.avg_order_value:,.2f}" for v in vendor_stats],
+                    "Customers / Day": [round(v.avg_daily_customers, 1) for v in vendor_stats]
                 }
                 st.dataframe(stats_data)
                 
                 # Display revenue trend chart
                 st.subheader("Revenue Trend")
-                db_executor.execute("""
-                    SELECT 
-                        DATE(o.created_at) as order_date,
-                        v.name as vendor_name,
-                        SUM(oi.quantity * oi.price_at_time) as daily_revenue
-                    FROM orders o
-                    JOIN order_items oi ON o.id = oi.order_id
-                    JOIN menu_items m ON oi.menu_item_id = m.id
-                    JOIN vendors v ON m.vendor_id = v.id
-                    WHERE DATE(o.created_at) BETWEEN %s AND %s
-                    GROUP BY DATE(o.created_at), v.name
-                    ORDER BY order_date, v.name
-                """, (start_date, end_date))
-                
-                trend_data = db_executor.fetchall()
+                bucket = st.selectbox(
+                    "Granularity", BUCKETS, index=BUCKETS.index("day"),
+                    format_func=lambda b: b.capitalize()
+                )
+                if bucket == "hour" and (end_before - start_date).days > 31:
+                    st.warning("Hourly trends are limited to 31 days; showing daily totals instead.")
+                    bucket = "day"
+                period = {"hour": "Hourly", "day": "Daily", "week": "Weekly", "month": "Monthly"}[bucket]
+                trend_data = [
+                    (p.bucket, p.vendor_name, p.revenue)
+                    for p in revenue_trend(db_executor, start_date, end_before, bucket)
+                ]
                 if trend_data:
                     import pandas as pd
                     
@@ -1111,7 +904,7 @@ def admin_ui():
                     pivot_df = pivot_df.fillna(0)
                     
                     # Add a title above the chart
-                    st.markdown("### Daily Revenue Trend by Vendor")
+                    st.markdown(f"### {period} Revenue Trend by Vendor")
                     
                     # Create a container for the chart
                     chart_container = st.container()
@@ -1158,9 +951,9 @@ def admin_ui():
                     # Add summary statistics below the chart
                     st.markdown("### Summary Statistics")
                     summary_stats = df.groupby('vendor')['revenue'].agg(['sum', 'mean', 'count']).round(2)
-                    summary_stats.columns = ['Total Revenue', 'Average Daily Revenue', 'Number of Days']
+                    summary_stats.columns = ['Total Revenue', f'Average {period} Revenue', f'Number of {bucket.capitalize()}s']
                     summary_stats['Total Revenue'] = summary_stats['Total Revenue'].apply(lambda x: f"₹{x:,.2f}")
-                    summary_stats['Average Daily Revenue'] = summary_stats['Average Daily Revenue'].apply(lambda x: f"₹{x:,.2f}")
+                    summary_stats[f'Average {period} Revenue'] = summary_stats[f'Average {period} Revenue'].apply(lambda x: f"₹{x:,.2f}")
                     
                     # Style the summary table
                     st.dataframe(
@@ -1171,16 +964,32 @@ def admin_ui():
                                 "Total Revenue",
                                 help="Total revenue for the selected period"
                             ),
-                            "Average Daily Revenue": st.column_config.TextColumn(
-                                "Average Daily Revenue",
-                                help="Average daily revenue"
+                            f"Average {period} Revenue": st.column_config.TextColumn(
+                                f"Average {period} Revenue",
+                                help=f"Average revenue per {bucket} with sales"
                             ),
-                            "Number of Days": st.column_config.NumberColumn(
-                                "Number of Days",
-                                help="Number of days with sales"
+                            f"Number of {bucket.capitalize()}s": st.column_config.NumberColumn(
+                                f"Number of {bucket.capitalize()}s",
+                                help=f"Number of {bucket}s with sales"
                             )
                         }
                     )
+                
+                # Orders by hour of day, averaged over the range (lunch rush)
+                st.subheader("Orders by Hour of Day")
+                rush_vendor = st.selectbox(
+                    "Vendor", [None] + [v.vendor_id for v in vendor_stats],
+                    format_func=lambda vid: "All vendors" if vid is None else next(
+                        v.vendor_name for v in vendor_stats if v.vendor_id == vid
+                    )
+                )
+                profile = hourly_profile(db_executor, start_date, end_before, rush_vendor)
+                busiest = max(profile, key=lambda h: h.orders)
+                st.caption(f"Busiest hour: {busiest.hour:02d}:00-{busiest.hour + 1:02d}:00, "
+                           f"{busiest.orders_per_day:.1f} orders / day")
+                st.bar_chart({
+                    "Orders / Day": {f"{h.hour:02d}:00": round(h.orders_per_day, 2) for h in profile}
+                })
             else:
                 st.info("No order data found for the selected date range.")
                 
@@ -1191,3 +1000,83 @@ def admin_ui():
                 db_executor.close()
             if 'conn' in locals():
                 conn.close()
+    
+    elif admin_tab == "Payment Gateway":
+        st.header("Payment Gateway")
+        
+        health = gateway_health()
+        if health['ok']:
+            st.success("Gateway reachable")
+        else:
+            st.error(health['error'])
+        
+        # Latency of this app process's gateway calls, per endpoint
+        stats = gateway_stats()
+        if not stats:
+            st.info("No gateway calls made by this process yet.")
+            return
+        st.dataframe({
+            "Endpoint": list(stats),
+            "Calls": [s['calls'] for s in stats.values()],
+            "Errors": [s['errors'] for s in stats.values()],
+            "Retries": [s['retries'] for s in stats.values()],
+            "Mean (ms)": [round(s['mean_ms'] or 0, 1) for s in stats.values()],
+            "p50 (ms)": [s['p50_ms'] for s in stats.values()],
+            "p95 (ms)": [s['p95_ms'] for s in stats.values()],
+            "p99 (ms)": [s['p99_ms'] for s in stats.values()],
+        }, use_container_width=True)
+        
+        endpoint = st.selectbox("Latency histogram", list(stats))
+        st.bar_chart(stats[endpoint]['buckets'])
+
+    elif admin_tab == "Query Performance":
+        st.header("Query Performance")
+        stats = get_stats()
+        st.caption(f"Since this app process started (or the last reset). "
+                   f"Statements over {stats.slow_ms:.0f} ms go to the slow-query log.")
+        if st.button("Reset statistics"):
+            stats.reset()
+        
+        # Which pages cost the most database time per rerun
+        pages = stats.pages()
+        st.subheader("By page")
+        if pages:
+            st.dataframe({
+                "Page": [page for page, _ in pages],
+                "Reruns": [p['reruns'] for _, p in pages],
+                "Queries / rerun": [round(p['queries'] / p['reruns'], 1) for _, p in pages],
+                "Max queries": [p['max_queries'] for _, p in pages],
+                "DB ms / rerun": [round(p['seconds'] * 1000 / p['reruns'], 1) for _, p in pages],
+                "KB / rerun": [round(p['bytes'] / 1024 / p['reruns'], 1) for _, p in pages],
+                "Total DB s": [round(p['seconds'], 2) for _, p in pages],
+            }, use_container_width=True)
+        else:
+            st.info("No reruns recorded yet.")
+        
+        queries = stats.queries()[:50]
+        st.subheader("Worst statements by total time")
+        if queries:
+            st.dataframe({
+                "Statement": [fp for fp, _ in queries],
+                "Calls": [q['calls'] for _, q in queries],
+                "Total ms": [round(q['seconds'] * 1000, 1) for _, q in queries],
+                "Mean ms": [round(q['seconds'] * 1000 / q['calls'], 2) for _, q in queries],
+                "Max ms": [round(q['max_seconds'] * 1000, 1) for _, q in queries],
+                "Rows": [q['rows'] for _, q in queries],
+                "KB": [round(q['bytes'] / 1024, 1) for _, q in queries],
+            }, use_container_width=True)
+        else:
+            st.info("No statements recorded yet.")
+        
+        slow = stats.slow_queries()
+        st.subheader("Slow-query log")
+        if slow:
+            st.dataframe({
+                "At": [time.strftime("%H:%M:%S", time.localtime(s['at'])) for s in slow],
+                "Page": [s['page'] or "background" for s in slow],
+                "ms": [round(s['seconds'] * 1000, 1) for s in slow],
+                "Rows": [s['rows'] for s in slow],
+                "Statement": [s['fingerprint'] for s in slow],
+            }, use_container_width=True)
+        else:
+            st.info("No slow statements.")
@@ -0,0 +1,156 @@
+import argparse
+import sys
+import traceback
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List
+import mysql.connector
+from db import connection
+
+# Daily per-vendor totals (vendor_daily_rollup, see
+# migrations/0010_vendor_daily_rollup.sql) so the admin "Order Analysis"
+# page reads one row per vendor per day instead of re-aggregating
+# order_items. A year of history is a few thousand rows however many orders
+# it holds. Trends over it are in analytics.py.
+#
+# place_order adds each order to its day in the same transaction
+# (record_order_rollup). Any range can be rebuilt from orders, e.g. from
+# cron, to pick up orders written outside place_order:
+#
+#   python vendor_rollup.py                                  # yesterday
+#   python vendor_rollup.py --from 2024-07-01 --to 2025-07-01
+
+
+@dataclass
+class VendorSummary:
+    vendor_id: int
+    vendor_name: str
+    orders: int
+    items: int
+    revenue: Decimal
+    customer_days: int  # distinct customers per day, summed over the range
+    days: int  # days with at least one order
+
+    @property
+    def avg_order_value(self):
+        return self.revenue / self.orders if self.orders else Decimal(0)
+
+    @property
+    def avg_daily_customers(self):
+        return self.customer_days / self.days if self.days else 0
+
+
+def record_order_rollup(cursor, order_id):
+    # Add one freshly inserted order to its vendors' rows for the day. Runs
+    # inside the order's transaction, after its order_items.
+    #
+    # The customer row goes in first: INSERT IGNORE waits for any concurrent
+    # order by the same customer to commit, and first_order_id then says
+    # whether this order is the one that added them.
+    cursor.execute("""
+        INSERT IGNORE INTO vendor_daily_customers (vendor_id, day, user_id, first_order_id)
+        SELECT DISTINCT oi.vendor_id, DATE(o.created_at), o.user_id, o.id
+        FROM orders o
+        JOIN order_items oi ON oi.order_id = o.id
+        WHERE o.id = %s
+    """, (order_id,))
+    # The grouped SELECT is wrapped in a derived table so the update can
+    # name its columns (new.items) instead of the deprecated VALUES().
+    cursor.execute("""
+        INSERT INTO vendor_daily_rollup (vendor_id, day, orders, items, revenue, customers)
+        SELECT * FROM (
+            SELECT oi.vendor_id, DATE(o.created_at) AS day, 1 AS orders, SUM(oi.quantity) AS items,
+                   SUM(oi.quantity * oi.price_at_time) AS revenue,
+                   EXISTS (
+                       SELECT 1 FROM vendor_daily_customers c
+                       WHERE c.vendor_id = oi.vendor_id AND c.day = DATE(o.created_at)
+                       AND c.user_id = o.user_id AND c.first_order_id = o.id
+                   ) AS customers
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.id
+            WHERE o.id = %s
+            GROUP BY oi.vendor_id, o.id, o.user_id, o.created_at
+        ) AS new
+        ON DUPLICATE KEY UPDATE
+            orders = vendor_daily_rollup.orders + new.orders,
+            items = vendor_daily_rollup.items + new.items,
+            revenue = vendor_daily_rollup.revenue + new.revenue,
+            customers = vendor_daily_rollup.customers + new.customers
+    """, (order_id,))
+
+
+def rebuild(conn, start, end):
+    # Recompute [start, end) from orders. Returns the number of rollup rows.
+    # Rebuilding today holds locks that make checkouts wait until it
+    # commits, so schedule it for closed days.
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        cursor.execute("DELETE FROM vendor_daily_customers WHERE day >= %s AND day < %s", (start, end))
+        cursor.execute("DELETE FROM vendor_daily_rollup WHERE day >= %s AND day < %s", (start, end))
+        cursor.execute("""
+            INSERT INTO vendor_daily_customers (vendor_id, day, user_id, first_order_id)
+            SELECT oi.vendor_id, DATE(o.created_at), o.user_id, MIN(o.id)
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.id
+            WHERE o.created_at >= %s AND o.created_at < %s
+            GROUP BY oi.vendor_id, DATE(o.created_at), o.user_id
+        """, (start, end))
+        cursor.execute("""
+            INSERT INTO vendor_daily_rollup (vendor_id, day, orders, items, revenue, customers)
+            SELECT oi.vendor_id, DATE(o.created_at), COUNT(DISTINCT o.id), SUM(oi.quantity),
+                   SUM(oi.quantity * oi.price_at_time), COUNT(DISTINCT o.user_id)
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.id
+            WHERE o.created_at >= %s AND o.created_at < %s
+            GROUP BY oi.vendor_id, DATE(o.created_at)
+        """, (start, end))
+        rows = cursor.rowcount
+        conn.commit()
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def vendor_summary(cursor, start, end) -> List[VendorSummary]:
+    # Totals per vendor over the days [start, end), highest revenue first
+    cursor.execute("""
+        SELECT v.id, v.name, SUM(r.orders), SUM(r.items), SUM(r.revenue),
+               SUM(r.customers), COUNT(*)
+        FROM vendor_daily_rollup r
+        JOIN vendors v ON v.id = r.vendor_id
+        WHERE r.day >= %s AND r.day < %s
+        GROUP BY v.id, v.name
+        ORDER BY SUM(r.revenue) DESC
+    """, (start, end))
+    return [
+        VendorSummary(vendor_id, name, int(orders), int(items), Decimal(revenue), int(customer_days), days)
+        for vendor_id, name, orders, items, revenue, customer_days, days in cursor.fetchall()
+    ]
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+if __name__ == "__main__":
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Rebuild the daily vendor rollup from orders")
+    parser.add_argument("--from", dest="start", type=_parse_date, default=today - timedelta(days=1),
+                        help="first day, YYYY-MM-DD (default: yesterday)")
+    parser.add_argument("--to", dest="end", type=_parse_date, default=today,
+                        help="day after the last one, YYYY-MM-DD (default: today)")
+    args = parser.parse_args()
+
+    try:
+        with connection() as conn:
+            rows = rebuild(conn, args.start, args.end)
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(traceback.format_exc())
+        sys.exit(1)
+    print(f"Rebuilt {rows} vendor-days from {args.start:%Y-%m-%d} to {args.end:%Y-%m-%d}")
@@ -0,0 +1,290 @@
+import argparse
+import hashlib
+import hmac
+import json
+import queue
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from db import connection
+from order_service import mark_orders_paid
+from order_feed import record_order_events
+from config import (
+    RAZORPAY_WEBHOOK_SECRET, WEBHOOK_HOST, WEBHOOK_PORT,
+    WEBHOOK_BATCH_SIZE, WEBHOOK_FLUSH_INTERVAL
+)
+
+# Receives Razorpay webhooks so payment status no longer has to be polled
+# from the gateway. Each request is signature-checked, then handed to a
+# single writer thread that groups concurrent deliveries into one
+# transaction: one multi-row INSERT into payment_events and one UPDATE of
+# orders.payment_status per batch. A request is only acknowledged once its
+# batch has committed, so Razorpay redelivers anything we failed to store.
+#
+#   python webhook_server.py            # listens on WEBHOOK_PORT
+#   python fake_razorpay_webhook.py     # posts signed test events to it
+
+WEBHOOK_PATH = "/razorpay/webhook"
+PAID_EVENTS = {"payment.captured", "order.paid", "invoice.paid"}
+FAILED_EVENTS = {"payment.failed"}
+
+
+@dataclass
+class PaymentEvent:
+    event_id: str
+    event: str
+    order_id: Optional[int]  # ours, from notes.order_id or resolved via razorpay_order_id
+    razorpay_order_id: Optional[str]
+    razorpay_payment_id: Optional[str]
+    amount: Optional[int]  # paise
+    payload: str
+
+
+def verify_signature(body, signature, secret):
+    # X-Razorpay-Signature is the hex HMAC-SHA256 of the raw body
+    if not secret or not signature:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def _entity(payload, name):
+    return (payload.get(name) or {}).get('entity') or {}
+
+
+def _notes_order_id(*entities):
+    for entity in entities:
+        notes = entity.get('notes')
+        # Razorpay sends an empty list rather than a dict when there are no notes
+        if isinstance(notes, dict) and notes.get('order_id'):
+            try:
+                return int(notes['order_id'])
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+def parse_event(body, event_id=None):
+    data = json.loads(body)
+    payload = data.get('payload') or {}
+    payment = _entity(payload, 'payment')
+    order = _entity(payload, 'order')
+    invoice = _entity(payload, 'invoice')
+    return PaymentEvent(
+        # Fall back to the body hash so redeliveries still dedupe
+        event_id=event_id or hashlib.sha256(body).hexdigest()[:64],
+        event=data.get('event', ''),
+        order_id=_notes_order_id(payment, order, invoice),
+        razorpay_order_id=payment.get('order_id') or order.get('id') or invoice.get('order_id'),
+        razorpay_payment_id=payment.get('id'),
+        amount=payment.get('amount') or order.get('amount'),
+        payload=body.decode('utf-8')
+    )
+
+
+def write_events(events):
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Events without notes.order_id are matched on the gateway order id
+            unresolved = {e.razorpay_order_id for e in events if e.order_id is None and e.razorpay_order_id}
+            if unresolved:
+                placeholders = ", ".join(["%s"] * len(unresolved))
+                cursor.execute(f"""
+                    SELECT razorpay_order_id, id
+                    FROM orders
+                    WHERE razorpay_order_id IN ({placeholders})
+                """, list(unresolved))
+                order_ids = dict(cursor.fetchall())
+                for event in events:
+                    if event.order_id is None:
+                        event.order_id = order_ids.get(event.razorpay_order_id)
+
+            values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(events))
+            params = []
+            for e in events:
+                params.extend((e.event_id, e.event, e.order_id, e.razorpay_order_id,
+                               e.razorpay_payment_id, e.amount, e.payload))
+            cursor.execute(f"""
+                INSERT IGNORE INTO payment_events
+                    (event_id, event, order_id, razorpay_order_id, razorpay_payment_id, amount, payload)
+                VALUES {values}
+            """, params)
+
+            paid = {}
+            failed = set()
+            for e in events:
+                if e.order_id is None:
+                    continue
+                if e.event in PAID_EVENTS:
+                    if e.razorpay_payment_id or e.order_id not in paid:
+                        paid[e.order_id] = e.razorpay_payment_id
+                elif e.event in FAILED_EVENTS:
+                    failed.add(e.order_id)
+            # A later successful attempt wins over an earlier failed one
+            failed -= paid.keys()
+
+            mark_orders_paid(cursor, paid)
+
+            if failed:
+                placeholders = ", ".join(["%s"] * len(failed))
+                cursor.execute(f"""
+                    UPDATE orders
+                    SET payment_status = 'failed'
+                    WHERE id IN ({placeholders}) AND payment_status = 'pending'
+                """, list(failed))
+                if cursor.rowcount:
+                    record_order_events(cursor, failed, 'payment')
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+class EventWriter:
+    # Group commit: request threads block in submit() while one writer
+    # thread drains the queue in batches of up to batch_size events, waiting
+    # at most flush_interval for a batch to fill
+
+    def __init__(self, batch_size=WEBHOOK_BATCH_SIZE, flush_interval=WEBHOOK_FLUSH_INTERVAL, write=write_events):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._write = write
+        self._queue = queue.Queue()
+        self._stats = {"events": 0, "batches": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="webhook-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, event, timeout=10):
+        done = threading.Event()
+        result = {}
+        self._queue.put((event, done, result))
+        if not done.wait(timeout):
+            raise TimeoutError("Timed out waiting for the event to be written")
+        if result.get("error"):
+            raise result["error"]
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            error = None
+            try:
+                self._write([event for event, _, _ in batch])
+            except Exception as e:
+                error = e
+                print(f"Failed to write {len(batch)} payment events: {e}")
+                print(traceback.format_exc())
+
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["events"] += len(batch)
+                if error:
+                    self._stats["errors"] += 1
+            for _, done, result in batch:
+                result["error"] = error
+                done.set()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    writer = None
+    secret = RAZORPAY_WEBHOOK_SECRET
+    quiet = False
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, {"status": "ok", **self.writer.stats()})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != WEBHOOK_PATH:
+            self._reply(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if not verify_signature(body, self.headers.get("X-Razorpay-Signature"), self.secret):
+            self._reply(400, {"error": "invalid signature"})
+            return
+
+        try:
+            event = parse_event(body, self.headers.get("X-Razorpay-Event-Id"))
+        except (ValueError, AttributeError) as e:
+            self._reply(400, {"error": f"invalid payload: {e}"})
+            return
+
+        try:
+            self.writer.submit(event)
+        except Exception as e:
+            # Non-2xx makes Razorpay retry the delivery later
+            self._reply(500, {"error": str(e)})
+            return
+        self._reply(200, {"status": "ok"})
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host=WEBHOOK_HOST, port=WEBHOOK_PORT, secret=RAZORPAY_WEBHOOK_SECRET, writer=None, quiet=False):
+    handler = type("Handler", (WebhookHandler,), {
+        "writer": writer or EventWriter(),
+        "secret": secret,
+        "quiet": quiet,
+    })
+    server_class = type("Server", (ThreadingHTTPServer,), {
+        # Deliveries arrive in bursts; the default backlog of 5 makes
+        # clients wait out a SYN retry
+        "request_queue_size": 128,
+        "daemon_threads": True,
+    })
+    return server_class((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Receive Razorpay payment webhooks")
+    parser.add_argument("--host", default=WEBHOOK_HOST)
+    parser.add_argument("--port", type=int, default=WEBHOOK_PORT)
+    parser.add_argument("--quiet", action="store_true", help="don't log every request")
+    args = parser.parse_args()
+
+    if not RAZORPAY_WEBHOOK_SECRET:
+        parser.error("RAZORPAY_WEBHOOK_SECRET is not set")
+
+    server = make_server(args.host, args.port, quiet=args.quiet)
+    print(f"Listening for Razorpay webhooks on http://{args.host}:{args.port}{WEBHOOK_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()